@@ -0,0 +1,96 @@
+"""JSON API против HTML-страниц: время ответа и размер страницы.
+
+Фрагментный кэш отключён (DummyCache), чтобы сравнивать полный
+рендеринг шаблонов с сериализацией через values().
+
+    python benchmarks/bench_api.py --posts 5000 --repeat 50
+"""
+import argparse
+
+from common import (
+    create_test_database, report, setup_django, summarize, timed
+)
+
+
+def seed(posts):
+    from django.contrib.auth import get_user_model
+    from faker import Faker
+
+    from posts.models import Comment, Group, Post
+
+    fake = Faker("ru_RU")
+    Faker.seed(0)
+    authors = [
+        get_user_model().objects.create(username=f"bench{i}")
+        for i in range(20)
+    ]
+    group = Group.objects.create(
+        title="Бенчмарк", slug="bench", description="Бенчмарк"
+    )
+    Post.objects.bulk_create([
+        Post(
+            author=authors[i % len(authors)],
+            group=group if i % 2 else None,
+            text=fake.text(300),
+        )
+        for i in range(posts)
+    ])
+    post = Post.objects.first()
+    Comment.objects.bulk_create([
+        Comment(post=post, author=author, text=fake.text(90))
+        for author in authors * 10
+    ])
+    return post
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--posts", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    setup_django(
+        DEBUG=False,
+        CACHES={"default": {
+            "BACKEND": "django.core.cache.backends.dummy.DummyCache"
+        }},
+    )
+    create_test_database()
+    post = seed(args.posts)
+
+    from django.test import Client
+
+    client = Client()
+    pages = (
+        ("index", "/", "/api/v1/posts/"),
+        ("group", "/group/bench/", "/api/v1/groups/bench/posts/"),
+        ("profile", "/profile/bench0/", "/api/v1/profiles/bench0/posts/"),
+        (
+            "post_detail",
+            f"/posts/{post.id}/",
+            f"/api/v1/posts/{post.id}/",
+        ),
+        (
+            "comments",
+            f"/posts/{post.id}/comments/",
+            f"/api/v1/posts/{post.id}/comments/?limit=20",
+        ),
+    )
+    rows = []
+    for name, html_url, api_url in pages:
+        for kind, url in (("html", html_url), ("api", api_url)):
+            response = client.get(url)
+            assert response.status_code == 200, (url, response.status_code)
+            timings = timed(lambda: client.get(url), args.repeat)
+            rows.append(dict(
+                page=name,
+                kind=kind,
+                bytes=len(response.content),
+                **summarize(timings),
+            ))
+    report(rows, list(rows[0]), as_json=args.json)
+
+
+if __name__ == "__main__":
+    main()
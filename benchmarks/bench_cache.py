@@ -0,0 +1,110 @@
+"""Сравнение бэкендов кэша при параллельных воркерах.
+
+Каждый процесс имитирует воркер gunicorn: читает ключи из общего
+пространства и при промахе «пересчитывает» значение и кладёт его в кэш.
+Доля попаданий показывает, видят ли воркеры записи друг друга.
+
+    python benchmarks/bench_cache.py --workers 4 --ops 5000
+"""
+import argparse
+import multiprocessing
+import os
+import random
+import shutil
+import tempfile
+import time
+
+from common import report, setup_django
+
+VALUE = "x" * 2048
+
+
+def cache_settings(directory):
+    return {
+        "locmem": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        },
+        "filebased": {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": os.path.join(directory, "filebased"),
+            "OPTIONS": {"MAX_ENTRIES": 100000},
+        },
+        "sqlite": {
+            "BACKEND": "core.cache_backends.SQLiteCache",
+            "LOCATION": os.path.join(directory, "cache.sqlite3"),
+            "OPTIONS": {"MAX_ENTRIES": 100000},
+        },
+    }
+
+
+def worker(alias, ops, keys, seed, results):
+    from django.core.cache import caches
+
+    cache = caches[alias]
+    rng = random.Random(seed)
+    hits = 0
+    started = time.perf_counter()
+    for _ in range(ops):
+        key = f"fragment:{rng.randrange(keys)}"
+        if cache.get(key) is not None:
+            hits += 1
+        else:
+            cache.set(key, VALUE, 300)
+    results.put((hits, time.perf_counter() - started))
+
+
+def run(alias, workers, ops, keys):
+    from django.core.cache import caches
+
+    caches[alias].clear()
+    results = multiprocessing.Queue()
+    processes = [
+        multiprocessing.Process(
+            target=worker, args=(alias, ops, keys, seed, results)
+        )
+        for seed in range(workers)
+    ]
+    started = time.perf_counter()
+    for process in processes:
+        process.start()
+    collected = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+    elapsed = time.perf_counter() - started
+    hits = sum(hit for hit, _ in collected)
+    return {
+        "backend": alias,
+        "workers": workers,
+        "ops_per_sec": workers * ops / elapsed,
+        "hit_ratio": hits / (workers * ops),
+        "db_recomputes": workers * ops - hits,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--ops", type=int, default=5000)
+    parser.add_argument("--keys", type=int, default=2000)
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp(prefix="yatube-bench-cache-")
+    try:
+        setup_django(CACHES=cache_settings(directory))
+        multiprocessing.set_start_method("fork")
+        rows = [
+            run(alias, args.workers, args.ops, args.keys)
+            for alias in ("locmem", "filebased", "sqlite")
+        ]
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+    report(
+        rows,
+        ["backend", "workers", "ops_per_sec", "hit_ratio", "db_recomputes"],
+        as_json=args.json,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""Экономия байтов и времени декодирования от нормализации картинок.
+
+По умолчанию строит синтетический корпус «фото с телефона» (4032x3024,
+EXIF); можно передать каталог с реальными картинками.
+
+    python benchmarks/bench_images.py --count 10
+    python benchmarks/bench_images.py --corpus ~/photos
+"""
+import argparse
+import os
+import time
+from io import BytesIO
+
+from common import report, setup_django
+
+PHONE_SIZE = (4032, 3024)
+
+
+def synthetic_corpus(count):
+    from PIL import Image
+
+    for i in range(count):
+        noise = Image.effect_noise(PHONE_SIZE, 40 + i)
+        gradient = Image.linear_gradient("L").resize(PHONE_SIZE)
+        image = Image.merge("RGB", (noise, gradient, noise))
+        exif = Image.Exif()
+        exif[0x0112] = 6
+        exif[0x010F] = "Benchmark Phone"
+        buffer = BytesIO()
+        image.save(buffer, "JPEG", quality=95, exif=exif.tobytes())
+        yield f"photo_{i}.jpg", buffer.getvalue()
+
+
+def directory_corpus(directory):
+    for name in sorted(os.listdir(directory)):
+        path = os.path.join(directory, name)
+        if os.path.isfile(path):
+            with open(path, "rb") as image_file:
+                yield name, image_file.read()
+
+
+def decode_seconds(content, repeat=3):
+    from PIL import Image
+
+    started = time.perf_counter()
+    for _ in range(repeat):
+        Image.open(BytesIO(content)).load()
+    return (time.perf_counter() - started) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--corpus", help="Каталог с картинками.")
+    parser.add_argument("--count", type=int, default=5)
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    setup_django()
+    from django.core.files.uploadedfile import SimpleUploadedFile
+
+    from posts.images import normalize_image
+
+    corpus = (
+        directory_corpus(args.corpus) if args.corpus
+        else synthetic_corpus(args.count)
+    )
+    rows = []
+    for name, content in corpus:
+        started = time.perf_counter()
+        normalized = normalize_image(SimpleUploadedFile(name, content))
+        normalize_ms = (time.perf_counter() - started) * 1000
+        normalized.seek(0)
+        result = normalized.read()
+        before = decode_seconds(content) * 1000
+        after = decode_seconds(result) * 1000
+        rows.append({
+            "image": name,
+            "bytes_before": len(content),
+            "bytes_after": len(result),
+            "saved_pct": 100.0 * (1 - len(result) / len(content)),
+            "decode_before_ms": before,
+            "decode_after_ms": after,
+            "normalize_ms": normalize_ms,
+        })
+    total_before = sum(row["bytes_before"] for row in rows)
+    total_after = sum(row["bytes_after"] for row in rows)
+    rows.append({
+        "image": "TOTAL",
+        "bytes_before": total_before,
+        "bytes_after": total_after,
+        "saved_pct": 100.0 * (1 - total_after / total_before),
+        "decode_before_ms": sum(r["decode_before_ms"] for r in rows),
+        "decode_after_ms": sum(r["decode_after_ms"] for r in rows),
+        "normalize_ms": sum(r["normalize_ms"] for r in rows),
+    })
+    report(rows, list(rows[0]), as_json=args.json)
+
+
+if __name__ == "__main__":
+    main()
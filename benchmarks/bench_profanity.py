@@ -0,0 +1,66 @@
+"""Проверка текста на запрещённые слова: автомат Ахо-Корасик против
+поиска подстроки по каждому слову списка.
+
+Стоимость проверки одного поста автоматом не должна расти вместе со
+списком слов.
+
+    python benchmarks/bench_profanity.py --sizes 10 1000 50000
+"""
+import argparse
+
+from common import report, setup_django, summarize, timed
+
+
+def word_list(size, fake):
+    words = set()
+    while len(words) < size:
+        words.add(fake.word() + fake.word())
+    return sorted(words)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[10, 1000, 10000, 50000]
+    )
+    parser.add_argument("--posts", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    setup_django()
+    from faker import Faker
+
+    from posts.moderation import ProfanityMatcher
+
+    fake = Faker("ru_RU")
+    Faker.seed(0)
+    posts = [fake.text(500) for _ in range(args.posts)]
+
+    def naive(words):
+        def check():
+            for text in posts:
+                text = text.lower()
+                [word for word in words if word in text]
+        return check
+
+    def automaton(words):
+        matcher = ProfanityMatcher(words)
+
+        def check():
+            for text in posts:
+                matcher.find(text)
+        return check
+
+    rows = []
+    for size in args.sizes:
+        words = word_list(size, fake)
+        for name, strategy in (("substring", naive), ("aho", automaton)):
+            timings = timed(strategy(words), args.repeat)
+            per_post = [timing / len(posts) for timing in timings]
+            rows.append(dict(words=size, strategy=name, **summarize(per_post)))
+    report(rows, list(rows[0]), as_json=args.json)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""Полнотекстовый поиск FTS5 против LIKE '%...%' по таблице постов.
+
+Замеряется то же, что делает страница поиска: первая страница, страница
+на глубине --offset и подсчёт результатов для паджинатора. Построение
+queryset входит в замер: search_posts сам обращается к индексу.
+
+    python benchmarks/bench_search.py --posts 50000
+"""
+import argparse
+
+from common import (
+    create_test_database, report, setup_django, summarize, timed
+)
+
+QUERIES = ("совещание", "металл", "художественный академик", "прошептать",
+           "конструкция")
+
+
+def seed(posts):
+    from django.contrib.auth import get_user_model
+    from faker import Faker
+
+    from posts.models import Post
+    from posts.search import rebuild_index
+
+    fake = Faker("ru_RU")
+    Faker.seed(0)
+    author = get_user_model().objects.create(username="bench")
+    Post.objects.bulk_create(
+        [Post(author=author, text=fake.text(300)) for _ in range(posts)]
+    )
+    rebuild_index(Post.objects.all())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--posts", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--offset", type=int, default=500)
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    setup_django()
+    create_test_database()
+    seed(args.posts)
+
+    from posts.models import Post
+    from posts.search import search_posts
+
+    def like(query):
+        posts = Post.objects.all()
+        for term in query.split():
+            posts = posts.filter(text__icontains=term)
+        return posts
+
+    strategies = {
+        "like": like,
+        "fts5": lambda query: search_posts(Post.objects.all(), query),
+    }
+    rows = []
+    for query in QUERIES:
+        for name, strategy in strategies.items():
+            def page(offset=0):
+                return list(strategy(query)[offset:offset + 10])
+
+            def deep():
+                return page(args.offset)
+
+            def count():
+                return strategy(query).count()
+
+            rows.append(dict(
+                query=query,
+                strategy=name,
+                matches=count(),
+                page_ms=summarize(timed(page, args.repeat))["p50_ms"],
+                deep_ms=summarize(timed(deep, args.repeat))["p50_ms"],
+                count_ms=summarize(timed(count, args.repeat))["p50_ms"],
+            ))
+    report(rows, list(rows[0]), as_json=args.json)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,238 @@
+"""Бенчмарк всех страниц posts, users и about на данных разного объёма.
+
+Для каждой страницы меряются перцентили времени ответа, число SQL-
+запросов и их суммарное время. Отчёт в JSON можно сохранить и сравнить
+с отчётом прошлого релиза:
+
+    python benchmarks/bench_views.py --tier small --output before.json
+    python benchmarks/bench_views.py --tier small --baseline before.json
+
+Уровни: small — 10 тыс. постов, medium — 100 тыс., large — 1 млн. Для
+больших уровней удобно держать базу в файле (--database), тогда данные
+создаются один раз.
+"""
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import time
+
+from common import (
+    ROOT, create_test_database, report, setup_django, summarize
+)
+
+TIERS = {"small": 10_000, "medium": 100_000, "large": 1_000_000}
+AUTHORS = 1000
+GROUPS = 20
+FOLLOWED = 50
+COMMENTS = 200
+TEXTS = 500
+# Насколько может вырасти p50, прежде чем считать это регрессией.
+DEFAULT_THRESHOLD = 0.2
+
+
+def records(posts):
+    """Записи для posts.importer: авторы, группы, посты и подписки."""
+    from faker import Faker
+
+    fake = Faker("ru_RU")
+    Faker.seed(0)
+    texts = [fake.text(300) for _ in range(TEXTS)]
+    yield {"type": "user", "username": "reader"}
+    for number in range(AUTHORS):
+        yield {"type": "user", "username": f"author{number}"}
+    for number in range(GROUPS):
+        yield {"type": "group", "slug": f"group{number}",
+               "title": f"Группа {number}"}
+    for number in range(posts):
+        yield {
+            "type": "post",
+            "author": f"author{number % AUTHORS}",
+            "group": f"group{number % GROUPS}" if number % 3 else None,
+            "text": texts[number % TEXTS],
+        }
+    for number in range(FOLLOWED):
+        yield {"type": "follow", "user": "reader",
+               "author": f"author{number}"}
+
+
+def seed(posts):
+    from posts.importer import ContentImporter
+    from posts.models import Comment, Post, User
+
+    if Post.objects.exists():
+        return
+    ContentImporter("bench_views", batch_size=5000).run(records(posts))
+    post = Post.objects.filter(author__username="author0").first()
+    reader = User.objects.get(username="reader")
+    # Комментарии через save(): счётчики обновят сигналы.
+    for number in range(COMMENTS):
+        Comment.objects.create(
+            post=post, author=reader, text=f"Комментарий {number}"
+        )
+
+
+def scenarios():
+    """(имя, метод, адрес, данные) для каждой страницы."""
+    from posts.models import Post
+
+    post = Post.objects.filter(author__username="author0").first()
+    target = f"/profile/author{AUTHORS - 1}"
+    return [
+        ("index", "get", "/", None),
+        ("index_page_100", "get", "/?page=100", None),
+        ("group_posts", "get", "/group/group1/", None),
+        ("profile", "get", "/profile/author1/", None),
+        ("post_detail", "get", f"/posts/{post.id}/", None),
+        ("follow_index", "get", "/follow/", None),
+        ("post_create", "post", "/create/", {"text": "Новый пост"}),
+        (
+            "add_comment",
+            "post",
+            f"/posts/{post.id}/comment/",
+            {"text": "Новый комментарий"},
+        ),
+        ("profile_follow", "get", f"{target}/follow/", None),
+        ("profile_unfollow", "get", f"{target}/unfollow/", None),
+        ("signup", "get", "/auth/signup/", None),
+        ("login", "get", "/auth/login/", None),
+        ("about_author", "get", "/about/author/", None),
+        ("about_tech", "get", "/about/tech/", None),
+    ]
+
+
+def _request(client, method, url, data):
+    response = getattr(client, method)(url, data)
+    assert response.status_code < 400, (url, response.status_code)
+
+
+class QueryTimer:
+    """execute_wrapper: число запросов и их время без округления Django."""
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.seconds += time.perf_counter() - started
+            self.count += 1
+
+
+def measure(client, pages, repeat, cold):
+    """Прогоняет страницы по кругу repeat раз.
+
+    Первый круг — прогрев, на нём считаются SQL-запросы (перехват
+    замедляет ответ, поэтому общее время на нём не меряется). Подписка и
+    отписка идут в круге подряд, так что каждая находит нужное состояние.
+    """
+    from django.core.cache import cache
+    from django.db import connection
+
+    stats = {}
+    timings = {name: [] for name, *_ in pages}
+    for iteration in range(repeat + 1):
+        for name, method, url, data in pages:
+            if cold:
+                cache.clear()
+            if iteration == 0:
+                timer = QueryTimer()
+                with connection.execute_wrapper(timer):
+                    _request(client, method, url, data)
+                stats[name] = dict(
+                    queries=timer.count, query_ms=timer.seconds * 1000
+                )
+                continue
+            started = time.perf_counter()
+            _request(client, method, url, data)
+            timings[name].append(time.perf_counter() - started)
+    return [
+        dict(view=name, **stats[name], **summarize(timings[name]))
+        for name in timings
+    ]
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(rows, baseline, threshold):
+    """Добавляет к строкам разницу с прошлым отчётом, возвращает регрессии."""
+    before = {row["view"]: row for row in baseline["results"]}
+    regressions = []
+    for row in rows:
+        old = before.get(row["view"])
+        if old is None:
+            continue
+        row["p50_delta"] = row["p50_ms"] / old["p50_ms"] - 1
+        row["queries_delta"] = row["queries"] - old["queries"]
+        if row["p50_delta"] > threshold or row["queries_delta"] > 0:
+            regressions.append(row["view"])
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tier", choices=TIERS, default="small")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument(
+        "--cold", action="store_true", help="Очищать кэш перед запросом."
+    )
+    parser.add_argument("--database", help="Файл тестовой базы.")
+    parser.add_argument("--output", help="Куда сохранить JSON-отчёт.")
+    parser.add_argument("--baseline", help="JSON-отчёт для сравнения.")
+    parser.add_argument(
+        "--threshold", type=float, default=DEFAULT_THRESHOLD
+    )
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    setup_django(DEBUG=False)
+    from django.conf import settings
+
+    if args.database:
+        settings.DATABASES["default"]["TEST"] = {"NAME": args.database}
+    create_test_database(keepdb=bool(args.database))
+    started = time.perf_counter()
+    seed(TIERS[args.tier])
+    seed_seconds = time.perf_counter() - started
+
+    from django.test import Client
+    from posts.models import User
+
+    client = Client()
+    client.force_login(User.objects.get(username="reader"))
+    rows = measure(client, scenarios(), args.repeat, args.cold)
+    regressions = []
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as baseline:
+            regressions = compare(rows, json.load(baseline), args.threshold)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output:
+            json.dump({
+                "tier": args.tier,
+                "posts": TIERS[args.tier],
+                "revision": git_revision(),
+                "python": platform.python_version(),
+                "seed_seconds": seed_seconds,
+                "repeat": args.repeat,
+                "cold": args.cold,
+                "results": rows,
+            }, output, ensure_ascii=False, indent=2)
+    report(rows, list(rows[0]), as_json=args.json)
+    if regressions:
+        print("Регрессии: " + ", ".join(regressions), file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
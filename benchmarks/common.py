@@ -0,0 +1,82 @@
+"""Общие помощники для бенчмарков: настройка Django и статистика."""
+import json
+import os
+import statistics
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PROJECT_DIR = os.path.join(ROOT, "yatube")
+
+
+def setup_django(**overrides):
+    """Подключает проект yatube; overrides заменяют значения настроек."""
+    if PROJECT_DIR not in sys.path:
+        sys.path.insert(0, PROJECT_DIR)
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "yatube.settings")
+    import django
+    from django.conf import settings
+
+    for name, value in overrides.items():
+        setattr(settings, name, value)
+    django.setup()
+
+
+def percentile(values, share):
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, int(round(share * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def summarize(timings):
+    """Перцентили и среднее для списка длительностей в секундах (в мс)."""
+    return {
+        "p50_ms": percentile(timings, 0.5) * 1000,
+        "p95_ms": percentile(timings, 0.95) * 1000,
+        "p99_ms": percentile(timings, 0.99) * 1000,
+        "mean_ms": statistics.fmean(timings) * 1000 if timings else 0.0,
+    }
+
+
+def report(rows, columns, as_json=False, stream=sys.stdout):
+    """Печатает строки результатов таблицей или JSON."""
+    if as_json:
+        json.dump(rows, stream, ensure_ascii=False, indent=2)
+        stream.write("\n")
+        return
+    widths = {
+        column: max(len(column), *(len(_fmt(row[column])) for row in rows))
+        for column in columns
+    }
+    lines = [[column for column in columns]]
+    lines += [[_fmt(row[column]) for column in columns] for row in rows]
+    for line in lines:
+        cells = (cell.ljust(widths[c]) for cell, c in zip(line, columns))
+        stream.write("  ".join(cells).rstrip() + "\n")
+
+
+def _fmt(value):
+    if isinstance(value, float):
+        return f"{value:.2f}"
+    return str(value)
+
+
+def create_test_database(keepdb=False):
+    """Создаёт отдельную тестовую БД, чтобы не трогать рабочую."""
+    from django.db import connection
+
+    connection.creation.create_test_db(verbosity=0, keepdb=keepdb)
+    return connection
+
+
+def timed(func, repeat):
+    """Длительности repeat вызовов func в секундах."""
+    import time
+
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return timings
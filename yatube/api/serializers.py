@@ -0,0 +1,61 @@
+"""Сериализация строк, полученных через values().
+
+Модели не создаются: queryset отдаёт словари только с запрошенными
+колонками, а связанные поля (имя автора, slug группы) приходят тем же
+запросом через JOIN.
+"""
+from django.core.files.storage import default_storage
+
+# Имя поля в ответе -> lookup для values().
+POST_FIELDS = {
+    "id": "id",
+    "text": "text",
+    "pub_date": "pub_date",
+    "author": "author__username",
+    "group": "group__slug",
+    "image": "image",
+    "comments_count": "comments_count",
+}
+COMMENT_FIELDS = {
+    "id": "id",
+    "post": "post_id",
+    "author": "author__username",
+    "text": "text",
+    "created": "created",
+}
+
+
+def _image_url(name):
+    return default_storage.url(name) if name else None
+
+
+CONVERTERS = {"image": _image_url}
+
+
+def parse_fields(raw, available):
+    """Список полей из параметра ?fields=a,b; без параметра — все поля.
+
+    Для неизвестных полей бросает ValueError.
+    """
+    if not raw:
+        return list(available)
+    fields = [name.strip() for name in raw.split(",") if name.strip()]
+    unknown = [name for name in fields if name not in available]
+    if unknown or not fields:
+        raise ValueError(", ".join(unknown))
+    return fields
+
+
+def lookups_for(fields, available, *required):
+    """Колонки для values(): запрошенные поля и нужные для курсора."""
+    lookups = [available[name] for name in fields]
+    return list(dict.fromkeys(lookups + list(required)))
+
+
+def serialize(row, fields, available):
+    result = {}
+    for name in fields:
+        value = row[available[name]]
+        converter = CONVERTERS.get(name)
+        result[name] = converter(value) if converter else value
+    return result
@@ -0,0 +1,98 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts.models import Comment, Follow, Group, Post
+
+User = get_user_model()
+
+
+class ApiViewsTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username="Test_Author")
+        cls.reader = User.objects.create_user(username="Test_Reader")
+        cls.group = Group.objects.create(
+            title="Test group", slug="test-slug", description="Description"
+        )
+        for number in range(15):
+            Post.objects.create(
+                text=f"Пост {number}", author=cls.author, group=cls.group
+            )
+        cls.posts = list(Post.objects.all())
+        cls.comment = Comment.objects.create(
+            post=cls.posts[0], author=cls.reader, text="Комментарий"
+        )
+
+    def setUp(self):
+        self.client = Client()
+
+    def test_index_pages_by_cursor(self):
+        response = self.client.get(reverse("api:index"))
+        data = response.json()
+        self.assertEqual(
+            [post["id"] for post in data["results"]],
+            [post.id for post in self.posts[:10]],
+        )
+        self.assertIsNone(data["previous"])
+        data = self.client.get(
+            reverse("api:index"), {"after": data["next"]}
+        ).json()
+        self.assertEqual(
+            [post["id"] for post in data["results"]],
+            [post.id for post in self.posts[10:]],
+        )
+        self.assertIsNone(data["next"])
+
+    def test_sparse_fields_in_one_query(self):
+        """?fields= ограничивает ответ, связи читаются тем же запросом."""
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(
+                reverse("api:group_posts", args=(self.group.slug,)),
+                {"fields": "text,author,group", "limit": 2},
+            )
+        selects = [q for q in queries if q["sql"].startswith("SELECT")]
+        self.assertEqual(len(selects), 2)
+        self.assertEqual(response.json()["results"][0], {
+            "text": "Пост 14", "author": "Test_Author", "group": "test-slug"
+        })
+
+    def test_post_detail_and_comments(self):
+        post = self.posts[0]
+        data = self.client.get(
+            reverse("api:post_detail", args=(post.id,))
+        ).json()
+        self.assertEqual(data["id"], post.id)
+        self.assertEqual(data["comments_count"], 1)
+        self.assertIsNone(data["image"])
+        data = self.client.get(
+            reverse("api:post_comments", args=(post.id,))
+        ).json()
+        self.assertEqual(data["results"][0]["author"], "Test_Reader")
+
+    def test_follow_feed(self):
+        self.assertEqual(
+            self.client.get(reverse("api:follow_index")).status_code, 401
+        )
+        Follow.objects.create(user=self.reader, author=self.author)
+        self.client.force_login(self.reader)
+        data = self.client.get(reverse("api:follow_index")).json()
+        self.assertEqual(len(data["results"]), 10)
+
+    def test_errors(self):
+        cases = (
+            (reverse("api:index"), {"fields": "text,password"}, 400),
+            (reverse("api:index"), {"limit": "many"}, 400),
+            (reverse("api:post_detail", args=(0,)), {}, 404),
+            (reverse("api:profile_posts", args=("nobody",)), {}, 404),
+        )
+        for url, params, status in cases:
+            with self.subTest(url=url, params=params):
+                response = self.client.get(url, params)
+                self.assertEqual(response.status_code, status)
+                self.assertIn("error", response.json())
+        response = self.client.post(reverse("api:index"))
+        self.assertEqual(response.status_code, 405)
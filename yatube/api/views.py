@@ -0,0 +1,136 @@
+"""JSON API только для чтения: ленты, пост и комментарии.
+
+Все списки листаются курсором (?after=, ?before=), размер страницы
+задаётся ?limit=, набор полей — ?fields=id,text,author.
+"""
+from functools import wraps
+
+from django.http import JsonResponse
+from django.views.decorators.http import require_GET
+
+from posts.feed import FEED_CURSOR, follow_feed
+from posts.models import Comment, Group, Post, User
+from posts.paginator import CursorPaginator, decode_cursor
+
+from .serializers import (
+    COMMENT_FIELDS, POST_FIELDS, lookups_for, parse_fields, serialize
+)
+
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 100
+
+
+class ApiError(Exception):
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.message = message
+        self.status = status
+
+
+def api_view(view):
+    """GET-only представление, ошибки которого отдаются JSON."""
+    @require_GET
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        try:
+            return view(request, *args, **kwargs)
+        except ApiError as error:
+            return JsonResponse({"error": error.message}, status=error.status)
+    return wrapper
+
+
+def _fields(request, available):
+    try:
+        return parse_fields(request.GET.get("fields"), available)
+    except ValueError as error:
+        raise ApiError(f"Неизвестные поля: {error}")
+
+
+def _limit(request):
+    try:
+        limit = int(request.GET.get("limit", DEFAULT_LIMIT))
+    except ValueError:
+        raise ApiError("limit должен быть числом")
+    return min(max(limit, 1), MAX_LIMIT)
+
+
+def _page(request, queryset, available, field, descending=True,
+          tiebreak="id"):
+    fields = _fields(request, available)
+    rows = queryset.values(*lookups_for(fields, available, field, tiebreak))
+    paginator = CursorPaginator(
+        rows,
+        _limit(request),
+        field=field,
+        descending=descending,
+        tiebreak=tiebreak,
+    )
+    page = paginator.get_cursor_page(
+        after=decode_cursor(request.GET.get("after")),
+        before=decode_cursor(request.GET.get("before")),
+    )
+    return JsonResponse({
+        "results": [serialize(row, fields, available) for row in page],
+        "next": page.next_cursor,
+        "previous": page.previous_cursor,
+    })
+
+
+def _posts_page(request, posts, field="pub_date", tiebreak="id"):
+    return _page(
+        request, posts, POST_FIELDS, field, tiebreak=tiebreak
+    )
+
+
+def _ensure_exists(queryset):
+    if not queryset.exists():
+        raise ApiError("Не найдено", status=404)
+
+
+@api_view
+def index(request):
+    return _posts_page(request, Post.objects.all())
+
+
+@api_view
+def group_posts(request, slug):
+    _ensure_exists(Group.objects.filter(slug=slug))
+    return _posts_page(request, Post.objects.filter(group__slug=slug))
+
+
+@api_view
+def profile_posts(request, username):
+    _ensure_exists(User.objects.filter(username=username))
+    return _posts_page(
+        request, Post.objects.filter(author__username=username)
+    )
+
+
+@api_view
+def follow_index(request):
+    if not request.user.is_authenticated:
+        raise ApiError("Нужна авторизация", status=401)
+    return _posts_page(request, follow_feed(request.user), **FEED_CURSOR)
+
+
+@api_view
+def post_detail(request, post_id):
+    fields = _fields(request, POST_FIELDS)
+    row = Post.objects.filter(id=post_id).values(
+        *lookups_for(fields, POST_FIELDS)
+    ).first()
+    if row is None:
+        raise ApiError("Не найдено", status=404)
+    return JsonResponse(serialize(row, fields, POST_FIELDS))
+
+
+@api_view
+def post_comments(request, post_id):
+    _ensure_exists(Post.objects.filter(id=post_id))
+    return _page(
+        request,
+        Comment.objects.filter(post_id=post_id),
+        COMMENT_FIELDS,
+        "created",
+        descending=False,
+    )
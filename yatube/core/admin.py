@@ -0,0 +1,13 @@
+from django.contrib import admin
+
+from core.models import SlowQuery
+
+
+class SlowQueryAdmin(admin.ModelAdmin):
+    list_display = ("sql", "view", "count", "total_time", "max_time",
+                    "last_seen")
+    list_filter = ("view",)
+    readonly_fields = [field.name for field in SlowQuery._meta.fields]
+
+
+admin.site.register(SlowQuery, SlowQueryAdmin)
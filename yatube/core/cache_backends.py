@@ -0,0 +1,269 @@
+"""Кэш в файле SQLite, общий для всех процессов на одном хосте.
+
+В отличие от LocMemCache каждый воркер gunicorn видит записи остальных,
+а в отличие от FileBasedCache размер ограничен и вытесняются давно не
+читавшиеся записи (LRU). Журнал WAL позволяет читать параллельно с
+записью.
+
+    CACHES = {
+        "default": {
+            "BACKEND": "core.cache_backends.SQLiteCache",
+            "LOCATION": "/var/tmp/yatube-cache.sqlite3",
+            "OPTIONS": {"MAX_ENTRIES": 100000, "MAX_SIZE": 256 * 2 ** 20},
+        }
+    }
+"""
+import os
+import pickle
+import sqlite3
+import threading
+import time
+
+from django.core.cache.backends import locmem
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+
+from . import timing
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS cache (
+    key TEXT PRIMARY KEY,
+    value BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    expires REAL,
+    accessed REAL NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS cache_accessed ON cache (accessed);
+CREATE INDEX IF NOT EXISTS cache_expires ON cache (expires);
+CREATE TABLE IF NOT EXISTS stats (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    entries INTEGER NOT NULL,
+    size INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO stats VALUES (1, 0, 0);
+CREATE TRIGGER IF NOT EXISTS cache_insert AFTER INSERT ON cache BEGIN
+    UPDATE stats SET entries = entries + 1, size = size + NEW.size;
+END;
+CREATE TRIGGER IF NOT EXISTS cache_delete AFTER DELETE ON cache BEGIN
+    UPDATE stats SET entries = entries - 1, size = size - OLD.size;
+END;
+CREATE TRIGGER IF NOT EXISTS cache_update AFTER UPDATE OF size ON cache BEGIN
+    UPDATE stats SET size = size - OLD.size + NEW.size;
+END;
+"""
+
+# Время последнего чтения обновляется не чаще раза в столько секунд,
+# чтобы частые чтения одного ключа не превращались в записи.
+ACCESS_RESOLUTION = 1.0
+
+
+class CacheStatsMixin:
+    """Считает попадания и промахи get для Server-Timing.
+
+    get_many базового класса обращается к get, поэтому учитывается тоже.
+    Само чтение бэкенд делает в _get.
+    """
+
+    def get(self, key, default=None, version=None):
+        value = self._get(key, _MISSING, version)
+        if value is _MISSING:
+            timing.add("cache_miss")
+            return default
+        timing.add("cache_hit")
+        return value
+
+    def _get(self, key, default, version):
+        return super().get(key, default, version=version)
+
+
+class LocMemCache(CacheStatsMixin, locmem.LocMemCache):
+    pass
+
+
+class SQLiteCache(CacheStatsMixin, BaseCache):
+    def __init__(self, location, params):
+        super().__init__(params)
+        self._path = location
+        options = params.get("OPTIONS", {})
+        self._max_size = int(options.get("MAX_SIZE", 0))
+        self._local = threading.local()
+
+    @property
+    def _db(self):
+        # Соединение своё у каждого потока и у каждого процесса после fork.
+        db = getattr(self._local, "db", None)
+        if db is None or self._local.pid != os.getpid():
+            directory = os.path.dirname(self._path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            db = sqlite3.connect(
+                self._path, timeout=30, isolation_level=None,
+                check_same_thread=False,
+            )
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            # Иначе INSERT OR REPLACE не вызывает триггер удаления,
+            # и счётчики в stats расходятся с таблицей.
+            db.execute("PRAGMA recursive_triggers=ON")
+            db.executescript(SCHEMA)
+            self._local.db = db
+            self._local.pid = os.getpid()
+        return db
+
+    def _fetch(self, key, now):
+        row = self._db.execute(
+            "SELECT value, expires, accessed FROM cache WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        value, expires, accessed = row
+        if expires is not None and expires <= now:
+            self._db.execute(
+                "DELETE FROM cache WHERE key = ? AND expires <= ?", (key, now)
+            )
+            return None
+        if now - accessed > ACCESS_RESOLUTION:
+            self._db.execute(
+                "UPDATE cache SET accessed = ? WHERE key = ?", (now, key)
+            )
+        return value
+
+    def _store(self, key, value, timeout, mode="REPLACE"):
+        blob = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        expires = self.get_backend_timeout(timeout)
+        cursor = self._db.execute(
+            f"INSERT OR {mode} INTO cache "
+            "(key, value, size, expires, accessed) VALUES (?, ?, ?, ?, ?)",
+            (key, blob, len(blob), expires, time.time()),
+        )
+        return cursor.rowcount > 0
+
+    def _cull(self):
+        entries, size = self._db.execute(
+            "SELECT entries, size FROM stats"
+        ).fetchone()
+        over_entries = entries > self._max_entries
+        over_size = self._max_size and size > self._max_size
+        if not (over_entries or over_size):
+            return
+        self._db.execute(
+            "DELETE FROM cache WHERE expires <= ?", (time.time(),)
+        )
+        entries, size = self._db.execute(
+            "SELECT entries, size FROM stats"
+        ).fetchone()
+        excess = 0
+        if entries > self._max_entries:
+            excess = max(1, entries // self._cull_frequency)
+        if self._max_size and size > self._max_size and entries:
+            # Средний размер записи даёт оценку, сколько строк удалить.
+            target = self._max_size - self._max_size // self._cull_frequency
+            excess = max(excess, (size - target) * entries // size + 1)
+        if excess:
+            self._db.execute(
+                "DELETE FROM cache WHERE key IN "
+                "(SELECT key FROM cache ORDER BY accessed LIMIT ?)",
+                (excess,),
+            )
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_key(key, version=version)
+        self.validate_key(key)
+        with _immediate(self._db):
+            now = time.time()
+            if self._fetch(key, now) is not None:
+                return False
+            added = self._store(key, value, timeout, mode="IGNORE")
+            self._cull()
+        return added
+
+    def _get(self, key, default, version):
+        key = self.make_key(key, version=version)
+        self.validate_key(key)
+        blob = self._fetch(key, time.time())
+        if blob is None:
+            return default
+        return pickle.loads(blob)
+
+    def get_many(self, keys, version=None):
+        result = {}
+        for key in keys:
+            value = self.get(key, _MISSING, version=version)
+            if value is not _MISSING:
+                result[key] = value
+        return result
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_key(key, version=version)
+        self.validate_key(key)
+        with _immediate(self._db):
+            self._store(key, value, timeout)
+            self._cull()
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        with _immediate(self._db):
+            for key, value in data.items():
+                key = self.make_key(key, version=version)
+                self.validate_key(key)
+                self._store(key, value, timeout)
+            self._cull()
+        return []
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_key(key, version=version)
+        self.validate_key(key)
+        with _immediate(self._db):
+            if self._fetch(key, time.time()) is None:
+                return False
+            self._db.execute(
+                "UPDATE cache SET expires = ? WHERE key = ?",
+                (self.get_backend_timeout(timeout), key),
+            )
+        return True
+
+    def incr(self, key, delta=1, version=None):
+        key = self.make_key(key, version=version)
+        self.validate_key(key)
+        with _immediate(self._db):
+            blob = self._fetch(key, time.time())
+            if blob is None:
+                raise ValueError("Key '%s' not found" % key)
+            value = pickle.loads(blob) + delta
+            blob = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+            self._db.execute(
+                "UPDATE cache SET value = ?, size = ? WHERE key = ?",
+                (blob, len(blob), key),
+            )
+        return value
+
+    def has_key(self, key, version=None):
+        key = self.make_key(key, version=version)
+        self.validate_key(key)
+        return self._fetch(key, time.time()) is not None
+
+    def delete(self, key, version=None):
+        key = self.make_key(key, version=version)
+        self.validate_key(key)
+        self._db.execute("DELETE FROM cache WHERE key = ?", (key,))
+
+    def clear(self):
+        self._db.execute("DELETE FROM cache")
+
+    def close(self, **kwargs):
+        # Соединение переиспользуется между запросами потока.
+        pass
+
+
+_MISSING = object()
+
+
+class _immediate:
+    """Транзакция BEGIN IMMEDIATE: чтение и запись без гонок процессов."""
+
+    def __init__(self, db):
+        self.db = db
+
+    def __enter__(self):
+        self.db.execute("BEGIN IMMEDIATE")
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.db.execute("ROLLBACK" if exc_type else "COMMIT")
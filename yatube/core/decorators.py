@@ -0,0 +1,115 @@
+import hashlib
+import logging
+from functools import wraps
+
+from django.conf import settings
+from django.middleware.csrf import get_token
+from django.utils.cache import (
+    get_conditional_response, patch_cache_control, patch_vary_headers
+)
+from django.utils.http import http_date, quote_etag
+
+from . import timing
+
+logger = logging.getLogger(__name__)
+
+
+def conditional_page(last_modified_func=None, etag_func=None,
+                     vary_on_csrf=False):
+    """Отвечает 304 без рендеринга шаблона, если страница не менялась.
+
+    last_modified_func(request, *args, **kwargs) возвращает время последнего
+    изменения показываемых данных (datetime или None), etag_func — список
+    дополнительных значений, от которых зависит страница. ETag учитывает
+    адрес, параметры запроса и пользователя: страницы различаются шапкой
+    для каждого вошедшего пользователя.
+
+    Без last_modified_func заголовка Last-Modified нет, и проверка идёт
+    только по ETag. Так нужно, если страница меняется не только с датами
+    записей: удаление поста время последней правки не сдвигает, и
+    клиент с If-Modified-Since получил бы 304 со старым содержимым.
+
+    vary_on_csrf нужен страницам с формами: секрет CSRF меняется при
+    входе, и без него в ETag повторно вошедший пользователь получил бы
+    304 со страницей, где в форме лежит уже недействительный токен.
+    """
+    def decorator(view):
+        @wraps(view)
+        def inner(request, *args, **kwargs):
+            if request.method not in ("GET", "HEAD"):
+                return view(request, *args, **kwargs)
+            last_modified = (
+                last_modified_func(request, *args, **kwargs)
+                if last_modified_func is not None else None
+            )
+            timestamp = (
+                int(last_modified.timestamp()) if last_modified else None
+            )
+            parts = [
+                request.path,
+                request.GET.urlencode(),
+                request.user.pk,
+                timestamp,
+            ]
+            if vary_on_csrf and request.user.is_authenticated:
+                # get_token кладёт в META секрет из cookie (или новый).
+                get_token(request)
+                parts.append(request.META["CSRF_COOKIE"])
+            if etag_func is not None:
+                parts.extend(etag_func(request, *args, **kwargs))
+            etag = quote_etag(
+                hashlib.md5(repr(parts).encode()).hexdigest()
+            )
+            response = get_conditional_response(
+                request, etag=etag, last_modified=timestamp
+            )
+            if response is None:
+                response = view(request, *args, **kwargs)
+            if response.status_code in (200, 304):
+                response.setdefault("ETag", etag)
+                if timestamp is not None:
+                    response.setdefault("Last-Modified", http_date(timestamp))
+                patch_vary_headers(response, ("Cookie",))
+                if request.user.is_authenticated:
+                    patch_cache_control(response, private=True)
+                patch_cache_control(response, no_cache=True)
+            return response
+        return inner
+    return decorator
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+def query_budget(max_queries):
+    """Не больше max_queries SQL-запросов на один вызов представления.
+
+    Бюджет не зависит от числа записей на странице, поэтому превышение
+    обычно означает N+1 в шаблоне. Проверка идёт, когда включены DEBUG
+    (предупреждение в лог) или QUERY_BUDGET_STRICT (исключение
+    QueryBudgetExceeded, для тестов). Бюджет виден как атрибут
+    представления query_budget.
+    """
+    def decorator(view):
+        @wraps(view)
+        def inner(request, *args, **kwargs):
+            strict = settings.QUERY_BUDGET_STRICT
+            if not (strict or settings.DEBUG):
+                return view(request, *args, **kwargs)
+            with timing.collect() as metrics:
+                before = metrics.count("db")
+                response = view(request, *args, **kwargs)
+                used = metrics.count("db") - before
+            if used > max_queries:
+                message = (
+                    f"{request.path}: {used} SQL-запросов "
+                    f"при бюджете {max_queries}"
+                )
+                if strict:
+                    raise QueryBudgetExceeded(message)
+                logger.warning(message)
+            return response
+        inner.query_budget = max_queries
+        return inner
+    return decorator
@@ -0,0 +1,48 @@
+from django.core.management.base import BaseCommand
+
+from core.models import SlowQuery
+
+ORDERS = {
+    "total": "-total_time",
+    "count": "-count",
+    "max": "-max_time",
+}
+
+
+class Command(BaseCommand):
+    help = "Показывает самые тяжёлые медленные запросы из журнала."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--order",
+            choices=tuple(ORDERS),
+            default="total",
+            help="Сортировка: по суммарному времени, числу случаев или "
+                 "наибольшему времени.",
+        )
+        parser.add_argument("--limit", type=int, default=10)
+        parser.add_argument(
+            "--plan", action="store_true", help="Печатать план и стек."
+        )
+        parser.add_argument(
+            "--clear", action="store_true", help="Очистить журнал."
+        )
+
+    def handle(self, *args, **options):
+        if options["clear"]:
+            deleted, _ = SlowQuery.objects.all().delete()
+            self.stdout.write(f"Удалено записей: {deleted}")
+            return
+        queries = SlowQuery.objects.order_by(ORDERS[options["order"]])
+        for number, query in enumerate(queries[:options["limit"]], 1):
+            self.stdout.write(self.style.SQL_KEYWORD(
+                f"{number}. {query.view}: {query.count} раз, "
+                f"всего {query.total_time * 1000:.1f} мс, "
+                f"в среднем {query.total_time / query.count * 1000:.1f} мс, "
+                f"максимум {query.max_time * 1000:.1f} мс"
+            ))
+            self.stdout.write(query.sql)
+            if options["plan"]:
+                self.stdout.write(query.plan or "(план не снят)")
+                self.stdout.write(query.stack)
+            self.stdout.write("")
@@ -0,0 +1,235 @@
+"""Агрегированные метрики в формате Prometheus без внешних сервисов.
+
+Каждый процесс копит наблюдения в памяти и не чаще раза в FLUSH_INTERVAL
+секунд прибавляет их к общему файлу SQLite (METRICS_PATH) одной
+транзакцией. Представление core.views.metrics читает сумму по всем
+процессам, так что воркеры gunicorn отдают общие гистограммы.
+
+Гистограммы хранятся накопленными, как в формате Prometheus: наблюдение
+увеличивает все корзины с границей не меньше значения.
+"""
+import atexit
+import math
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+
+from django.conf import settings
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS samples (
+    metric TEXT NOT NULL,
+    labels TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value REAL NOT NULL,
+    PRIMARY KEY (metric, labels, key)
+) WITHOUT ROWID;
+"""
+FLUSH_INTERVAL = 1.0
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+REGISTRY = {}
+
+
+def _escape(value):
+    return (
+        str(value).replace("\\", "\\\\").replace('"', '\\"')
+        .replace("\n", "\\n")
+    )
+
+
+def _sample(name, labels):
+    return f"{name}{{{labels}}}" if labels else name
+
+
+def _format(value):
+    return str(int(value)) if float(value).is_integer() else repr(value)
+
+
+class Store:
+    """Буфер наблюдений процесса и общий файл, куда он сбрасывается."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._reset()
+
+    def _reset(self):
+        # После fork буфер родителя не должен попасть в файл дважды.
+        self._pending = {}
+        self._flushed = time.monotonic()
+        self._pid = os.getpid()
+
+    @property
+    def _db(self):
+        path = settings.METRICS_PATH
+        db = getattr(self._local, "db", None)
+        if db is None or self._local.key != (os.getpid(), path):
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            db = sqlite3.connect(
+                path, timeout=30, isolation_level=None,
+                check_same_thread=False,
+            )
+            db.execute("PRAGMA journal_mode=WAL")
+            db.executescript(SCHEMA)
+            self._local.db = db
+            self._local.key = (os.getpid(), path)
+        return db
+
+    def add(self, metric, labels, key, value):
+        with self._lock:
+            if self._pid != os.getpid():
+                self._reset()
+            sample = (metric, labels, key)
+            self._pending[sample] = self._pending.get(sample, 0) + value
+            due = time.monotonic() - self._flushed > FLUSH_INTERVAL
+        if due:
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            if self._pid != os.getpid():
+                self._reset()
+            pending, self._pending = self._pending, {}
+            self._flushed = time.monotonic()
+        if not pending:
+            return
+        db = self._db
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            db.executemany(
+                "INSERT INTO samples VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (metric, labels, key) "
+                "DO UPDATE SET value = value + excluded.value",
+                [sample + (value,) for sample, value in pending.items()],
+            )
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+        db.execute("COMMIT")
+
+    def read(self):
+        """{метрика: {метки: {ключ: значение}}} по всем процессам."""
+        self.flush()
+        samples = {}
+        for metric, labels, key, value in self._db.execute(
+            "SELECT metric, labels, key, value FROM samples"
+        ):
+            samples.setdefault(metric, {}).setdefault(labels, {})[key] = value
+        return samples
+
+    def clear(self):
+        with self._lock:
+            self._reset()
+        self._db.execute("DELETE FROM samples")
+
+
+store = Store()
+atexit.register(store.flush)
+
+
+class Metric(ABC):
+    kind = None
+
+    def __init__(self, name, documentation, labels=()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        REGISTRY[name] = self
+
+    def _labels(self, values):
+        return ",".join(
+            f'{name}="{_escape(values[name])}"' for name in self.labels
+        )
+
+    @abstractmethod
+    def samples(self, labels, values):
+        """Строки экспозиции (имя с метками, значение) из сохранённых."""
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        store.add(self.name, self._labels(labels), "", amount)
+
+    def samples(self, labels, values):
+        yield _sample(self.name, labels), values.get("", 0)
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, buckets, labels=()):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(buckets) + (math.inf,)
+
+    def observe(self, value, **labels):
+        labels = self._labels(labels)
+        for index in range(bisect_left(self.buckets, value),
+                           len(self.buckets)):
+            store.add(self.name, labels, str(index), 1)
+        store.add(self.name, labels, "sum", value)
+        store.add(self.name, labels, "count", 1)
+
+    def samples(self, labels, values):
+        prefix = f"{labels}," if labels else ""
+        for index, bound in enumerate(self.buckets):
+            le = "+Inf" if bound == math.inf else _format(bound)
+            yield (
+                f'{self.name}_bucket{{{prefix}le="{le}"}}',
+                values.get(str(index), 0),
+            )
+        yield _sample(f"{self.name}_sum", labels), values.get("sum", 0)
+        yield _sample(f"{self.name}_count", labels), values.get("count", 0)
+
+
+def exposition():
+    """Все метрики в текстовом формате Prometheus."""
+    samples = store.read()
+    lines = []
+    for metric in REGISTRY.values():
+        lines.append(f"# HELP {metric.name} {metric.documentation}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        for labels, values in sorted(samples.get(metric.name, {}).items()):
+            lines.extend(
+                f"{name} {_format(value)}"
+                for name, value in metric.samples(labels, values)
+            )
+    return "\n".join(lines) + "\n"
+
+
+REQUEST_DURATION = Histogram(
+    "yatube_request_duration_seconds",
+    "Request latency by URL name.",
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+    labels=("view",),
+)
+REQUEST_QUERIES = Histogram(
+    "yatube_request_queries",
+    "SQL queries per request by URL name.",
+    buckets=(0, 1, 2, 5, 10, 20, 50, 100, 200),
+    labels=("view",),
+)
+CACHE_LOOKUPS = Counter(
+    "yatube_cache_lookups_total",
+    "Cache lookups by URL name and result (hit or miss).",
+    labels=("view", "result"),
+)
+UPLOAD_SIZE = Histogram(
+    "yatube_upload_bytes",
+    "Uploaded file sizes by URL name.",
+    buckets=(10 ** 4, 10 ** 5, 5 * 10 ** 5, 10 ** 6, 2 * 10 ** 6, 5 * 10 ** 6,
+             10 ** 7),
+    labels=("view",),
+)
+THUMBNAIL_GENERATIONS = Counter(
+    "yatube_thumbnail_generations_total",
+    "Thumbnails generated after upload or during page render.",
+    labels=("stage",),
+)
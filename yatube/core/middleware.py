@@ -0,0 +1,120 @@
+import logging
+import random
+import time
+
+from django.conf import settings
+
+from . import metrics, slow_queries, timing
+
+logger = logging.getLogger(__name__)
+
+# (метрика, имя в Server-Timing, описание): время и число операций.
+# Заголовок должен быть в latin-1, поэтому описания по-английски.
+TIMED_METRICS = (
+    ("db", "db", "queries"),
+    ("template", "tpl", "templates"),
+    ("thumbnail", "thumb", "thumbnails"),
+)
+
+
+class MetricsMiddleware:
+    """Время ответа, число SQL-запросов, попадания в кэш и размеры
+    загруженных файлов в гистограммы core.metrics по имени URL.
+
+    Здесь же сохраняются медленные запросы: после ответа, вне транзакции
+    запроса и вне перехвата SQL.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        started = time.perf_counter()
+        with timing.collect() as collected:
+            response = self.get_response(request)
+        view = _view_name(request)
+        metrics.REQUEST_DURATION.observe(
+            time.perf_counter() - started, view=view
+        )
+        metrics.REQUEST_QUERIES.observe(collected.count("db"), view=view)
+        for result in ("hit", "miss"):
+            count = collected.count(f"cache_{result}")
+            if count:
+                metrics.CACHE_LOOKUPS.inc(count, view=view, result=result)
+        if request.method == "POST" and (
+            request.content_type == "multipart/form-data"
+        ):
+            for upload in request.FILES.values():
+                metrics.UPLOAD_SIZE.observe(upload.size, view=view)
+        if collected.slow_queries:
+            slow_queries.record(collected.slow_queries, view)
+        return response
+
+
+class ServerTimingMiddleware:
+    """Время SQL, шаблонов, кэша и миниатюр в заголовке Server-Timing.
+
+    Заголовок и строка лога с именем URL добавляются к доле запросов
+    SERVER_TIMING_SAMPLE_RATE. Сами замеры, включая перехват SQL, идут
+    для всех запросов: их собирает MetricsMiddleware для гистограмм и
+    журнала медленных запросов, здесь они только читаются.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if random.random() >= settings.SERVER_TIMING_SAMPLE_RATE:
+            return self.get_response(request)
+        started = time.perf_counter()
+        with timing.collect() as metrics:
+            response = self.get_response(request)
+        total = time.perf_counter() - started
+        response["Server-Timing"] = server_timing(metrics, total)
+        log_request(request, response, metrics, total)
+        return response
+
+
+def _view_name(request):
+    match = request.resolver_match
+    # Неразрешённые адреса сведены в одну метку, чтобы их число не росло.
+    return match.view_name if match else "unknown"
+
+
+def _ms(seconds):
+    return round(seconds * 1000, 2)
+
+
+def server_timing(metrics, total):
+    entries = []
+    for metric, name, description in TIMED_METRICS:
+        count = metrics.count(metric)
+        if count:
+            entries.append(
+                f'{name};dur={_ms(metrics.seconds(metric))};'
+                f'desc="{count} {description}"'
+            )
+    hits, misses = metrics.count("cache_hit"), metrics.count("cache_miss")
+    if hits or misses:
+        entries.append(f'cache;desc="hit={hits} miss={misses}"')
+    entries.append(f"total;dur={_ms(total)}")
+    return ", ".join(entries)
+
+
+def log_request(request, response, metrics, total):
+    fields = {
+        "view": _view_name(request),
+        "method": request.method,
+        "status": response.status_code,
+        "total_ms": _ms(total),
+        "queries": metrics.count("db"),
+        "db_ms": _ms(metrics.seconds("db")),
+        "template_ms": _ms(metrics.seconds("template")),
+        "cache_hits": metrics.count("cache_hit"),
+        "cache_misses": metrics.count("cache_miss"),
+        "thumbnails": metrics.count("thumbnail"),
+    }
+    logger.info(
+        " ".join(f"{name}={value}" for name, value in fields.items()),
+        extra={"timing": fields},
+    )
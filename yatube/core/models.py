@@ -10,3 +10,26 @@ class CreatedModel(models.Model):
 
     class Meta:
         abstract = True
+
+
+class SlowQuery(models.Model):
+    """Медленный SQL-запрос; одинаковые запросы с разными значениями
+    параметров сведены в одну запись по отпечатку."""
+    fingerprint = models.CharField(max_length=40, unique=True)
+    sql = models.TextField("Запрос")
+    plan = models.TextField("План запроса", blank=True)
+    view = models.CharField("Представление", max_length=200)
+    stack = models.TextField("Стек вызовов", blank=True)
+    count = models.PositiveIntegerField("Число случаев", default=1)
+    total_time = models.FloatField("Суммарное время, с")
+    max_time = models.FloatField("Наибольшее время, с")
+    first_seen = models.DateTimeField("Первый раз", auto_now_add=True)
+    last_seen = models.DateTimeField("Последний раз", auto_now=True)
+
+    class Meta:
+        ordering = ("-total_time",)
+        verbose_name = "Медленный запрос"
+        verbose_name_plural = "Медленные запросы"
+
+    def __str__(self):
+        return self.sql[:50]
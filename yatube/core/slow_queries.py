@@ -0,0 +1,102 @@
+"""Журнал медленных SQL-запросов.
+
+QueryTimer из core.timing отмечает запросы дольше SLOW_QUERY_THRESHOLD
+секунд, а MetricsMiddleware после ответа — вне транзакции запроса —
+сохраняет их через record(). Запросы, отличающиеся только значениями,
+сводятся в одну запись SlowQuery по отпечатку нормализованного SQL;
+план выполнения снимается один раз, при первом появлении запроса.
+"""
+import hashlib
+import logging
+import re
+
+from django.db import IntegrityError, connections, transaction
+from django.db.models import F, Value
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from .models import SlowQuery
+
+logger = logging.getLogger(__name__)
+
+STRING_RE = re.compile(r"'(?:[^']|'')*'")
+NUMBER_RE = re.compile(r"\b\d+(?:\.\d+)?\b")
+IN_LIST_RE = re.compile(r"\(\s*(?:%s|\?)(?:\s*,\s*(?:%s|\?))*\s*\)")
+SPACE_RE = re.compile(r"\s+")
+EXPLAINABLE = ("SELECT", "WITH", "INSERT", "UPDATE", "DELETE")
+
+
+def normalize(sql):
+    """SQL без значений: строки и числа — «?», списки IN — «(...)»."""
+    sql = STRING_RE.sub("?", sql)
+    sql = NUMBER_RE.sub("?", sql)
+    sql = IN_LIST_RE.sub("(...)", sql)
+    return SPACE_RE.sub(" ", sql).strip()
+
+
+def fingerprint(sql):
+    return hashlib.sha1(normalize(sql).encode()).hexdigest()
+
+
+def _explainable(sql):
+    return sql.lstrip().upper().startswith(EXPLAINABLE)
+
+
+def explain(alias, sql, params):
+    """План запроса или пустая строка, если его не снять."""
+    if not _explainable(sql):
+        return ""
+    connection = connections[alias]
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"{connection.ops.explain_query_prefix()} {sql}", params
+            )
+            rows = cursor.fetchall()
+    except Exception:
+        logger.exception("EXPLAIN failed for %s", sql)
+        return ""
+    # SQLite отдаёт (id, parent, notused, detail), PostgreSQL — строку.
+    return "\n".join(str(row[-1]) for row in rows)
+
+
+def record(queries, view):
+    """Сохраняет медленные запросы, снятые QueryTimer за один запрос."""
+    for alias, sql, params, seconds, stack in queries:
+        if not _explainable(sql):
+            # SAVEPOINT и прочее управление транзакциями.
+            continue
+        key = fingerprint(sql)
+        logger.warning(
+            "Slow query %.1f ms in %s [%s]: %s",
+            seconds * 1000, view, key[:8], sql,
+        )
+        updated = SlowQuery.objects.filter(fingerprint=key).update(
+            count=F("count") + 1,
+            total_time=F("total_time") + seconds,
+            max_time=Greatest("max_time", Value(seconds)),
+            view=view,
+            stack=stack,
+            # update() не заполняет auto_now.
+            last_seen=timezone.now(),
+        )
+        if updated:
+            continue
+        try:
+            with transaction.atomic():
+                SlowQuery.objects.create(
+                    fingerprint=key,
+                    sql=normalize(sql),
+                    plan=explain(alias, sql, params),
+                    view=view,
+                    stack=stack,
+                    total_time=seconds,
+                    max_time=seconds,
+                )
+        except IntegrityError:
+            # Другой процесс успел создать запись: просто учитываем случай.
+            SlowQuery.objects.filter(fingerprint=key).update(
+                count=F("count") + 1,
+                total_time=F("total_time") + seconds,
+                last_seen=timezone.now(),
+            )
@@ -0,0 +1,25 @@
+"""Шаблоны Django с замером времени отрисовки для Server-Timing.
+
+    TEMPLATES = [{"BACKEND": "core.template_backends.DjangoTemplates", ...}]
+
+Замеряется отрисовка шаблона целиком: {% include %} и {% extends %}
+входят во время внешнего шаблона. Сюда же попадают SQL-запросы, которые
+выполняются при отрисовке, — их время есть и в метрике db.
+"""
+from django.template.backends import django as django_backend
+
+from . import timing
+
+
+class Template(django_backend.Template):
+    def render(self, context=None, request=None):
+        with timing.measure("template"):
+            return super().render(context, request)
+
+
+class DjangoTemplates(django_backend.DjangoTemplates):
+    def from_string(self, template_code):
+        return Template(super().from_string(template_code).template, self)
+
+    def get_template(self, template_name):
+        return Template(super().get_template(template_name).template, self)
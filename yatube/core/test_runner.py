@@ -0,0 +1,38 @@
+import copy
+import os
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+from core import metrics
+
+
+class RuntimeDirTestRunner(DiscoverRunner):
+    """Запускает тесты с общим кэшем и метриками во временном каталоге.
+
+    Иначе тесты писали бы в RUNTIME_DIR установки и видели бы чужие
+    записи, например поколение контента от запущенного сервера.
+    """
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self.runtime_dir = tempfile.mkdtemp(prefix="yatube-tests-")
+        caches = copy.deepcopy(settings.CACHES)
+        caches["shared"]["LOCATION"] = os.path.join(
+            self.runtime_dir, "shared-cache.sqlite3"
+        )
+        self.runtime_settings = override_settings(
+            RUNTIME_DIR=self.runtime_dir, CACHES=caches,
+            METRICS_PATH=os.path.join(self.runtime_dir, "metrics.sqlite3"),
+        )
+        self.runtime_settings.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        # Накопленное сбрасывается сейчас, а не при выходе в настоящий файл.
+        metrics.store.flush()
+        self.runtime_settings.disable()
+        shutil.rmtree(self.runtime_dir, ignore_errors=True)
+        super().teardown_test_environment(**kwargs)
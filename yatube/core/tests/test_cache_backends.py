@@ -0,0 +1,87 @@
+import shutil
+import tempfile
+import time
+from os import path
+
+from django.core.cache import caches
+from django.test import SimpleTestCase, override_settings
+
+from core import timing
+
+TEMP_CACHE_DIR = tempfile.mkdtemp()
+
+
+def sqlite_cache(**options):
+    return {
+        "default": {
+            "BACKEND": "core.cache_backends.SQLiteCache",
+            "LOCATION": path.join(TEMP_CACHE_DIR, "cache.sqlite3"),
+            "OPTIONS": options,
+        }
+    }
+
+
+@override_settings(CACHES=sqlite_cache(MAX_ENTRIES=10))
+class SQLiteCacheTests(SimpleTestCase):
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_CACHE_DIR, ignore_errors=True)
+
+    def setUp(self):
+        self.cache = caches["default"]
+        self.cache.clear()
+
+    def test_basic_operations(self):
+        """Кэш поддерживает set/get/add/incr/delete."""
+        self.cache.set("key", {"value": 1})
+        self.assertEqual(self.cache.get("key"), {"value": 1})
+        self.assertFalse(self.cache.add("key", "other"))
+        self.assertTrue(self.cache.add("counter", 1))
+        self.assertEqual(self.cache.incr("counter", 5), 6)
+        self.cache.delete("key")
+        self.assertIsNone(self.cache.get("key"))
+        with self.assertRaises(ValueError):
+            self.cache.incr("missing")
+
+    def test_hits_and_misses_are_counted(self):
+        """get и get_many считают попадания и промахи."""
+        self.cache.set("key", "value")
+        with timing.collect() as metrics:
+            self.assertEqual(self.cache.get("key"), "value")
+            self.assertIsNone(self.cache.get("missing"))
+            self.assertEqual(
+                self.cache.get_many(["key", "missing"]), {"key": "value"}
+            )
+        self.assertEqual(metrics.count("cache_hit"), 2)
+        self.assertEqual(metrics.count("cache_miss"), 2)
+
+    def test_expired_entries_are_not_returned(self):
+        """Просроченные записи не читаются."""
+        self.cache.set("key", "value", 0.01)
+        time.sleep(0.02)
+        self.assertIsNone(self.cache.get("key"))
+
+    def test_least_recently_used_entries_are_culled(self):
+        """При переполнении вытесняются давно не читавшиеся записи."""
+        for i in range(10):
+            self.cache.set(f"key-{i}", i)
+        self.cache._db.execute(
+            "UPDATE cache SET accessed = accessed - 100 WHERE key != ?",
+            (self.cache.make_key("key-0"),),
+        )
+        self.cache.set("key-10", 10)
+        self.assertEqual(self.cache.get("key-0"), 0)
+        self.assertEqual(self.cache.get("key-10"), 10)
+        self.assertLessEqual(len(self.cache.get_many(
+            [f"key-{i}" for i in range(11)]
+        )), 10)
+
+    def test_size_cap_is_enforced(self):
+        """Суммарный размер записей не превышает MAX_SIZE."""
+        with override_settings(CACHES=sqlite_cache(MAX_SIZE=4096)):
+            cache = caches["default"]
+            for i in range(20):
+                cache.set(f"blob-{i}", b"x" * 1024)
+            size = cache._db.execute("SELECT size FROM stats").fetchone()[0]
+            self.assertLessEqual(size, 4096)
@@ -0,0 +1,128 @@
+import multiprocessing
+import os
+import shutil
+import tempfile
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from core import metrics
+
+User = get_user_model()
+
+TEMP_METRICS_DIR = tempfile.mkdtemp()
+
+
+def _observe_in_child():
+    metrics.REQUEST_DURATION.observe(0.2, view="child")
+    metrics.store.flush()
+
+
+@override_settings(
+    METRICS_PATH=os.path.join(TEMP_METRICS_DIR, "metrics.sqlite3"),
+    METRICS_TOKEN="secret",
+)
+class MetricsTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username="Test_Author")
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_METRICS_DIR, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()
+        metrics.store.clear()
+        self.client = Client()
+
+    def _exposition(self):
+        response = self.client.get(
+            reverse("metrics"), HTTP_AUTHORIZATION="Bearer secret"
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response["Content-Type"].startswith("text/plain"))
+        return response.content.decode()
+
+    def test_views_are_observed(self):
+        for _ in range(2):
+            self.client.get(reverse("posts:index"))
+        self.client.get(reverse("posts:profile", args=("Test_Author",)))
+        text = self._exposition()
+        self.assertIn("# TYPE yatube_request_duration_seconds histogram", text)
+        self.assertIn(
+            'yatube_request_duration_seconds_count{view="posts:index"} 2',
+            text,
+        )
+        self.assertIn(
+            'yatube_request_queries_bucket{view="posts:index",le="+Inf"} 2',
+            text,
+        )
+        self.assertIn(
+            'yatube_request_duration_seconds_count{view="posts:profile"} 1',
+            text,
+        )
+        self.assertIn(
+            'yatube_cache_lookups_total{view="posts:index",result="hit"}',
+            text,
+        )
+
+    def test_upload_sizes(self):
+        client = Client()
+        client.force_login(self.author)
+        client.post(reverse("posts:post_create"), {
+            "text": "Пост",
+            "image": SimpleUploadedFile("file.gif", b"x" * 20000),
+        })
+        text = self._exposition()
+        labels = 'view="posts:post_create"'
+        self.assertIn(
+            f'yatube_upload_bytes_bucket{{{labels},le="10000"}} 0', text
+        )
+        self.assertIn(
+            f'yatube_upload_bytes_bucket{{{labels},le="100000"}} 1', text
+        )
+        self.assertIn(f"yatube_upload_bytes_sum{{{labels}}} 20000", text)
+
+    def test_processes_share_store(self):
+        metrics.REQUEST_DURATION.observe(0.02, view="child")
+        process = multiprocessing.get_context("fork").Process(
+            target=_observe_in_child
+        )
+        process.start()
+        process.join()
+        self.assertEqual(process.exitcode, 0)
+        text = self._exposition()
+        # Наблюдение родителя не попало в файл дважды через копию буфера.
+        self.assertIn(
+            'yatube_request_duration_seconds_count{view="child"} 2', text
+        )
+        self.assertIn(
+            "yatube_request_duration_seconds_bucket"
+            '{view="child",le="0.025"} 1',
+            text,
+        )
+
+    def test_forbidden_without_token(self):
+        """Локальный адрес (как за прокси) сам по себе доступа не даёт."""
+        for extra in ({}, {"HTTP_AUTHORIZATION": "Bearer wrong"}):
+            with self.subTest(extra=extra):
+                response = self.client.get(
+                    reverse("metrics"), REMOTE_ADDR="127.0.0.1", **extra
+                )
+                self.assertEqual(response.status_code, 403)
+
+    @override_settings(METRICS_TOKEN="")
+    def test_staff_only_without_token(self):
+        response = self.client.get(
+            reverse("metrics"), HTTP_AUTHORIZATION="Bearer "
+        )
+        self.assertEqual(response.status_code, 403)
+        staff = User.objects.create_user(username="Staff", is_staff=True)
+        self.client.force_login(staff)
+        self.assertEqual(self.client.get(reverse("metrics")).status_code, 200)
@@ -0,0 +1,81 @@
+import re
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from core import timing
+from posts.models import Post
+
+User = get_user_model()
+
+ENTRY_RE = re.compile(r'(\w+);dur=([\d.]+)(?:;desc="(\d+) \w+")?')
+
+
+@override_settings(SERVER_TIMING_SAMPLE_RATE=1)
+class ServerTimingMiddlewareTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username="Test_Author")
+        Post.objects.create(text="Тестовый пост", author=cls.author)
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+
+    def _entries(self, response):
+        return {
+            name: (float(duration), int(count) if count else None)
+            for name, duration, count in ENTRY_RE.findall(
+                response["Server-Timing"]
+            )
+        }
+
+    def test_header_and_log_line(self):
+        with self.assertLogs("core.middleware", "INFO") as logs:
+            response = self.client.get(reverse("posts:index"))
+        entries = self._entries(response)
+        self.assertGreater(entries["db"][1], 0)
+        self.assertEqual(entries["tpl"][1], 1)
+        self.assertGreaterEqual(entries["total"][0], entries["tpl"][0])
+        self.assertIn('cache;desc="hit=', response["Server-Timing"])
+        record = logs.records[0]
+        self.assertEqual(record.timing["view"], "posts:index")
+        self.assertEqual(record.timing["queries"], entries["db"][1])
+        self.assertIn(
+            "view=posts:index method=GET status=200", record.getMessage()
+        )
+
+    def test_cache_hits_on_repeated_page(self):
+        url = reverse("posts:index")
+        with self.assertLogs("core.middleware", "INFO") as logs:
+            self.client.get(url)
+            self.client.get(url)
+        first, second = (record.timing for record in logs.records)
+        self.assertGreater(first["cache_misses"], 0)
+        self.assertGreater(second["cache_hits"], first["cache_hits"])
+        self.assertLess(second["queries"], first["queries"])
+
+    @override_settings(SERVER_TIMING_SAMPLE_RATE=0)
+    def test_unsampled_request_is_not_measured(self):
+        response = self.client.get(reverse("posts:index"))
+        self.assertNotIn("Server-Timing", response)
+
+
+class TimingTests(SimpleTestCase):
+    def test_nested_measure_is_counted_once(self):
+        with timing.collect() as metrics:
+            with timing.measure("template"):
+                with timing.measure("template"):
+                    pass
+            timing.add("cache_hit", 2)
+        self.assertEqual(metrics.count("template"), 1)
+        self.assertEqual(metrics.count("cache_hit"), 2)
+
+    def test_nothing_is_collected_outside_request(self):
+        timing.add("cache_hit")
+        with timing.measure("template"):
+            pass
+        self.assertIsNone(timing.current())
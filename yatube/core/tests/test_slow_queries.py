@@ -0,0 +1,80 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from core.models import SlowQuery
+from core.slow_queries import fingerprint, normalize
+from posts.models import Post
+
+User = get_user_model()
+
+
+class NormalizeTests(TestCase):
+    def test_values_are_removed(self):
+        self.assertEqual(
+            normalize(
+                "SELECT * FROM t WHERE a = 'x''y' AND b IN (%s, %s,  %s)\n"
+                "LIMIT 20 OFFSET 40"
+            ),
+            "SELECT * FROM t WHERE a = ? AND b IN (...) LIMIT ? OFFSET ?",
+        )
+        self.assertEqual(
+            fingerprint("SELECT 1 FROM t WHERE id IN (%s)"),
+            fingerprint("SELECT 2 FROM t WHERE id IN (%s, %s)"),
+        )
+
+
+# Нулевой порог: медленным считается каждый запрос.
+@override_settings(SLOW_QUERY_THRESHOLD=0)
+class SlowQueryLogTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username="Test_Author")
+        Post.objects.create(text="Тестовый пост", author=cls.author)
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+
+    def _index_query(self):
+        return SlowQuery.objects.get(
+            view="posts:index", sql__contains='FROM "posts_post"',
+            sql__endswith="LIMIT ?",
+        )
+
+    def test_queries_are_logged_with_plan_and_stack(self):
+        with self.assertLogs("core.slow_queries", "WARNING"):
+            self.client.get(reverse("posts:index"))
+        query = self._index_query()
+        self.assertEqual(query.count, 1)
+        self.assertIn("posts_post", query.plan)
+        self.assertIn("posts/views.py", query.stack)
+        self.assertFalse(SlowQuery.objects.filter(sql__startswith="SAVEPOINT"))
+        cache.clear()
+        with self.assertLogs("core.slow_queries", "WARNING"):
+            self.client.get(reverse("posts:index"), {"page": 1})
+        query.refresh_from_db()
+        self.assertEqual(query.count, 2)
+        self.assertGreaterEqual(query.total_time, query.max_time)
+
+    def test_command_prints_top_offenders(self):
+        with self.assertLogs("core.slow_queries", "WARNING"):
+            self.client.get(reverse("posts:index"))
+        out = StringIO()
+        call_command("slow_queries", "--limit", "3", "--plan", stdout=out)
+        output = out.getvalue()
+        self.assertIn("1. ", output)
+        self.assertNotIn("4. ", output)
+        self.assertIn("posts:index", output)
+        call_command("slow_queries", "--clear", stdout=StringIO())
+        self.assertFalse(SlowQuery.objects.exists())
+
+    @override_settings(SLOW_QUERY_THRESHOLD=60)
+    def test_fast_queries_are_not_logged(self):
+        self.client.get(reverse("posts:index"))
+        self.assertFalse(SlowQuery.objects.exists())
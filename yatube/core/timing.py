@@ -0,0 +1,133 @@
+"""Метрики производительности текущего запроса.
+
+Middleware из core.middleware включают сбор на время запроса, а
+источники метрик — SQL, шаблоны, кэш, миниатюры — отмечают в нём время
+и число операций через measure() и add(). Вне сбора add() и measure()
+ничего не делают, поэтому обращения к ним почти ничего не стоят.
+"""
+import os
+import threading
+import time
+import traceback
+from contextlib import ExitStack, contextmanager
+
+from django.conf import settings
+from django.db import connections
+
+_local = threading.local()
+
+
+class RequestMetrics:
+    def __init__(self):
+        # Имя метрики -> [число операций, время в секундах].
+        self.values = {}
+        # (alias, sql, params, время, стек) запросов дольше
+        # SLOW_QUERY_THRESHOLD.
+        self.slow_queries = []
+        self._depth = {}
+
+    def add(self, name, count=1, seconds=0.0):
+        value = self.values.setdefault(name, [0, 0.0])
+        value[0] += count
+        value[1] += seconds
+
+    def count(self, name):
+        return self.values.get(name, (0, 0.0))[0]
+
+    def seconds(self, name):
+        return self.values.get(name, (0, 0.0))[1]
+
+
+def current():
+    """Метрики текущего запроса или None."""
+    return getattr(_local, "metrics", None)
+
+
+@contextmanager
+def collect():
+    """Собирает метрики внутри блока и отдаёт их.
+
+    SQL-запросы перехватываются на всех соединениях. Вложенный collect()
+    отдаёт уже идущий сбор, так что запросы не считаются дважды.
+    """
+    metrics = current()
+    if metrics is not None:
+        yield metrics
+        return
+    metrics = RequestMetrics()
+    _local.metrics = metrics
+    try:
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(
+                    connection.execute_wrapper(QueryTimer(metrics))
+                )
+            yield metrics
+    finally:
+        _local.metrics = None
+
+
+def add(name, count=1, seconds=0.0):
+    metrics = current()
+    if metrics is not None:
+        metrics.add(name, count, seconds)
+
+
+@contextmanager
+def measure(name):
+    """Время блока в метрику name.
+
+    Вложенные блоки с тем же именем не считаются повторно: шаблон,
+    отрисованный внутри другого шаблона, уже входит в его время.
+    """
+    metrics = current()
+    if metrics is None or metrics._depth.get(name):
+        yield
+        return
+    metrics._depth[name] = 1
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics._depth[name] = 0
+        metrics.add(name, seconds=time.perf_counter() - started)
+
+
+# Каталог проекта: в стеке медленного запроса остаются только его файлы,
+# кроме самих замеров.
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+INSTRUMENTATION = tuple(
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), name)
+    for name in ("timing.py", "middleware.py", "template_backends.py")
+)
+STACK_DEPTH = 8
+
+
+def _project_stack():
+    frames = [
+        frame for frame in traceback.extract_stack()
+        if frame.filename.startswith(PROJECT_DIR)
+        and not frame.filename.startswith(INSTRUMENTATION)
+    ]
+    return "".join(traceback.format_list(frames[-STACK_DEPTH:]))
+
+
+class QueryTimer:
+    """execute_wrapper: число SQL-запросов, их время и медленные запросы."""
+
+    def __init__(self, metrics):
+        self.metrics = metrics
+        self.threshold = settings.SLOW_QUERY_THRESHOLD
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            seconds = time.perf_counter() - started
+            self.metrics.add("db", seconds=seconds)
+            if seconds >= self.threshold and not many:
+                self.metrics.slow_queries.append((
+                    context["connection"].alias, sql, params, seconds,
+                    _project_stack(),
+                ))
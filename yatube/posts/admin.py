@@ -1,5 +1,6 @@
 from django.contrib import admin
-from posts.models import Group, Post, Follow, Comment
+from posts.models import Group, Post, Follow, Comment, ModerationFlag
+from posts.search import search_posts
 
 
 class PostAdmin(admin.ModelAdmin):
@@ -15,6 +16,12 @@ class PostAdmin(admin.ModelAdmin):
     list_filter = ("pub_date",)
     empty_value_display = "-пусто-"
 
+    def get_search_results(self, request, queryset, search_term):
+        # Поиск по полнотекстовому индексу вместо LIKE '%...%'.
+        if not search_term:
+            return queryset, False
+        return search_posts(queryset, search_term), False
+
 
 class GroupAdmin(admin.ModelAdmin):
     prepopulated_fields = {"slug": ("title")}
@@ -23,7 +30,13 @@ class GroupAdmin(admin.ModelAdmin):
     empty_value_display = "-пусто-"
 
 
+class ModerationFlagAdmin(admin.ModelAdmin):
+    list_display = ("kind", "object_id", "words", "flagged")
+    list_filter = ("kind",)
+
+
 admin.site.register(Post, PostAdmin)
 admin.site.register(Group)
 admin.site.register(Follow)
 admin.site.register(Comment)
+admin.site.register(ModerationFlag, ModerationFlagAdmin)
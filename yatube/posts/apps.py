@@ -1,5 +1,11 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 
 class PostsConfig(AppConfig):
     name = "posts"
+
+    def ready(self):
+        from . import signals, thumbnails  # noqa: F401
+
+        post_migrate.connect(signals.create_search_index, sender=self)
@@ -0,0 +1,40 @@
+"""Поколение контента для ключей фрагментного кэша.
+
+Любое изменение постов, групп, комментариев или подписок увеличивает
+поколение, и фрагменты со старым поколением в ключе больше не читаются.
+Поэтому фрагменты можно хранить долго и при этом сразу видеть изменения.
+
+Сами фрагменты лежат в кэше процесса, а поколение — в кэше GENERATION_CACHE,
+общем для всех воркеров: изменение, сделанное в одном воркере, сразу
+отменяет фрагменты остальных.
+"""
+import time
+
+from django.core.cache import caches
+
+GENERATION_CACHE = "shared"
+GENERATION_KEY = "posts:content-generation"
+
+
+def _initial_generation():
+    # Если ключ вытеснен из кэша, новое поколение не должно совпасть
+    # ни с одним из тех, что уже встречались в ключах фрагментов.
+    return int(time.time() * 1000)
+
+
+def content_generation():
+    cache = caches[GENERATION_CACHE]
+    generation = cache.get(GENERATION_KEY)
+    if generation is None:
+        cache.add(GENERATION_KEY, _initial_generation(), None)
+        generation = cache.get(GENERATION_KEY, _initial_generation())
+    return generation
+
+
+def bump_content_generation():
+    cache = caches[GENERATION_CACHE]
+    try:
+        return cache.incr(GENERATION_KEY)
+    except ValueError:
+        cache.add(GENERATION_KEY, _initial_generation(), None)
+        return cache.get(GENERATION_KEY)
@@ -0,0 +1,113 @@
+"""Денормализованные счётчики постов, подписок и комментариев.
+
+Счётчики меняются атомарными UPDATE ... SET x = x + 1 из сигналов
+записи Post, Comment и Follow. Дрейф, если он всё-таки появился,
+исправляет команда reconcile_counters; до неё уменьшение не опускает
+счётчик ниже нуля, чтобы не нарушить CHECK и не сорвать удаление.
+"""
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce, Greatest
+
+from .models import Comment, Follow, Post, User, UserCounters
+
+USER_COUNTERS = {
+    "posts_count": (Post, "author"),
+    "followers_count": (Follow, "author"),
+    "following_count": (Follow, "user"),
+}
+
+
+def _count_subquery(model, field):
+    counted = (
+        model.objects.filter(**{field: OuterRef("pk")})
+        .order_by()
+        .values(field)
+        .annotate(total=Count("pk"))
+        .values("total")
+    )
+    return Coalesce(Subquery(counted), 0)
+
+
+def actual_user_counters(user_ids):
+    """Точные значения счётчиков, посчитанные по таблицам."""
+    annotations = {
+        name: _count_subquery(model, field)
+        for name, (model, field) in USER_COUNTERS.items()
+    }
+    return (
+        User.objects.filter(pk__in=user_ids)
+        .annotate(**annotations)
+        .values("pk", *USER_COUNTERS)
+    )
+
+
+def recount_user(user_id):
+    """Пересчитывает счётчики пользователя и сохраняет их."""
+    for row in actual_user_counters([user_id]):
+        row.pop("pk")
+        counters, _ = UserCounters.objects.update_or_create(
+            user_id=user_id, defaults=row
+        )
+        return counters
+    return None
+
+
+def recount_users(user_ids):
+    """Пересчитывает счётчики пользователей одним запросом на пачку."""
+    with transaction.atomic():
+        for row in actual_user_counters(user_ids):
+            pk = row.pop("pk")
+            UserCounters.objects.update_or_create(user_id=pk, defaults=row)
+
+
+def counters_for(user):
+    """Счётчики пользователя; отсутствующая строка создаётся пересчётом."""
+    try:
+        return user.counters
+    except UserCounters.DoesNotExist:
+        return recount_user(user.pk)
+
+
+def _shifted(name, delta):
+    # Разошедшийся до нуля счётчик при уменьшении остаётся нулём.
+    return Greatest(F(name) + delta, 0)
+
+
+def _change_user_counter(user_id, name, delta):
+    updated = UserCounters.objects.filter(user_id=user_id).update(
+        **{name: _shifted(name, delta)}
+    )
+    if updated:
+        return
+    if delta > 0:
+        # Строки ещё нет: пересчёт уже учитывает текущую запись.
+        recount_user(user_id)
+    else:
+        # При удалении пользователь может удаляться каскадно: строка,
+        # созданная сейчас, осталась бы без него. После коммита пересчёт
+        # удалённого пользователя ничего не создаёт.
+        transaction.on_commit(lambda: recount_user(user_id))
+
+
+def post_added(post, delta=1):
+    _change_user_counter(post.author_id, "posts_count", delta)
+
+
+def follow_added(follow, delta=1):
+    _change_user_counter(follow.author_id, "followers_count", delta)
+    _change_user_counter(follow.user_id, "following_count", delta)
+
+
+def comment_added(comment, delta=1):
+    Post.objects.filter(pk=comment.post_id).update(
+        comments_count=_shifted("comments_count", delta)
+    )
+
+
+def actual_comment_counts(post_ids):
+    return (
+        Post.objects.filter(pk__in=post_ids)
+        .annotate(actual=_count_subquery(Comment, "post"))
+        .values_list("pk", "comments_count", "actual")
+    )
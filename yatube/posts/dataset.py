@@ -0,0 +1,293 @@
+"""Синтетические данные, похожие на боевые, для бенчмарков и нагрузки.
+
+Данные полностью определяются зерном: одни и те же параметры дают те же
+пользователей, посты, даты и подписки на любой машине.
+
+- Популярность авторов распределена по степенному закону: у немногих
+  большая часть подписчиков, они же пишут чаще остальных.
+- Посты идут сериями: автор пишет несколько постов за минуты, потом
+  надолго пропадает.
+- У части постов есть картинки из небольшого общего набора.
+- У нескольких постов длинные ветки комментариев, у остальных 0–3.
+
+Пользователи и группы собираются через mixer, тексты — через Faker из
+заранее сгенерированного набора: генерировать миллион текстов по одному
+слишком долго. Запись идёт через bulk_create пачками, счётчики, поиск и
+ленты обновляются один раз в конце, как после import_content.
+"""
+import io
+import random
+from datetime import datetime, timedelta
+from itertools import accumulate
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+from mixer.backend.django import Mixer
+from PIL import Image, ImageDraw
+
+from .importer import finalize_import, keep_dates
+from .models import Comment, Follow, Group, Post, User
+
+# Последняя дата постов: от неё отсчитывается период, чтобы данные не
+# зависели от дня запуска.
+END = datetime(2024, 1, 1, tzinfo=timezone.utc)
+# Показатели степенного закона для подписчиков, числа постов и групп.
+FOLLOWERS_ALPHA = 1.1
+POSTS_ALPHA = 0.8
+GROUPS_ALPHA = 1.0
+# Число подписок пользователя: распределение Парето, не больше MAX.
+FOLLOWING_SHAPE = 1.2
+FOLLOWING_SCALE = 3
+MAX_FOLLOWING = 500
+# Серия постов: средний размер и средняя пауза между постами в секундах.
+BURST_SIZE = 4
+BURST_GAP = 300
+GROUP_RATIO = 2 / 3
+HOT_THREAD = (100, 1000)
+IMAGES = 10
+TEXTS = 1000
+
+
+def _cum_weights(count, alpha):
+    """Накопленные веса Ципфа: у i-го элемента вес 1 / (i + 1) ** alpha."""
+    return list(accumulate(1 / (rank + 1) ** alpha for rank in range(count)))
+
+
+class DatasetGenerator:
+    def __init__(self, seed=0, users=1000, posts=10000, groups=20,
+                 days=365, image_ratio=0.1, hot_ratio=0.001,
+                 batch_size=5000):
+        self.seed = seed
+        self.users = users
+        self.posts = posts
+        self.groups = groups
+        self.days = days
+        self.image_ratio = image_ratio
+        self.hot_ratio = hot_ratio
+        self.batch_size = batch_size
+        self.random = random.Random(seed)
+        self.mixer = Mixer(commit=False, locale="ru_RU")
+        self.faker = self.mixer.faker
+        self.stats = dict.fromkeys(
+            ("users", "groups", "follows", "posts", "comments", "images"), 0
+        )
+
+    def run(self, progress=None):
+        """Создаёт данные. ValueError, если с этим зерном они уже есть."""
+        # mixer берёт случайные значения и из модуля random.
+        random.seed(self.seed)
+        self.faker.seed_instance(self.seed)
+        marks = {
+            "post_id": Post.objects.aggregate(last=Max("id"))["last"] or 0,
+            "follow_id": Follow.objects.aggregate(last=Max("id"))["last"] or 0,
+        }
+        user_ids = self._create_users()
+        group_ids = self._create_groups()
+        self._create_follows(user_ids)
+        self._create_posts(user_ids, group_ids, progress)
+        finalize_import(**marks)
+        return self.stats
+
+    def _username(self, number):
+        # Номер после «_» делает имена уникальными.
+        return f"{self.faker.user_name()}_{number}"
+
+    def _create_users(self):
+        # Порядок в списке — ранг популярности: первые пользователи самые
+        # популярные.
+        user_ids = []
+        for start in range(0, self.users, self.batch_size):
+            usernames = [
+                self._username(number) for number in range(
+                    start, min(start + self.batch_size, self.users)
+                )
+            ]
+            if not start and User.objects.filter(
+                username=usernames[0]
+            ).exists():
+                raise ValueError(f"Данные с зерном {self.seed} уже созданы")
+            users = self.mixer.cycle(len(usernames)).blend(
+                User, username=(name for name in usernames), password="!"
+            )
+            with transaction.atomic():
+                User.objects.bulk_create(users)
+            # SQLite не возвращает id из bulk_create.
+            ids = dict(
+                User.objects.filter(username__in=usernames)
+                .values_list("username", "id")
+            )
+            user_ids.extend(ids[username] for username in usernames)
+        self.stats["users"] = len(user_ids)
+        return user_ids
+
+    def _create_groups(self):
+        slugs = [f"group-{self.seed}-{number}" for number in range(
+            self.groups
+        )]
+        groups = self.mixer.cycle(self.groups).blend(
+            Group,
+            slug=(slug for slug in slugs),
+            title=self.mixer.faker.catch_phrase,
+            description=self.mixer.faker.sentence,
+        )
+        Group.objects.bulk_create(groups)
+        ids = dict(
+            Group.objects.filter(slug__in=slugs).values_list("slug", "id")
+        )
+        self.stats["groups"] = len(ids)
+        return [ids[slug] for slug in slugs]
+
+    def _create_follows(self, user_ids):
+        weights = _cum_weights(len(user_ids), FOLLOWERS_ALPHA)
+        follows = []
+        for user_id in user_ids:
+            count = min(
+                int(self.random.paretovariate(FOLLOWING_SHAPE)
+                    * FOLLOWING_SCALE),
+                MAX_FOLLOWING,
+                len(user_ids) - 1,
+            )
+            authors = set(self.random.choices(
+                user_ids, cum_weights=weights, k=count
+            ))
+            authors.discard(user_id)
+            follows.extend(
+                Follow(user_id=user_id, author_id=author_id)
+                for author_id in sorted(authors)
+            )
+            if len(follows) >= self.batch_size:
+                self._save_follows(follows)
+                follows = []
+        self._save_follows(follows)
+
+    def _save_follows(self, follows):
+        with transaction.atomic():
+            Follow.objects.bulk_create(follows, batch_size=self.batch_size)
+        self.stats["follows"] += len(follows)
+
+    def _timestamps(self):
+        """Даты постов по возрастанию и номер серии каждого поста."""
+        offsets, bursts = [], []
+        offset, burst = 0.0, 0
+        # Паузы между сериями подобраны так, чтобы серии в среднем
+        # заняли весь период; в конце даты ещё и масштабируются.
+        pause = self.days * 86400 * BURST_SIZE / max(self.posts, 1)
+        while len(offsets) < self.posts:
+            offset += self.random.expovariate(1 / pause)
+            size = 1 + int(self.random.expovariate(1 / (BURST_SIZE - 1)))
+            for _ in range(min(size, self.posts - len(offsets))):
+                offset += self.random.expovariate(1 / BURST_GAP)
+                offsets.append(offset)
+                bursts.append(burst)
+            burst += 1
+        scale = self.days * 86400 / offsets[-1] if offsets else 1
+        start = END - timedelta(days=self.days)
+        dates = [start + timedelta(seconds=value * scale) for value in offsets]
+        return dates, bursts
+
+    def _images(self):
+        """Небольшой набор картинок, общий для всех постов с картинками.
+
+        Картинки зависят только от зерна, поэтому уже сохранённые файлы
+        используются повторно.
+        """
+        names = []
+        for number in range(IMAGES):
+            image = Image.new("RGB", (640, 480), tuple(
+                self.random.randrange(256) for _ in range(3)
+            ))
+            ImageDraw.Draw(image).ellipse(
+                (160, 120, 480, 360),
+                fill=tuple(self.random.randrange(256) for _ in range(3)),
+            )
+            name = f"posts/dataset-{self.seed}-{number}.jpg"
+            if not default_storage.exists(name):
+                buffer = io.BytesIO()
+                image.save(buffer, "JPEG", quality=85)
+                name = default_storage.save(
+                    name, ContentFile(buffer.getvalue())
+                )
+            names.append(name)
+        self.stats["images"] = len(names)
+        return names
+
+    def _comment_count(self):
+        if self.random.random() < self.hot_ratio:
+            return self.random.randint(*HOT_THREAD)
+        return min(int(self.random.expovariate(1.0)), 3)
+
+    def _create_posts(self, user_ids, group_ids, progress):
+        self.texts = [
+            self.faker.text(self.random.choice((100, 300, 1000)))
+            for _ in range(TEXTS)
+        ]
+        self.replies = [self.faker.text(100) for _ in range(TEXTS)]
+        self.images = (
+            self._images() if self.image_ratio and self.posts else []
+        )
+        author_weights = _cum_weights(len(user_ids), POSTS_ALPHA)
+        self.group_weights = _cum_weights(len(group_ids), GROUPS_ALPHA)
+        dates, bursts = self._timestamps()
+        author_id, burst = None, None
+        posts = []
+        for number, date in enumerate(dates):
+            if bursts[number] != burst:
+                # Вся серия принадлежит одному автору.
+                burst = bursts[number]
+                author_id = self.random.choices(
+                    user_ids, cum_weights=author_weights
+                )[0]
+            posts.append(self._build_post(author_id, group_ids, date))
+            if len(posts) == self.batch_size or number == len(dates) - 1:
+                with transaction.atomic():
+                    self._save_posts(posts, user_ids)
+                posts = []
+                if progress is not None:
+                    progress(number + 1)
+
+    def _build_post(self, author_id, group_ids, date):
+        group_id = None
+        if group_ids and self.random.random() < GROUP_RATIO:
+            group_id = self.random.choices(
+                group_ids, cum_weights=self.group_weights
+            )[0]
+        image = ""
+        if self.images and self.random.random() < self.image_ratio:
+            image = self.random.choice(self.images)
+        return Post(
+            author_id=author_id,
+            group_id=group_id,
+            text=self.random.choice(self.texts),
+            pub_date=date,
+            edited=date,
+            image=image,
+            comments_count=self._comment_count(),
+        )
+
+    def _save_posts(self, posts, user_ids):
+        last_id = Post.objects.aggregate(last=Max("id"))["last"] or 0
+        with keep_dates(Post, "pub_date", "edited"):
+            Post.objects.bulk_create(posts)
+        ids = Post.objects.filter(id__gt=last_id).order_by("id").values_list(
+            "id", flat=True
+        )
+        comments = []
+        for post, post_id in zip(posts, ids):
+            created = post.pub_date
+            for _ in range(post.comments_count):
+                created += timedelta(
+                    seconds=self.random.expovariate(1 / BURST_GAP)
+                )
+                comments.append(Comment(
+                    post_id=post_id,
+                    author_id=self.random.choice(user_ids),
+                    text=self.random.choice(self.replies),
+                    created=created,
+                ))
+        with keep_dates(Comment, "created"):
+            Comment.objects.bulk_create(comments)
+        self.stats["posts"] += len(posts)
+        self.stats["comments"] += len(comments)
@@ -0,0 +1,105 @@
+"""Потоковая выгрузка постов с комментариями в NDJSON или CSV.
+
+Посты читаются пачками по id, комментарии к пачке — одним запросом через
+iterator(), поэтому память не зависит от числа постов автора или группы.
+"""
+import csv
+import json
+
+from django.core.files.storage import default_storage
+from django.core.serializers.json import DjangoJSONEncoder
+
+from .models import Comment
+
+CHUNK_SIZE = 500
+FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+CSV_COLUMNS = (
+    "type", "id", "post", "author", "group", "pub_date", "image", "text"
+)
+POST_VALUES = (
+    "id", "text", "pub_date", "image", "author__username", "group__slug"
+)
+COMMENT_VALUES = ("id", "post_id", "author__username", "text", "created")
+
+
+def _post_chunks(posts):
+    last_pk = 0
+    while True:
+        chunk = list(
+            posts.filter(pk__gt=last_pk)
+            .order_by("pk")
+            .values(*POST_VALUES)[:CHUNK_SIZE]
+        )
+        if not chunk:
+            return
+        yield chunk
+        last_pk = chunk[-1]["id"]
+
+
+def export_posts(posts, base_url=""):
+    """Посты queryset по возрастанию id, у каждого список comments."""
+    for chunk in _post_chunks(posts):
+        threads = {row["id"]: [] for row in chunk}
+        comments = (
+            Comment.objects.filter(post_id__in=threads)
+            .order_by("post_id", "created", "id")
+            .values(*COMMENT_VALUES)
+        )
+        for comment in comments.iterator(chunk_size=CHUNK_SIZE):
+            threads[comment["post_id"]].append({
+                "id": comment["id"],
+                "author": comment["author__username"],
+                "text": comment["text"],
+                "created": comment["created"],
+            })
+        for row in chunk:
+            image = row["image"]
+            yield {
+                "id": row["id"],
+                "author": row["author__username"],
+                "group": row["group__slug"],
+                "pub_date": row["pub_date"],
+                "image": base_url + default_storage.url(image)
+                if image else None,
+                "text": row["text"],
+                "comments": threads[row["id"]],
+            }
+
+
+def to_ndjson(records):
+    for record in records:
+        yield json.dumps(record, cls=DjangoJSONEncoder, ensure_ascii=False)
+        yield "\n"
+
+
+class _Echo:
+    # csv.writer пишет строку в «файл» и сразу её отдаёт.
+    def write(self, value):
+        return value
+
+
+def to_csv(records):
+    """Строка поста, за ней строки его комментариев."""
+    writer = csv.writer(_Echo())
+    yield writer.writerow(CSV_COLUMNS)
+    for post in records:
+        yield writer.writerow((
+            "post", post["id"], "", post["author"], post["group"] or "",
+            post["pub_date"].isoformat(), post["image"] or "", post["text"],
+        ))
+        for comment in post["comments"]:
+            yield writer.writerow((
+                "comment", comment["id"], post["id"], comment["author"], "",
+                comment["created"].isoformat(), "", comment["text"],
+            ))
+
+
+def render_export(posts, file_format, base_url=""):
+    """Поток строк выгрузки в формате ndjson или csv."""
+    records = export_posts(posts, base_url)
+    if file_format == "csv":
+        return to_csv(records)
+    return to_ndjson(records)
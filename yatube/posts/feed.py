@@ -0,0 +1,132 @@
+"""Лента подписок с доставкой постов при записи (fan-out on write).
+
+Новый пост сразу раскладывается по inbox подписчиков автора, поэтому
+follow_index читает готовую ленту пользователя. Посты авторов, у которых
+подписчиков больше FANOUT_FOLLOWERS_LIMIT, не раскладываются, а
+подмешиваются в ленту при чтении.
+"""
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F, Q
+
+from .models import Follow, Inbox, Post, UserCounters
+
+# Поля, по которым сортируется и листается лента follow_feed.
+FEED_CURSOR = {"field": "feed_date", "tiebreak": "feed_post"}
+
+
+def _followers_limit():
+    return settings.FANOUT_FOLLOWERS_LIMIT
+
+
+def heavy_author_ids(author_ids):
+    """Авторы из author_ids, посты которых подмешиваются при чтении."""
+    return set(
+        UserCounters.objects.filter(
+            user__in=author_ids,
+            followers_count__gt=_followers_limit()
+        ).values_list("user", flat=True)
+    )
+
+
+def is_heavy_author(author_id):
+    return bool(heavy_author_ids([author_id]))
+
+
+def _bulk_insert(entries):
+    # Размер пачки Django подбирает сам под ограничения СУБД.
+    Inbox.objects.bulk_create(entries, ignore_conflicts=True)
+
+
+def fan_out_post(post):
+    """Раскладывает новый пост по inbox подписчиков автора."""
+    if is_heavy_author(post.author_id):
+        return
+    followers = Follow.objects.filter(
+        author=post.author_id
+    ).values_list("user", flat=True)
+    _bulk_insert(
+        Inbox(user_id=user_id, post_id=post.pk, pub_date=post.pub_date)
+        for user_id in followers.iterator()
+    )
+
+
+def backfill_inbox(user_id, author_id):
+    """Доставляет подписчику уже опубликованные посты автора."""
+    if is_heavy_author(author_id):
+        return
+    posts = Post.objects.filter(
+        author=author_id
+    ).values_list("id", "pub_date")
+    _bulk_insert(
+        Inbox(user_id=user_id, post_id=post_id, pub_date=pub_date)
+        for post_id, pub_date in posts.iterator()
+    )
+
+
+def prune_inbox(user_id, author_id):
+    """Убирает посты автора из ленты отписавшегося пользователя."""
+    Inbox.objects.filter(user=user_id, post__author=author_id).delete()
+    became_light = UserCounters.objects.filter(
+        user=author_id, followers_count=_followers_limit()
+    ).exists()
+    if became_light:
+        # Автор перестал быть «тяжёлым»: его посты больше не подмешиваются
+        # при чтении, поэтому доставляем их оставшимся подписчикам.
+        followers = Follow.objects.filter(author=author_id)
+        for follower_id in followers.values_list("user", flat=True):
+            backfill_inbox(follower_id, author_id)
+
+
+def follow_feed(user):
+    """Посты авторов, на которых подписан user, для follow_index.
+
+    Лента листается по полям FEED_CURSOR. Для доставленных постов они
+    берутся из Inbox, чтобы сортировка шла по индексу inbox_user_pub_date
+    без соединения с постами всей таблицы.
+    """
+    followed = Follow.objects.filter(user=user).values_list(
+        "author", flat=True
+    )
+    heavy = heavy_author_ids(followed)
+    if not heavy:
+        posts = Post.objects.filter(inbox_entries__user=user).annotate(
+            feed_date=F("inbox_entries__pub_date"),
+            feed_post=F("inbox_entries__post"),
+        )
+    else:
+        delivered = Inbox.objects.filter(user=user).values("post")
+        posts = Post.objects.filter(
+            Q(id__in=delivered) | Q(author__in=heavy)
+        ).annotate(feed_date=F("pub_date"), feed_post=F("id"))
+    return posts.order_by("-feed_date", "-feed_post")
+
+
+def rebuild_inboxes(user_ids=None):
+    """Пересобирает ленты с нуля. Возвращает число доставленных постов."""
+    inboxes = Inbox.objects.all()
+    follows = Follow.objects.all()
+    if user_ids is not None:
+        inboxes = inboxes.filter(user__in=user_ids)
+        follows = follows.filter(user__in=user_ids)
+    with transaction.atomic():
+        inboxes.delete()
+        heavy = heavy_author_ids(follows.values("author"))
+        # Одним INSERT ... SELECT: строка на каждую пару (подписка, пост
+        # автора). Старые записи удалены, так что конфликтов нет.
+        entries = (
+            follows.exclude(author__in=heavy)
+            .filter(author__posts__isnull=False)
+            .order_by()
+            .values_list(
+                "user", "author__posts__id", "author__posts__pub_date"
+            )
+        )
+        sql, params = entries.query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {Inbox._meta.db_table} "
+                f"(user_id, post_id, pub_date) {sql}",
+                params,
+            )
+    return inboxes.count()
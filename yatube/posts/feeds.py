@@ -0,0 +1,119 @@
+"""RSS и Atom: общая лента, ленты групп и авторов.
+
+Готовый ответ кэшируется по поколению контента (posts.cache): оно
+меняется при любой записи постов, групп, комментариев и подписок, в том
+числе при переименовании группы или переносе поста, которые не видны
+по датам постов. Поверх этого conditional_page отдаёт агрегаторам 304
+по ETag с тем же поколением.
+"""
+from django.contrib.syndication.views import Feed
+from django.core.cache import cache
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.utils.feedgenerator import Atom1Feed
+
+from core.decorators import conditional_page
+
+from .cache import content_generation
+from .models import Group, Post, User
+
+FEED_ITEMS = 20
+FEED_CACHE_TIMEOUT = 60 * 60 * 24
+
+
+class LatestPostsFeed(Feed):
+    title = "Yatube: последние записи"
+    description = "Новые записи всех авторов Yatube."
+
+    def posts_of(self, obj):
+        return Post.objects.all()
+
+    def link(self, obj):
+        return reverse("posts:index")
+
+    def items(self, obj):
+        posts = self.posts_of(obj).select_related("author", "group")
+        return posts[:FEED_ITEMS]
+
+    def item_title(self, item):
+        return item.text[:50]
+
+    def item_description(self, item):
+        return item.text
+
+    def item_link(self, item):
+        return reverse("posts:post_detail", args=(item.pk,))
+
+    def item_pubdate(self, item):
+        return item.pub_date
+
+    def item_updateddate(self, item):
+        return item.edited
+
+    def item_author_name(self, item):
+        return item.author.username
+
+    def item_categories(self, item):
+        return [item.group.title] if item.group else []
+
+
+class GroupFeed(LatestPostsFeed):
+    def posts_of(self, obj):
+        return Post.objects.filter(group=obj)
+
+    def get_object(self, request, slug):
+        return get_object_or_404(Group, slug=slug)
+
+    def title(self, obj):
+        return f"Yatube: {obj.title}"
+
+    def description(self, obj):
+        return obj.description
+
+    def link(self, obj):
+        return reverse("posts:group_list", args=(obj.slug,))
+
+
+class ProfileFeed(LatestPostsFeed):
+    def posts_of(self, obj):
+        return Post.objects.filter(author=obj)
+
+    def get_object(self, request, username):
+        return get_object_or_404(User, username=username)
+
+    def title(self, obj):
+        return f"Yatube: записи {obj.username}"
+
+    def description(self, obj):
+        return f"Новые записи пользователя {obj.username}."
+
+    def link(self, obj):
+        return reverse("posts:profile", args=(obj.username,))
+
+
+def _atom(feed_class):
+    return type(
+        f"Atom{feed_class.__name__}",
+        (feed_class,),
+        {"feed_type": Atom1Feed, "subtitle": feed_class.description},
+    )
+
+
+def feed_view(feed_class, atom=False):
+    """Представление ленты с кэшем ответа и условными GET."""
+    feed = _atom(feed_class)() if atom else feed_class()
+
+    def etag_parts(request, **kwargs):
+        return [content_generation()]
+
+    @conditional_page(etag_func=etag_parts)
+    def view(request, **kwargs):
+        key = "posts:feed:{}:{}:{}".format(
+            request.get_host(), request.path, content_generation()
+        )
+        response = cache.get(key)
+        if response is None:
+            response = feed(request, **kwargs)
+            cache.set(key, response, FEED_CACHE_TIMEOUT)
+        return response
+    return view
@@ -1,6 +1,9 @@
 from django import forms
+from django.core.files.uploadedfile import UploadedFile
 
+from .images import normalize_image
 from .models import Post, Comment
+from .moderation import ProfanityMatcher
 
 words_not_to_be_used = [
     "лох",
@@ -11,6 +14,20 @@ words_not_to_be_used = [
     "сосать",
     "хутин пуй",
 ]
+# Автомат строится один раз; при смене списка вызовите profanity.reload().
+profanity = ProfanityMatcher(words_not_to_be_used)
+
+
+def check_profanity(text):
+    bad_words = profanity.find(text)
+    if bad_words:
+        bad_list = ", ".join(bad_words)
+        raise forms.ValidationError(
+            "Поле должно быть заполнено,"
+            "но без ругани, "
+            f'"{bad_list}" запрещено использовать!'
+        )
+    return text
 
 
 class PostForm(forms.ModelForm):
@@ -19,19 +36,14 @@ class PostForm(forms.ModelForm):
         fields = ("text", "group", "image")
 
     def clean_text(self):
-        data = self.cleaned_data["text"]
-        bad_words = []
-        for i in words_not_to_be_used:
-            if i in data.lower():
-                bad_words += i + " "
-        if bad_words:
-            bad_list = ",".join(bad_words)
-            raise forms.ValidationError(
-                "Поле должно быть заполнено,"
-                "но без ругани, "
-                f'"{bad_list}" запрещено использовать!'
-            )
-        return data
+        return check_profanity(self.cleaned_data["text"])
+
+    def clean_image(self):
+        image = self.cleaned_data["image"]
+        # Уже сохранённую картинку (при редактировании) не трогаем.
+        if not isinstance(image, UploadedFile):
+            return image
+        return normalize_image(image)
 
 
 class CommentForm(forms.ModelForm):
@@ -39,15 +51,5 @@ class CommentForm(forms.ModelForm):
         model = Comment
         fields = ("text",)
 
-    def clean_subject(self):
-        data = self.cleaned_data["text"]
-        for i in words_not_to_be_used:
-            if i in data.lower():
-                bad_words = ""
-                bad_words += i
-            raise forms.ValidationError(
-                "Поле должно быть заполнено,"
-                "но без ругани, слова "
-                f'"{bad_words}" запрещено использовать!'
-            )
-        return data
+    def clean_text(self):
+        return check_profanity(self.cleaned_data["text"])
@@ -0,0 +1,141 @@
+"""Нормализация загружаемых картинок постов.
+
+Картинка проверяется по заголовку ещё до декодирования пикселей (защита
+от «декомпрессионных бомб»), поворачивается по EXIF, уменьшается до
+MAX_IMAGE_SIDE по большей стороне и пересохраняется без метаданных.
+Анимации уменьшаются и пересохраняются покадрово.
+"""
+import os
+from io import BytesIO
+
+from django.core.exceptions import ValidationError
+from django.core.files.uploadedfile import SimpleUploadedFile
+from PIL import Image, ImageOps, ImageSequence
+
+MAX_IMAGE_PIXELS = 40 * 1000 * 1000
+MAX_IMAGE_SIDE = 1920
+# Ошибки Pillow для битых файлов: заголовок цел, а данные обрезаны.
+BROKEN_IMAGE_ERRORS = (OSError, SyntaxError, ValueError)
+JPEG_QUALITY = 85
+
+# Форматы, которые сохраняются как есть; остальные перекодируются в JPEG
+# (или PNG, если у картинки есть прозрачность).
+KEPT_FORMATS = {"JPEG", "PNG", "GIF", "WEBP"}
+# Форматы, в которых анимация сохраняется; из остальных берётся первый кадр.
+ANIMATED_FORMATS = {"GIF", "PNG", "WEBP"}
+EXTENSIONS = {"JPEG": ".jpg", "PNG": ".png", "GIF": ".gif", "WEBP": ".webp"}
+CONTENT_TYPES = {
+    "JPEG": "image/jpeg",
+    "PNG": "image/png",
+    "GIF": "image/gif",
+    "WEBP": "image/webp",
+}
+
+
+def _open(uploaded):
+    uploaded.seek(0)
+    try:
+        image = Image.open(uploaded)
+    except Image.DecompressionBombError:
+        raise ValidationError(
+            "Картинка слишком большая.", code="image_too_large"
+        )
+    width, height = image.size
+    if width * height > MAX_IMAGE_PIXELS:
+        raise ValidationError(
+            "Картинка слишком большая: не больше %(limit)s мегапикселей.",
+            code="image_too_large",
+            params={"limit": MAX_IMAGE_PIXELS // 1000000},
+        )
+    return image
+
+
+def _target_format(image):
+    if image.format in KEPT_FORMATS:
+        return image.format
+    has_alpha = image.mode in ("RGBA", "LA") or "transparency" in image.info
+    return "PNG" if has_alpha else "JPEG"
+
+
+def _save_options(image_format):
+    if image_format == "JPEG":
+        return {"quality": JPEG_QUALITY, "optimize": True,
+                "progressive": True}
+    if image_format == "WEBP":
+        return {"quality": JPEG_QUALITY}
+    if image_format == "PNG":
+        return {"optimize": True}
+    return {}
+
+
+def _resize(image, image_format):
+    if image.format == "JPEG":
+        # Декодирование JPEG сразу в уменьшенном масштабе (DCT scaling):
+        # полноразмерная картинка в память не попадает.
+        image.draft("RGB", (MAX_IMAGE_SIDE, MAX_IMAGE_SIDE))
+    image = ImageOps.exif_transpose(image)
+    image.thumbnail((MAX_IMAGE_SIDE, MAX_IMAGE_SIDE), Image.LANCZOS)
+    if image_format == "JPEG" and image.mode not in ("RGB", "L"):
+        image = image.convert("RGB")
+    return image
+
+
+def _save(image, image_format):
+    options = _save_options(image_format)
+    if image_format in ("GIF", "PNG") and "transparency" in image.info:
+        options["transparency"] = image.info["transparency"]
+    buffer = BytesIO()
+    # Метаданные (EXIF, комментарии) не передаются в save и не сохраняются.
+    image.save(buffer, image_format, **options)
+    return buffer.getvalue()
+
+
+def _save_animation(image, image_format):
+    frames = []
+    durations = []
+    for frame in ImageSequence.Iterator(image):
+        durations.append(frame.info.get("duration", 100))
+        frame = frame.convert("RGBA")
+        # GIF берёт комментарий и прочее из info первого кадра.
+        frame.info = {}
+        frame.thumbnail((MAX_IMAGE_SIDE, MAX_IMAGE_SIDE), Image.LANCZOS)
+        frames.append(frame)
+    buffer = BytesIO()
+    frames[0].save(
+        buffer, image_format, save_all=True, append_images=frames[1:],
+        duration=durations, loop=image.info.get("loop", 0), disposal=2,
+    )
+    return buffer.getvalue()
+
+
+def normalize_image(uploaded):
+    """Возвращает нормализованную копию загруженной картинки."""
+    image = _open(uploaded)
+    image_format = _target_format(image)
+    frames = getattr(image, "n_frames", 1)
+    animated = frames > 1 and image_format in ANIMATED_FORMATS
+    width, height = image.size
+    if animated and width * height * frames > MAX_IMAGE_PIXELS:
+        raise ValidationError(
+            "Анимация слишком большая: не больше %(limit)s мегапикселей "
+            "во всех кадрах.",
+            code="image_too_large",
+            params={"limit": MAX_IMAGE_PIXELS // 1000000},
+        )
+    try:
+        if animated:
+            content = _save_animation(image, image_format)
+        else:
+            content = _save(_resize(image, image_format), image_format)
+    except BROKEN_IMAGE_ERRORS:
+        raise ValidationError(
+            "Файл картинки повреждён.", code="invalid_image"
+        )
+    root, ext = os.path.splitext(os.path.basename(uploaded.name))
+    if image_format != _open_format(ext):
+        ext = EXTENSIONS[image_format]
+    return SimpleUploadedFile(root + ext, content, CONTENT_TYPES[image_format])
+
+
+def _open_format(ext):
+    return Image.registered_extensions().get(ext.lower())
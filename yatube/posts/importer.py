@@ -0,0 +1,336 @@
+"""Массовый импорт пользователей, групп, постов и подписок.
+
+Записи читаются потоком из JSONL или CSV, у каждой есть поле type:
+
+    {"type": "user", "username": "leo", "email": "leo@example.com"}
+    {"type": "group", "slug": "cats", "title": "Коты"}
+    {"type": "post", "author": "leo", "group": "cats", "text": "...",
+     "pub_date": "2020-01-01T10:00:00", "image": "photos/cat.jpg"}
+    {"type": "follow", "user": "leo", "author": "tolstoy"}
+
+Пользователи и группы сопоставляются через словари в памяти, запись
+идёт через bulk_create пачками, каждая пачка — в своей транзакции вместе
+с отметкой о прогрессе. Сигналы при bulk_create не срабатывают, поэтому
+счётчики, поисковый индекс, ленты и поколение кэша обновляются один раз
+в конце.
+
+Картинки копируются в хранилище после коммита пачки под заранее
+занятыми именами: откат пачки не оставляет лишних файлов. Пост, картинки
+которого нет, сохраняется без неё, а путь попадает в missing_images.
+"""
+import csv
+import json
+import os
+from contextlib import contextmanager
+
+from django.contrib.auth.hashers import make_password
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from . import search
+from .cache import bump_content_generation
+from .counters import recount_users
+from .feed import rebuild_inboxes
+from .models import Follow, Group, ImportCheckpoint, Post, User
+
+RECORD_TYPES = ("user", "group", "post", "follow")
+# Сколько id подставлять в один запрос на этапе завершения.
+FINALIZE_CHUNK = 500
+
+
+def read_records(path, file_format=None):
+    """Записи файла по одной; пустые значения CSV становятся None."""
+    if file_format is None:
+        file_format = "csv" if path.endswith(".csv") else "jsonl"
+    with open(path, encoding="utf-8", newline="") as source:
+        if file_format == "csv":
+            for row in csv.DictReader(source):
+                yield {key: value or None for key, value in row.items()}
+        else:
+            for line in source:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def _chunks(values, size):
+    values = sorted(values)
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+def _parse_date(value):
+    if not value:
+        return timezone.now()
+    date = parse_datetime(value)
+    if date is None:
+        raise ValueError(f"Неверная дата: {value}")
+    if timezone.is_naive(date):
+        date = timezone.make_aware(date)
+    return date
+
+
+@contextmanager
+def keep_dates(model, *names):
+    """Отключает auto_now и auto_now_add у полей, чтобы даты брались из
+    данных, а не подменялись текущим временем. Флаги меняются на время
+    блока для всего процесса."""
+    fields = [model._meta.get_field(name) for name in names]
+    saved = [(field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, (auto_now, auto_now_add) in zip(fields, saved):
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+def finalize_import(post_id, follow_id):
+    """Отложенные обновления после массовой записи мимо сигналов.
+
+    post_id и follow_id — последние id до записи: пересчитываются
+    счётчики затронутых пользователей, индексируются новые посты,
+    пересобираются ленты их читателей и сбрасываются кэши страниц.
+    """
+    posts = Post.objects.filter(id__gt=post_id)
+    follows = list(
+        Follow.objects.filter(id__gt=follow_id)
+        .values_list("user", "author")
+    )
+    authors = set(
+        posts.order_by().values_list("author", flat=True).distinct()
+    )
+    users = authors.union(*follows)
+    for chunk in _chunks(users, FINALIZE_CHUNK):
+        recount_users(chunk)
+    search.index_queryset(posts)
+    readers = set(
+        Follow.objects.filter(author__in=posts.values("author"))
+        .values_list("user", flat=True)
+    )
+    readers.update(user_id for user_id, _ in follows)
+    for chunk in _chunks(readers, FINALIZE_CHUNK):
+        rebuild_inboxes(chunk)
+    bump_content_generation()
+
+
+class ContentImporter:
+    def __init__(self, source, batch_size=1000, images_dir=None,
+                 restart=False):
+        self.source = os.path.abspath(source)
+        self.batch_size = batch_size
+        self.images_dir = images_dir or os.path.dirname(self.source)
+        self.restart = restart
+        self.users = dict(User.objects.values_list("username", "id"))
+        self.groups = dict(Group.objects.values_list("slug", "id"))
+        self.stats = dict.fromkeys(
+            RECORD_TYPES + ("skipped", "missing_image"), 0
+        )
+        self.missing_images = []
+        self.processed = 0
+        self._image_names = set()
+        self._unusable_password = make_password(None)
+
+    def run(self, records, progress=None):
+        """Импортирует записи, продолжая с места прошлого запуска.
+
+        Возвращает False, если файл уже был импортирован полностью.
+        """
+        checkpoint = self._checkpoint()
+        if checkpoint.finished:
+            return False
+        batch = []
+        position = checkpoint.position
+        for number, record in enumerate(records, 1):
+            if number <= checkpoint.position:
+                continue
+            batch.append(record)
+            position = number
+            if len(batch) == self.batch_size:
+                self._save_batch(batch, checkpoint, position)
+                batch = []
+                if progress is not None:
+                    progress(position)
+        if batch:
+            self._save_batch(batch, checkpoint, position)
+        self.finalize(checkpoint)
+        return True
+
+    def _id_marks(self):
+        return {
+            "post_id": Post.objects.aggregate(last=Max("id"))["last"] or 0,
+            "follow_id": Follow.objects.aggregate(last=Max("id"))["last"] or 0,
+        }
+
+    def _checkpoint(self):
+        checkpoint, created = ImportCheckpoint.objects.get_or_create(
+            source=self.source, defaults=self._id_marks()
+        )
+        if self.restart and not created:
+            checkpoint.position = 0
+            checkpoint.finished = False
+            for name, value in self._id_marks().items():
+                setattr(checkpoint, name, value)
+            checkpoint.save()
+        return checkpoint
+
+    def _save_batch(self, batch, checkpoint, position):
+        by_type = {name: [] for name in RECORD_TYPES}
+        for record in batch:
+            records = by_type.get(record.get("type"))
+            if records is None:
+                self.stats["skipped"] += 1
+            else:
+                records.append(record)
+        # Порядок важен: посты и подписки ссылаются на пользователей и
+        # группы из той же пачки.
+        with transaction.atomic():
+            self._import_users(by_type["user"])
+            self._import_groups(by_type["group"])
+            self._import_posts(by_type["post"])
+            self._import_follows(by_type["follow"])
+            checkpoint.position = position
+            checkpoint.save()
+        self.processed += len(batch)
+
+    def _skip(self, count=1):
+        self.stats["skipped"] += count
+
+    def _import_users(self, records):
+        new = {}
+        for record in records:
+            username = record.get("username")
+            if not username or username in self.users or username in new:
+                self._skip()
+                continue
+            new[username] = User(
+                username=username,
+                email=record.get("email") or "",
+                first_name=record.get("first_name") or "",
+                last_name=record.get("last_name") or "",
+                password=self._unusable_password,
+            )
+        User.objects.bulk_create(new.values())
+        # SQLite не возвращает id из bulk_create, дочитываем их.
+        self.users.update(
+            User.objects.filter(username__in=list(new))
+            .values_list("username", "id")
+        )
+        self.stats["user"] += len(new)
+
+    def _import_groups(self, records):
+        new = {}
+        for record in records:
+            slug = record.get("slug")
+            if not slug or slug in self.groups or slug in new:
+                self._skip()
+                continue
+            new[slug] = Group(
+                slug=slug,
+                title=record.get("title") or slug,
+                description=record.get("description") or "",
+            )
+        Group.objects.bulk_create(new.values())
+        self.groups.update(
+            Group.objects.filter(slug__in=list(new)).values_list("slug", "id")
+        )
+        self.stats["group"] += len(new)
+
+    def _build_post(self, record):
+        author_id = self.users.get(record.get("author"))
+        slug = record.get("group")
+        group_id = self.groups.get(slug)
+        if author_id is None or not record.get("text") or (
+            slug and group_id is None
+        ):
+            return None
+        pub_date = _parse_date(record.get("pub_date"))
+        return Post(
+            author_id=author_id,
+            group_id=group_id,
+            text=record["text"],
+            pub_date=pub_date,
+            edited=pub_date,
+            image=self._image_name(record.get("image")),
+        )
+
+    def _import_posts(self, records):
+        posts = []
+        for record in records:
+            post = self._build_post(record)
+            if post is None:
+                self._skip()
+            else:
+                posts.append(post)
+        with keep_dates(Post, "pub_date", "edited"):
+            Post.objects.bulk_create(posts)
+        self.stats["post"] += len(posts)
+
+    def _missing_image(self, path):
+        self.missing_images.append(path)
+        self.stats["missing_image"] += 1
+
+    def _reserve_name(self, filename):
+        # Хранилище ещё не видит файлы пачки, поэтому имена, выданные
+        # в ней, отслеживаются здесь.
+        root, ext = os.path.splitext(f"posts/{filename}")
+        name = default_storage.get_available_name(root + ext)
+        while name in self._image_names:
+            name = default_storage.get_available_name(
+                default_storage.get_alternative_name(root, ext)
+            )
+        self._image_names.add(name)
+        return name
+
+    def _image_name(self, path):
+        """Имя картинки в хранилище; сам файл копируется после коммита."""
+        if not path:
+            return ""
+        source = os.path.join(self.images_dir, path)
+        if not os.path.isfile(source):
+            self._missing_image(path)
+            return ""
+        name = self._reserve_name(os.path.basename(source))
+        transaction.on_commit(lambda: self._copy_image(path, source, name))
+        return name
+
+    def _copy_image(self, path, source, name):
+        try:
+            with open(source, "rb") as image:
+                saved = default_storage.save(name, File(image))
+        except OSError:
+            saved = ""
+            self._missing_image(path)
+        if saved != name:
+            # Файл пропал после проверки или имя занял другой процесс.
+            Post.objects.filter(image=name).update(image=saved)
+
+    def _import_follows(self, records):
+        pairs = set()
+        for record in records:
+            user_id = self.users.get(record.get("user"))
+            author_id = self.users.get(record.get("author"))
+            if user_id is None or author_id is None or user_id == author_id:
+                self._skip()
+                continue
+            pairs.add((user_id, author_id))
+        existing = set(
+            Follow.objects.filter(
+                user__in={user_id for user_id, _ in pairs}
+            ).values_list("user", "author")
+        )
+        Follow.objects.bulk_create(
+            Follow(user_id=user_id, author_id=author_id)
+            for user_id, author_id in pairs - existing
+        )
+        self.stats["follow"] += len(pairs - existing)
+
+    def finalize(self, checkpoint):
+        """Отложенные обновления для всего импортированного файла."""
+        finalize_import(checkpoint.post_id, checkpoint.follow_id)
+        checkpoint.finished = True
+        checkpoint.save()
@@ -0,0 +1,44 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from posts.export import FORMATS, render_export
+from posts.models import Group, Post, User
+
+
+class Command(BaseCommand):
+    help = "Выгружает посты автора или группы с комментариями."
+
+    def add_arguments(self, parser):
+        target = parser.add_mutually_exclusive_group(required=True)
+        target.add_argument("--user", help="Имя пользователя.")
+        target.add_argument("--group", help="slug группы.")
+        parser.add_argument(
+            "--format", choices=tuple(FORMATS), default="ndjson"
+        )
+        parser.add_argument(
+            "--output", help="Файл для выгрузки; по умолчанию stdout."
+        )
+        parser.add_argument(
+            "--base-url",
+            default="",
+            help="Префикс ссылок на картинки, например https://yatube.ru",
+        )
+
+    def handle(self, *args, **options):
+        if options["user"]:
+            owner = User.objects.filter(username=options["user"]).first()
+            posts = Post.objects.filter(author=owner)
+        else:
+            owner = Group.objects.filter(slug=options["group"]).first()
+            posts = Post.objects.filter(group=owner)
+        if owner is None:
+            raise CommandError("Пользователь или группа не найдены")
+        lines = render_export(
+            posts, options["format"], options["base_url"].rstrip("/")
+        )
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8",
+                      newline="") as output:
+                output.writelines(lines)
+        else:
+            for line in lines:
+                self.stdout.write(line, ending="")
@@ -0,0 +1,70 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from posts.dataset import DatasetGenerator
+
+
+class Command(BaseCommand):
+    help = (
+        "Создаёт синтетические данные, похожие на боевые: подписки по "
+        "степенному закону, посты сериями, картинки и длинные ветки "
+        "комментариев. Одно и то же зерно даёт одни и те же данные."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--users", type=int, default=1000)
+        parser.add_argument("--posts", type=int, default=10000)
+        parser.add_argument("--groups", type=int, default=20)
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=365,
+            help="За сколько дней распределить посты.",
+        )
+        parser.add_argument(
+            "--image-ratio",
+            type=float,
+            default=0.1,
+            help="Доля постов с картинками.",
+        )
+        parser.add_argument(
+            "--hot-ratio",
+            type=float,
+            default=0.001,
+            help="Доля постов с длинной веткой комментариев.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=5000,
+            help="Сколько строк сохранять в одной транзакции.",
+        )
+
+    def handle(self, *args, **options):
+        generator = DatasetGenerator(
+            seed=options["seed"],
+            users=options["users"],
+            posts=options["posts"],
+            groups=options["groups"],
+            days=options["days"],
+            image_ratio=options["image_ratio"],
+            hot_ratio=options["hot_ratio"],
+            batch_size=options["batch_size"],
+        )
+        started = time.perf_counter()
+
+        def progress(position):
+            if options["verbosity"] > 1:
+                self.stdout.write(f"Создано постов: {position}")
+
+        try:
+            stats = generator.run(progress)
+        except ValueError as error:
+            raise CommandError(error)
+        elapsed = time.perf_counter() - started
+        stats = ", ".join(f"{name}: {count}" for name, count in stats.items())
+        self.stdout.write(self.style.SUCCESS(
+            f"Создано ({stats}) за {elapsed:.1f} с"
+        ))
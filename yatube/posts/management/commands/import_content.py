@@ -0,0 +1,64 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from posts.importer import ContentImporter, read_records
+
+
+class Command(BaseCommand):
+    help = (
+        "Импортирует пользователей, группы, посты и подписки из JSONL или "
+        "CSV. Прерванный импорт продолжается с последней сохранённой пачки."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Файл .jsonl или .csv.")
+        parser.add_argument(
+            "--format",
+            choices=("jsonl", "csv"),
+            help="Формат файла; по умолчанию по расширению.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Сколько записей сохранять в одной транзакции.",
+        )
+        parser.add_argument(
+            "--images-dir",
+            help="Откуда брать картинки; по умолчанию каталог файла.",
+        )
+        parser.add_argument(
+            "--restart",
+            action="store_true",
+            help="Импортировать файл заново с первой записи.",
+        )
+
+    def handle(self, *args, **options):
+        importer = ContentImporter(
+            options["path"],
+            batch_size=options["batch_size"],
+            images_dir=options["images_dir"],
+            restart=options["restart"],
+        )
+        started = time.perf_counter()
+
+        def progress(position):
+            if options["verbosity"] > 1:
+                self.stdout.write(f"Сохранено записей: {position}")
+
+        records = read_records(options["path"], options["format"])
+        if not importer.run(records, progress):
+            self.stdout.write("Файл уже импортирован, см. --restart")
+            return
+        elapsed = time.perf_counter() - started
+        rate = importer.processed / elapsed if elapsed else 0
+        stats = ", ".join(
+            f"{name}: {count}" for name, count in importer.stats.items()
+        )
+        for path in importer.missing_images:
+            self.stderr.write(f"Нет картинки {path}: пост сохранён без неё")
+        self.stdout.write(self.style.SUCCESS(
+            f"Импортировано ({stats}) за {elapsed:.1f} с, "
+            f"{rate:.0f} записей/с"
+        ))
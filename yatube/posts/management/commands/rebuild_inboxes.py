@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from posts.feed import rebuild_inboxes
+
+
+class Command(BaseCommand):
+    help = "Пересобирает ленты подписок (Inbox) с нуля."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--user",
+            action="append",
+            dest="users",
+            type=int,
+            help="id пользователя; можно указать несколько раз.",
+        )
+
+    def handle(self, *args, **options):
+        delivered = rebuild_inboxes(options["users"])
+        self.stdout.write(
+            self.style.SUCCESS(f"Доставлено постов в ленты: {delivered}")
+        )
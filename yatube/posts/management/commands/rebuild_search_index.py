@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from posts.models import Post
+from posts.search import ensure_index, rebuild_index
+
+
+class Command(BaseCommand):
+    help = "Пересобирает полнотекстовый индекс постов."
+
+    def handle(self, *args, **options):
+        ensure_index()
+        total = rebuild_index(Post.objects.all())
+        self.stdout.write(
+            self.style.SUCCESS(f"Проиндексировано постов: {total}")
+        )
@@ -0,0 +1,74 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from posts.counters import (
+    USER_COUNTERS, actual_comment_counts, actual_user_counters
+)
+from posts.models import Post, User, UserCounters
+
+
+def _pk_chunks(queryset, chunk_size):
+    last_pk = 0
+    while True:
+        pks = list(
+            queryset.filter(pk__gt=last_pk)
+            .order_by("pk")
+            .values_list("pk", flat=True)[:chunk_size]
+        )
+        if not pks:
+            return
+        yield pks
+        last_pk = pks[-1]
+
+
+class Command(BaseCommand):
+    help = "Сверяет денормализованные счётчики с таблицами и чинит дрейф."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=1000,
+            help="Сколько строк сверять в одной транзакции.",
+        )
+
+    def handle(self, *args, **options):
+        chunk_size = options["chunk_size"]
+        users_fixed = 0
+        for pks in _pk_chunks(User.objects.all(), chunk_size):
+            with transaction.atomic():
+                users_fixed += self._reconcile_users(pks)
+        comments_fixed = 0
+        for pks in _pk_chunks(Post.objects.all(), chunk_size):
+            with transaction.atomic():
+                comments_fixed += self._reconcile_comments(pks)
+        self.stdout.write(self.style.SUCCESS(
+            f"Исправлено счётчиков пользователей: {users_fixed}, "
+            f"счётчиков комментариев: {comments_fixed}"
+        ))
+
+    def _reconcile_users(self, pks):
+        stored = {
+            counters.pk: counters
+            for counters in UserCounters.objects.filter(pk__in=pks)
+        }
+        fixed = 0
+        for row in actual_user_counters(pks):
+            pk = row.pop("pk")
+            counters = stored.get(pk)
+            if counters is None:
+                UserCounters.objects.create(user_id=pk, **row)
+                fixed += 1
+            elif any(getattr(counters, name) != row[name]
+                     for name in USER_COUNTERS):
+                UserCounters.objects.filter(pk=pk).update(**row)
+                fixed += 1
+        return fixed
+
+    def _reconcile_comments(self, pks):
+        fixed = 0
+        for pk, stored, actual in actual_comment_counts(pks):
+            if stored != actual:
+                Post.objects.filter(pk=pk).update(comments_count=actual)
+                fixed += 1
+        return fixed
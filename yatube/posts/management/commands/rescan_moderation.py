@@ -0,0 +1,123 @@
+import os
+from itertools import islice
+from multiprocessing import Pool
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from posts.forms import profanity
+from posts.models import Comment, ModerationCheckpoint, ModerationFlag, Post
+from posts.moderation import init_worker, scan_rows, words_hash
+
+MODELS = {ModerationFlag.POST: Post, ModerationFlag.COMMENT: Comment}
+
+
+def _chunks(queryset, last_pk, chunk_size):
+    """Списки строк (id, текст) по возрастанию id начиная после last_pk.
+
+    В памяти одновременно находится только текущий кусок.
+    """
+    while True:
+        rows = list(
+            queryset.filter(pk__gt=last_pk)
+            .order_by("pk")
+            .values_list("pk", "text")[:chunk_size]
+            .iterator()
+        )
+        if not rows:
+            return
+        yield rows
+        last_pk = rows[-1][0]
+
+
+class Command(BaseCommand):
+    help = (
+        "Перепроверяет посты и комментарии на запрещённые слова и "
+        "записывает нарушения в ModerationFlag. Прерванная проверка "
+        "продолжается с сохранённого места."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=1000,
+            help="Сколько строк читать из БД и отдавать воркеру за раз.",
+        )
+        parser.add_argument(
+            "--processes",
+            type=int,
+            default=os.cpu_count(),
+            help="Число процессов; 1 — проверка в текущем процессе.",
+        )
+        parser.add_argument(
+            "--restart",
+            action="store_true",
+            help="Начать заново, не глядя на сохранённое место.",
+        )
+
+    def handle(self, *args, **options):
+        words = profanity.words
+        signature = words_hash(words)
+        processes = max(1, options["processes"])
+        pool = None
+        if processes > 1:
+            pool = Pool(processes, initializer=init_worker, initargs=(words,))
+        else:
+            init_worker(words)
+        try:
+            for kind, model in MODELS.items():
+                checked, flagged = self._rescan(
+                    kind, model, signature, pool, processes, options
+                )
+                self.stdout.write(
+                    f"{kind}: проверено {checked}, нарушений {flagged}"
+                )
+        finally:
+            if pool is not None:
+                pool.close()
+                pool.join()
+        self.stdout.write(self.style.SUCCESS("Перепроверка завершена"))
+
+    def _rescan(self, kind, model, signature, pool, processes, options):
+        checkpoint, _ = ModerationCheckpoint.objects.get_or_create(
+            kind=kind, defaults={"words_hash": signature}
+        )
+        if options["restart"] or checkpoint.words_hash != signature:
+            checkpoint.words_hash = signature
+            checkpoint.last_pk = 0
+        chunks = _chunks(
+            model.objects.all(), checkpoint.last_pk, options["chunk_size"]
+        )
+        checked = flagged = 0
+        # Воркерам одновременно раздаётся по куску на процесс, после чего
+        # результаты и место остановки сохраняются в одной транзакции.
+        while True:
+            window = list(islice(chunks, processes))
+            if not window:
+                break
+            if pool is None:
+                results = [scan_rows(rows) for rows in window]
+            else:
+                results = pool.map(scan_rows, window)
+            found = [item for result in results for item in result]
+            first_pk = checkpoint.last_pk
+            checkpoint.last_pk = window[-1][-1][0]
+            with transaction.atomic():
+                self._save_flags(kind, first_pk, checkpoint.last_pk, found)
+                checkpoint.save()
+            checked += sum(len(rows) for rows in window)
+            flagged += len(found)
+        checkpoint.save()
+        return checked, flagged
+
+    def _save_flags(self, kind, first_pk, last_pk, found):
+        # Старые отметки диапазона заменяются: исправленные и удалённые
+        # записи перестают числиться нарушениями.
+        ModerationFlag.objects.filter(
+            kind=kind, object_id__gt=first_pk, object_id__lte=last_pk
+        ).delete()
+        ModerationFlag.objects.bulk_create([
+            ModerationFlag(kind=kind, object_id=pk, words=", ".join(words))
+            for pk, words in found
+        ])
@@ -20,6 +20,9 @@ class Post(models.Model):
         verbose_name="Текст поста",
         help_text="Введите текст поста")
     pub_date = models.DateTimeField("Дата публикации", auto_now_add=True)
+    edited = models.DateTimeField(
+        "Дата изменения", auto_now=True, db_index=True
+    )
     author = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
@@ -38,14 +41,32 @@ class Post(models.Model):
         upload_to='posts/',
         blank=True
     )
+    comments_count = models.PositiveIntegerField(
+        "Число комментариев",
+        default=0,
+        editable=False
+    )
 
     def __str__(self) -> str:
         return self.text[:15]
 
     class Meta:
-        ordering = ["-pub_date"]
+        ordering = ["-pub_date", "-id"]
         verbose_name = 'Пост'
         verbose_name_plural = 'Посты'
+        # Ленты сортируются по (-pub_date, -id), в том числе внутри
+        # автора и группы.
+        indexes = [
+            models.Index(fields=("-pub_date", "-id"), name="post_pub_date"),
+            models.Index(
+                fields=("author", "-pub_date", "-id"),
+                name="post_author_pub_date"
+            ),
+            models.Index(
+                fields=("group", "-pub_date", "-id"),
+                name="post_group_pub_date"
+            ),
+        ]
 
 
 class Comment(models.Model):
@@ -66,6 +87,11 @@ class Comment(models.Model):
 
     class Meta:
         ordering = ('created',)
+        indexes = [
+            models.Index(
+                fields=("post", "created", "id"), name="comment_post_created"
+            ),
+        ]
 
 
 class Follow(models.Model):
@@ -79,3 +105,100 @@ class Follow(models.Model):
         related_name='following',
         on_delete=models.CASCADE
     )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=("user", "author"), name="unique_follow"
+            ),
+        ]
+
+
+class Inbox(models.Model):
+    """Материализованная лента подписок: пост, доставленный подписчику."""
+    user = models.ForeignKey(
+        User,
+        related_name="inbox",
+        on_delete=models.CASCADE
+    )
+    post = models.ForeignKey(
+        Post,
+        related_name="inbox_entries",
+        on_delete=models.CASCADE
+    )
+    pub_date = models.DateTimeField()
+
+    class Meta:
+        ordering = ("-pub_date", "-post_id")
+        constraints = [
+            models.UniqueConstraint(
+                fields=("user", "post"), name="unique_inbox_entry"
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=("user", "-pub_date", "-post"),
+                name="inbox_user_pub_date"
+            ),
+        ]
+
+
+class UserCounters(models.Model):
+    """Денормализованные счётчики пользователя."""
+    user = models.OneToOneField(
+        User,
+        primary_key=True,
+        related_name="counters",
+        on_delete=models.CASCADE
+    )
+    posts_count = models.PositiveIntegerField("Число постов", default=0)
+    followers_count = models.PositiveIntegerField(
+        "Число подписчиков", default=0
+    )
+    following_count = models.PositiveIntegerField("Число подписок", default=0)
+
+    class Meta:
+        verbose_name = "Счётчики пользователя"
+        verbose_name_plural = "Счётчики пользователей"
+
+
+class ModerationFlag(models.Model):
+    """Пост или комментарий, в котором найдены запрещённые слова."""
+    POST = "post"
+    COMMENT = "comment"
+    KINDS = ((POST, "Пост"), (COMMENT, "Комментарий"))
+
+    kind = models.CharField("Тип", max_length=16, choices=KINDS)
+    object_id = models.PositiveIntegerField("id записи")
+    words = models.TextField("Найденные слова")
+    flagged = models.DateTimeField("Дата проверки", auto_now_add=True)
+
+    class Meta:
+        ordering = ("kind", "object_id")
+        verbose_name = "Отметка модерации"
+        verbose_name_plural = "Отметки модерации"
+        constraints = [
+            models.UniqueConstraint(
+                fields=("kind", "object_id"), name="unique_moderation_flag"
+            ),
+        ]
+
+
+class ModerationCheckpoint(models.Model):
+    """Докуда дошла перепроверка таблицы при данном списке слов."""
+    kind = models.CharField(max_length=16, primary_key=True)
+    words_hash = models.CharField(max_length=40)
+    last_pk = models.PositiveIntegerField(default=0)
+    updated = models.DateTimeField(auto_now=True)
+
+
+class ImportCheckpoint(models.Model):
+    """Сколько записей файла уже импортировано командой import_content."""
+    source = models.CharField(max_length=255, primary_key=True)
+    position = models.PositiveIntegerField(default=0)
+    # Максимальные id до начала импорта: по ним в конце находятся
+    # импортированные посты и подписки, в том числе из прерванных запусков.
+    post_id = models.PositiveIntegerField(default=0)
+    follow_id = models.PositiveIntegerField(default=0)
+    finished = models.BooleanField(default=False)
+    updated = models.DateTimeField(auto_now=True)
@@ -0,0 +1,117 @@
+"""Поиск запрещённых слов в тексте за один проход (Aho-Corasick).
+
+Автомат строится один раз по списку слов, после чего проверка текста
+стоит O(длина текста) независимо от размера списка. Перед поиском текст
+и слова нормализуются: регистр, «ё» → «е», похожие латинские буквы и
+цифры → кириллица, знаки препинания внутри слов выбрасываются, так что
+«Л.О.Х» и «лоx» с латинской «x» тоже находятся.
+"""
+import hashlib
+import re
+from collections import deque
+
+LOOKALIKES = str.maketrans({
+    "ё": "е",
+    "a": "а",
+    "b": "в",
+    "c": "с",
+    "e": "е",
+    "h": "н",
+    "k": "к",
+    "m": "м",
+    "o": "о",
+    "p": "р",
+    "t": "т",
+    "x": "х",
+    "y": "у",
+    "0": "о",
+    "3": "з",
+    "4": "ч",
+})
+PUNCTUATION_RE = re.compile(r"[^\w\s]|_")
+
+
+def normalize(text):
+    text = PUNCTUATION_RE.sub("", text.lower().translate(LOOKALIKES))
+    return " ".join(text.split())
+
+
+class ProfanityMatcher:
+    """Автомат Ахо-Корасик по списку запрещённых слов."""
+
+    def __init__(self, words=()):
+        self.reload(words)
+
+    def reload(self, words):
+        """Перестраивает автомат по новому списку слов."""
+        self.words = []
+        goto = [{}]
+        output = [()]
+        for word in words:
+            pattern = normalize(word)
+            if not pattern:
+                continue
+            state = 0
+            for char in pattern:
+                following = goto[state].get(char)
+                if following is None:
+                    following = len(goto)
+                    goto[state][char] = following
+                    goto.append({})
+                    output.append(())
+                state = following
+            output[state] += (len(self.words),)
+            self.words.append(word)
+        fail = [0] * len(goto)
+        # Обход в ширину: ссылка неудачи ведёт в более короткий суффикс,
+        # поэтому к моменту обработки состояния она уже вычислена.
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, following in goto[state].items():
+                queue.append(following)
+                link = fail[state]
+                while link and char not in goto[link]:
+                    link = fail[link]
+                link = goto[link].get(char, 0)
+                fail[following] = link
+                output[following] += output[link]
+        self._goto = goto
+        self._fail = fail
+        self._output = output
+
+    def find(self, text):
+        """Запрещённые слова из списка, встреченные в тексте, по порядку."""
+        goto, fail, output = self._goto, self._fail, self._output
+        found = set()
+        state = 0
+        for char in normalize(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            found.update(output[state])
+        return [self.words[index] for index in sorted(found)]
+
+
+def words_hash(words):
+    """Отпечаток списка слов: при его смене перепроверка идёт заново."""
+    return hashlib.sha1("\n".join(words).encode()).hexdigest()
+
+
+# Автомат процесса-воркера при перепроверке в пуле процессов.
+_worker_matcher = None
+
+
+def init_worker(words):
+    global _worker_matcher
+    _worker_matcher = ProfanityMatcher(words)
+
+
+def scan_rows(rows):
+    """Пары (id, найденные слова) для строк (id, текст) с нарушениями."""
+    flagged = []
+    for pk, text in rows:
+        found = _worker_matcher.find(text)
+        if found:
+            flagged.append((pk, found))
+    return flagged
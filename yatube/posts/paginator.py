@@ -0,0 +1,279 @@
+import base64
+import binascii
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import EmptyResultSet
+from django.core.paginator import Page, Paginator
+from django.db.models import Min, Q
+from django.db.models.query import QuerySet
+from django.utils.dateparse import parse_datetime
+from django.utils.functional import cached_property
+
+from .cache import content_generation
+
+# Число записей сбрасывается поколением контента, время жизни только
+# освобождает кэш от неиспользуемых ключей.
+COUNT_CACHE_TIMEOUT = 60 * 60
+# По скольким последним по id записям queryset оценивается их плотность.
+ESTIMATE_SAMPLE = 1000
+
+
+def encode_cursor(value, pk):
+    """Упаковывает пару (значение поля сортировки, id) в непрозрачный токен."""
+    raw = f"{value.isoformat()}|{pk}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(token):
+    """Распаковывает токен курсора. Для битого токена возвращает None."""
+    if not token:
+        return None
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        raw = base64.urlsafe_b64decode(padded.encode()).decode()
+        value, pk = raw.rsplit("|", 1)
+        value = parse_datetime(value)
+        pk = int(pk)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        return None
+    if value is None:
+        return None
+    return value, pk
+
+
+def _count_key(queryset):
+    try:
+        sql, params = queryset.query.get_compiler(queryset.db).as_sql()
+    except EmptyResultSet:
+        return None
+    signature = hashlib.md5(repr((sql, params)).encode()).hexdigest()
+    return f"posts:count:{content_generation()}:{signature}"
+
+
+def estimate_count(queryset, limit):
+    """Число записей queryset: точное до limit, выше — оценка.
+
+    Возвращает пару (число, оценено ли оно). Точный COUNT(*) идёт по
+    подзапросу с LIMIT и не дороже limit строк. Для большего queryset
+    берутся id его ESTIMATE_SAMPLE последних записей: сколько записей
+    queryset приходится на единицу диапазона id, столько же их и во всём
+    диапазоне от его первой записи. Пропуски id от удалённых записей
+    одинаково уменьшают обе величины.
+    """
+    queryset = queryset.order_by()
+    count = queryset[:limit + 1].count()
+    if count <= limit:
+        return count, False
+    pks = list(
+        queryset.order_by("-pk").values_list("pk", flat=True)[
+            :ESTIMATE_SAMPLE
+        ]
+    )
+    first = queryset.aggregate(first=Min("pk"))["first"]
+    span = pks[0] - pks[-1] + 1
+    estimate = len(pks) * (pks[0] - first + 1) // span
+    return max(limit + 1, estimate), True
+
+
+class CountedPaginator(Paginator):
+    """Паджинатор с кэшированным числом записей и окном номеров страниц.
+
+    Число записей queryset хранится в кэше по тексту SQL-запроса и
+    поколению контента (posts.cache), поэтому любое изменение постов,
+    групп, комментариев или подписок его сбрасывает. Больше
+    PAGINATOR_EXACT_COUNT_LIMIT записей не считаются точно (см.
+    estimate_count), и estimated становится True.
+    """
+
+    ELLIPSIS = "…"
+
+    @cached_property
+    def _counted(self):
+        if not isinstance(self.object_list, QuerySet):
+            return len(self.object_list), False
+        key = _count_key(self.object_list)
+        if key is None:
+            return 0, False
+        counted = cache.get(key)
+        if counted is None:
+            counted = estimate_count(
+                self.object_list, settings.PAGINATOR_EXACT_COUNT_LIMIT
+            )
+            cache.set(key, counted, COUNT_CACHE_TIMEOUT)
+        return counted
+
+    @property
+    def count(self):
+        return self._counted[0]
+
+    @property
+    def estimated(self):
+        return self._counted[1]
+
+    def page(self, number):
+        page = super().page(number)
+        # По оценке страниц может оказаться больше, чем есть на самом
+        # деле: неполная страница точно последняя.
+        if self.estimated and len(page) < self.per_page:
+            self.num_pages = page.number
+        return page
+
+    def get_elided_page_range(self, number=1, on_each_side=2, on_ends=1):
+        """Номера страниц вокруг number и по краям, пропуски — ELLIPSIS.
+
+        Как get_elided_page_range из Django 3.2, но при оценочном числе
+        записей последние страницы не показываются: их номера неточны.
+        """
+        number = self.validate_number(number)
+        num_pages = self.num_pages
+        tail = 0 if self.estimated else on_ends
+        if num_pages <= (on_each_side + on_ends) * 2:
+            yield from self.page_range
+            return
+        if number > on_each_side + on_ends + 2:
+            yield from range(1, on_ends + 1)
+            yield self.ELLIPSIS
+            yield from range(number - on_each_side, number + 1)
+        else:
+            yield from range(1, number + 1)
+        if number < num_pages - on_each_side - tail - 1:
+            yield from range(number + 1, number + on_each_side + 1)
+            yield self.ELLIPSIS
+            yield from range(num_pages - tail + 1, num_pages + 1)
+        else:
+            yield from range(number + 1, num_pages + 1)
+
+
+class CursorPaginator(CountedPaginator):
+    """Паджинатор по ключу (value, id) без COUNT(*) и OFFSET.
+
+    Следующая страница выбирается условием по индексу относительно
+    последней записи предыдущей, поэтому стоимость запроса не зависит
+    от глубины страницы. tiebreak — уникальное поле, упорядочивающее
+    записи с равным field (по умолчанию id).
+    """
+
+    def __init__(self, object_list, per_page, field="pub_date",
+                 descending=True, tiebreak="id"):
+        super().__init__(object_list, per_page)
+        self.field = field
+        self.descending = descending
+        self.tiebreak = tiebreak
+
+    def _ordering(self, reverse=False):
+        descending = self.descending != reverse
+        prefix = "-" if descending else ""
+        return [f"{prefix}{self.field}", f"{prefix}{self.tiebreak}"]
+
+    def _seek(self, cursor, forward):
+        value, pk = cursor
+        after = self.descending == forward
+        lookup = "lt" if after else "gt"
+        return (
+            Q(**{f"{self.field}__{lookup}": value})
+            | Q(**{self.field: value, f"{self.tiebreak}__{lookup}": pk})
+        )
+
+    def cursor_for(self, obj):
+        # Строки queryset.values() приходят словарями.
+        if isinstance(obj, dict):
+            return encode_cursor(obj[self.field], obj[self.tiebreak])
+        return encode_cursor(
+            getattr(obj, self.field), getattr(obj, self.tiebreak)
+        )
+
+    def get_cursor_page(self, after=None, before=None):
+        """Возвращает страницу после курсора after или перед курсором before.
+
+        Без курсоров возвращается первая страница.
+        """
+        queryset = self.object_list
+        forward = before is None
+        cursor = after if forward else before
+        if cursor is not None:
+            queryset = queryset.filter(self._seek(cursor, forward))
+        queryset = queryset.order_by(*self._ordering(reverse=not forward))
+        objects = list(queryset[:self.per_page + 1])
+        has_more = len(objects) > self.per_page
+        objects = objects[:self.per_page]
+        if forward:
+            has_next, has_previous = has_more, cursor is not None
+        else:
+            objects.reverse()
+            has_next, has_previous = True, has_more
+        return CursorPage(objects, self, has_next, has_previous)
+
+
+class CursorPage(Page):
+    """Страница курсорной паджинации.
+
+    Номера страниц и общее число записей неизвестны, доступны только
+    ссылки «вперёд» и «назад»; методы номеров возвращают None.
+    """
+
+    is_cursor = True
+
+    def __init__(self, object_list, paginator, has_next, has_previous):
+        super().__init__(object_list, None, paginator)
+        self._has_next = has_next and bool(object_list)
+        self._has_previous = has_previous and bool(object_list)
+
+    def __repr__(self):
+        return "<Cursor page>"
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_other_pages(self):
+        return self._has_next or self._has_previous
+
+    @property
+    def next_cursor(self):
+        if not self._has_next:
+            return None
+        return self.paginator.cursor_for(self.object_list[-1])
+
+    @property
+    def previous_cursor(self):
+        if not self._has_previous:
+            return None
+        return self.paginator.cursor_for(self.object_list[0])
+
+    def next_page_number(self):
+        return None
+
+    def previous_page_number(self):
+        return None
+
+    def start_index(self):
+        return None
+
+    def end_index(self):
+        return None
+
+
+def get_page(request, queryset, per_page, **cursor_options):
+    """Страница постов для шаблона по параметрам запроса.
+
+    ?after= и ?before= включают курсорную паджинацию, ?page= работает
+    по-старому через номер страницы. cursor_options передаются в
+    CursorPaginator. Номерной странице добавляется page_window — окно
+    номеров страниц для шаблона.
+    """
+    paginator = CursorPaginator(queryset, per_page, **cursor_options)
+    after = decode_cursor(request.GET.get("after"))
+    before = decode_cursor(request.GET.get("before"))
+    if after is not None or before is not None:
+        return paginator.get_cursor_page(after=after, before=before)
+    page_obj = paginator.get_page(request.GET.get("page"))
+    page_obj.page_window = list(
+        paginator.get_elided_page_range(page_obj.number)
+    )
+    if page_obj.has_next():
+        page_obj.next_cursor = paginator.cursor_for(page_obj[-1])
+    return page_obj
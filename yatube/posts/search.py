@@ -0,0 +1,141 @@
+"""Полнотекстовый поиск по постам.
+
+На SQLite текст поста хранится в виртуальной таблице FTS5 в виде основ
+слов (русский стеммер Snowball), поэтому запрос «котами» находит и
+«кот», и «кота». Таблица синхронизируется с Post сигналами и
+пересобирается командой rebuild_search_index. На других СУБД поиск
+сводится к icontains по каждому слову.
+"""
+import re
+
+from django.db import connections, transaction
+
+from .stemmer import stem
+
+FTS_TABLE = "posts_post_fts"
+WORD_RE = re.compile(r"\w+", re.UNICODE)
+BATCH_SIZE = 1000
+# Сколько постов обычно показывается на странице результатов: от этого
+# зависит, какой план выборки дешевле (см. search_posts).
+SCAN_PAGE_ROWS = 10
+
+
+def tokenize(text):
+    return [stem(word) for word in WORD_RE.findall(text.lower())]
+
+
+def _enabled(using):
+    return connections[using].vendor == "sqlite"
+
+
+def ensure_index(using="default"):
+    if not _enabled(using):
+        return
+    with connections[using].cursor() as cursor:
+        cursor.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+            "body, tokenize='unicode61 remove_diacritics 2')"
+        )
+
+
+def index_posts(posts, using="default"):
+    """Добавляет или обновляет пары (id, текст) в индексе."""
+    if not _enabled(using):
+        return
+    rows = [(pk, " ".join(tokenize(text))) for pk, text in posts]
+    # Без транзакции SQLite фиксировал бы каждую строку executemany; внутри
+    # транзакции запроса точка сохранения не нужна.
+    with transaction.atomic(using, savepoint=False):
+        with connections[using].cursor() as cursor:
+            cursor.executemany(
+                f"DELETE FROM {FTS_TABLE} WHERE rowid = %s",
+                [(pk,) for pk, _ in rows],
+            )
+            cursor.executemany(
+                f"INSERT INTO {FTS_TABLE} (rowid, body) VALUES (%s, %s)",
+                rows,
+            )
+
+
+def remove_post(post_id, using="default"):
+    if not _enabled(using):
+        return
+    with connections[using].cursor() as cursor:
+        cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [post_id])
+
+
+def index_queryset(queryset, using="default"):
+    """Индексирует посты queryset пачками. Возвращает число постов."""
+    if not _enabled(using):
+        return 0
+    total = 0
+    batch = []
+    for row in queryset.values_list("id", "text").iterator():
+        batch.append(row)
+        if len(batch) == BATCH_SIZE:
+            index_posts(batch, using)
+            total += len(batch)
+            batch = []
+    index_posts(batch, using)
+    return total + len(batch)
+
+
+def rebuild_index(queryset, using="default"):
+    """Пересобирает индекс по queryset постов. Возвращает число постов."""
+    if not _enabled(using):
+        return 0
+    with connections[using].cursor() as cursor:
+        cursor.execute(f"DELETE FROM {FTS_TABLE}")
+    return index_queryset(queryset, using)
+
+
+def match_expression(query):
+    """Выражение MATCH: все основы слов запроса, каждая как префикс."""
+    terms = [term for term in tokenize(query) if term]
+    return " AND ".join(f'"{term}"*' for term in terms)
+
+
+def _count_matches(using, table, expression):
+    with connections[using].cursor() as cursor:
+        cursor.execute(
+            f"SELECT (SELECT count(*) FROM {FTS_TABLE} "
+            f"WHERE {FTS_TABLE} MATCH %s), (SELECT max(id) FROM {table})",
+            [expression],
+        )
+        matches, rows = cursor.fetchone()
+    return matches, rows or 0
+
+
+def search_posts(queryset, query):
+    """Фильтрует queryset постов по поисковому запросу.
+
+    На SQLite сначала одним запросом считаются совпадения в индексе, и
+    по их доле выбирается план. Редкие совпадения читаются по id и
+    сортируются целиком — их мало. Частые дешевле искать, идя по индексу
+    сортировки постов и проверяя каждый по списку совпадений: страница
+    набирается задолго до конца индекса. Унарный плюс перед id запрещает
+    SQLite искать по id и оставляет второй план.
+    """
+    terms = WORD_RE.findall(query)
+    if not terms:
+        return queryset.none()
+    if not _enabled(queryset.db):
+        for term in terms:
+            queryset = queryset.filter(text__icontains=term)
+        return queryset
+    table = queryset.model._meta.db_table
+    expression = match_expression(query)
+    matches, rows = _count_matches(queryset.db, table, expression)
+    if not matches:
+        return queryset.none()
+    # Проход по индексу сортировки читает около rows / matches постов
+    # на каждый найденный, чтение по id — все matches постов.
+    dense = matches * matches >= rows * SCAN_PAGE_ROWS
+    column = f"+{table}.id" if dense else f"{table}.id"
+    return queryset.extra(
+        where=[
+            f"{column} IN (SELECT rowid FROM {FTS_TABLE} "
+            f"WHERE {FTS_TABLE} MATCH %s)"
+        ],
+        params=[expression],
+    )
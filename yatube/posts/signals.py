@@ -0,0 +1,72 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import counters, feed, search
+from .cache import bump_content_generation
+from .models import Comment, Follow, Group, Post
+
+
+@receiver(post_save, sender=Post)
+def post_created(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        counters.post_added(instance)
+        feed.fan_out_post(instance)
+
+
+@receiver(post_delete, sender=Post)
+def post_deleted(sender, instance, **kwargs):
+    counters.post_added(instance, delta=-1)
+
+
+@receiver(post_save, sender=Comment)
+def comment_created(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        counters.comment_added(instance)
+
+
+@receiver(post_delete, sender=Comment)
+def comment_deleted(sender, instance, **kwargs):
+    counters.comment_added(instance, delta=-1)
+
+
+@receiver(post_save, sender=Follow)
+def follow_created(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        counters.follow_added(instance)
+        feed.backfill_inbox(instance.user_id, instance.author_id)
+
+
+@receiver(post_delete, sender=Follow)
+def follow_deleted(sender, instance, **kwargs):
+    counters.follow_added(instance, delta=-1)
+    feed.prune_inbox(instance.user_id, instance.author_id)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+@receiver(post_save, sender=Follow)
+@receiver(post_delete, sender=Follow)
+def content_changed(sender, **kwargs):
+    bump_content_generation()
+    # Повторно после коммита: фрагмент, отрисованный параллельным
+    # запросом до фиксации транзакции, не должен остаться актуальным.
+    transaction.on_commit(bump_content_generation)
+
+
+@receiver(post_save, sender=Post)
+def post_indexed(sender, instance, using, **kwargs):
+    search.index_posts([(instance.pk, instance.text)], using)
+
+
+@receiver(post_delete, sender=Post)
+def post_unindexed(sender, instance, using, **kwargs):
+    search.remove_post(instance.pk, using)
+
+
+def create_search_index(sender, using="default", **kwargs):
+    search.ensure_index(using)
@@ -0,0 +1,146 @@
+"""Стеммер русского языка по алгоритму Snowball.
+
+https://snowballstem.org/algorithms/russian/stemmer.html
+"""
+from functools import lru_cache
+
+VOWELS = "аеиоуыэюя"
+
+
+def _by_length(*endings):
+    # Окончания проверяются от длинных к коротким.
+    return tuple(sorted(endings, key=len, reverse=True))
+
+
+PERFECTIVE_GERUND_1 = _by_length("вшись", "вши", "в")
+PERFECTIVE_GERUND_2 = _by_length(
+    "ившись", "ывшись", "ивши", "ывши", "ив", "ыв"
+)
+ADJECTIVE = _by_length(
+    "ими", "ыми", "его", "ого", "ему", "ому", "ее", "ие", "ые", "ое",
+    "ей", "ий", "ый", "ой", "ем", "им", "ым", "ом", "их", "ых", "ую",
+    "юю", "ая", "яя", "ою", "ею",
+)
+PARTICIPLE_1 = _by_length("ем", "нн", "вш", "ющ", "щ")
+PARTICIPLE_2 = _by_length("ивш", "ывш", "ующ")
+REFLEXIVE = _by_length("ся", "сь")
+VERB_1 = _by_length(
+    "ете", "йте", "ешь", "нно", "ла", "на", "ли", "ем", "ло", "но",
+    "ет", "ют", "ны", "ть", "й", "л", "н",
+)
+VERB_2 = _by_length(
+    "ейте", "уйте", "ила", "ыла", "ена", "ите", "или", "ыли", "ило",
+    "ыло", "ено", "ует", "уют", "ены", "ить", "ыть", "ишь", "ей", "уй",
+    "ил", "ыл", "им", "ым", "ен", "ят", "ит", "ыт", "ую", "ю",
+)
+NOUN = _by_length(
+    "иями", "ями", "ами", "ией", "иям", "ием", "иях", "ев", "ов", "ие",
+    "ье", "еи", "ии", "ей", "ой", "ий", "ям", "ем", "ам", "ом", "ах",
+    "ях", "ию", "ью", "ия", "ья", "а", "е", "и", "й", "о", "у", "ы",
+    "ь", "ю", "я",
+)
+SUPERLATIVE = _by_length("ейше", "ейш")
+DERIVATIONAL = _by_length("ость", "ост")
+
+
+def _strip(word, endings, after_a=False):
+    """Отрезает самое длинное окончание; after_a — только после «а»/«я»."""
+    for ending in endings:
+        if not word.endswith(ending):
+            continue
+        stem = word[:-len(ending)]
+        if after_a:
+            if not stem or stem[-1] not in "ая":
+                continue
+        return stem
+    return None
+
+
+def _strip_group(word, group_1, group_2):
+    # Окончание из первой группы должно идти после «а» или «я», которые
+    # остаются в основе; побеждает самое длинное совпадение.
+    first = _strip(word, group_1, after_a=True)
+    second = _strip(word, group_2)
+    candidates = [stem for stem in (first, second) if stem is not None]
+    if not candidates:
+        return None
+    return min(candidates, key=len)
+
+
+def _regions(word):
+    """Начала областей RV и R2 (индексы в слове)."""
+    rv = len(word)
+    for index, char in enumerate(word):
+        if char in VOWELS:
+            rv = index + 1
+            break
+
+    def region_after(start):
+        for index in range(start + 1, len(word)):
+            if word[index] not in VOWELS and word[index - 1] in VOWELS:
+                return index + 1
+        return len(word)
+
+    r1 = region_after(0)
+    r2 = region_after(r1)
+    return rv, r2
+
+
+def _strip_adjectival(rv):
+    stem = _strip(rv, ADJECTIVE)
+    if stem is None:
+        return None
+    participle = _strip_group(stem, PARTICIPLE_1, PARTICIPLE_2)
+    return stem if participle is None else participle
+
+
+def _step_1(rv):
+    """Деепричастие или возвратная частица и прилагательное, глагол
+    или существительное."""
+    result = _strip_group(rv, PERFECTIVE_GERUND_1, PERFECTIVE_GERUND_2)
+    if result is not None:
+        return result
+    reflexive = _strip(rv, REFLEXIVE)
+    if reflexive is not None:
+        rv = reflexive
+    for strip in (
+        _strip_adjectival,
+        lambda part: _strip_group(part, VERB_1, VERB_2),
+        lambda part: _strip(part, NOUN),
+    ):
+        result = strip(rv)
+        if result is not None:
+            return result
+    return rv
+
+
+def _step_4(rv):
+    if rv.endswith("нн"):
+        return rv[:-1]
+    superlative = _strip(rv, SUPERLATIVE)
+    if superlative is not None:
+        return superlative[:-1] if superlative.endswith("нн") else superlative
+    if rv.endswith("ь"):
+        return rv[:-1]
+    return rv
+
+
+# Словарь текстов ограничен, а массовая индексация повторяет одни и те же
+# слова, поэтому основы запоминаются.
+@lru_cache(maxsize=100000)
+def stem(word):
+    word = word.lower().replace("ё", "е")
+    rv_start, r2_start = _regions(word)
+    prefix, rv = word[:rv_start], word[rv_start:]
+    rv = _step_1(rv)
+    # Шаг 2.
+    if rv.endswith("и"):
+        rv = rv[:-1]
+    # Шаг 3: словообразовательное окончание в R2.
+    for ending in DERIVATIONAL:
+        if rv.endswith(ending) and (
+            len(prefix) + len(rv) - len(ending) >= r2_start
+        ):
+            rv = rv[:-len(ending)]
+            break
+    return prefix + _step_4(rv)
@@ -0,0 +1,17 @@
+from django import template
+
+from posts.thumbnails import image_derivatives
+
+register = template.Library()
+
+DEFAULT_SIZES = "(max-width: 992px) 100vw, 960px"
+
+
+@register.inclusion_tag("posts/includes/responsive_image.html")
+def responsive_image(image, sizes=DEFAULT_SIZES, lazy=True):
+    """Картинка поста с srcset из производных разной ширины."""
+    return {
+        "image": image_derivatives(image),
+        "sizes": sizes,
+        "lazy": lazy,
+    }
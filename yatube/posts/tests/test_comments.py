@@ -0,0 +1,77 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts.models import Comment, Post
+from posts.views import COMMENTS_SHOWN
+
+User = get_user_model()
+
+
+class CommentPagesTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username="Test_Author")
+        cls.post = Post.objects.create(text="Текст", author=cls.author)
+        for number in range(COMMENTS_SHOWN + 5):
+            Comment.objects.create(
+                post=cls.post, author=cls.author, text=f"Комментарий {number}"
+            )
+        cls.comments = list(cls.post.comments.order_by("created", "id"))
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+
+    def test_post_detail_shows_first_page(self):
+        response = self.client.get(
+            reverse("posts:post_detail", args=(self.post.id,))
+        )
+        page = response.context["comments"]
+        self.assertEqual(list(page), self.comments[:COMMENTS_SHOWN])
+        self.assertContains(response, "Показать ещё")
+
+    def test_first_page_is_cached(self):
+        """Первая страница комментариев берётся из кэша фрагментов."""
+        url = reverse("posts:post_detail", args=(self.post.id,))
+        self.client.get(url)
+        Comment.objects.filter(pk=self.comments[0].pk).update(text="Новый")
+        self.assertNotContains(self.client.get(url), "Новый")
+
+    def test_load_more_fragment(self):
+        first = self.client.get(
+            reverse("posts:post_comments", args=(self.post.id,))
+        )
+        cursor = first.context["comments"].next_cursor
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(
+                reverse("posts:post_comments", args=(self.post.id,)),
+                {"after": cursor},
+            )
+        # Пост и страница комментариев вместе с авторами.
+        selects = [q for q in queries if q["sql"].startswith("SELECT")]
+        self.assertEqual(len(selects), 2)
+        self.assertEqual(
+            list(response.context["comments"]),
+            self.comments[COMMENTS_SHOWN:],
+        )
+        self.assertNotContains(response, "Показать ещё")
+
+    def test_load_more_json(self):
+        response = self.client.get(
+            reverse("posts:post_comments", args=(self.post.id,)),
+            {"format": "json"},
+        )
+        data = response.json()
+        self.assertEqual(len(data["comments"]), COMMENTS_SHOWN)
+        self.assertEqual(data["comments"][0], {
+            "id": self.comments[0].id,
+            "author": "Test_Author",
+            "text": "Комментарий 0",
+            "created": self.comments[0].created.isoformat(),
+        })
+        self.assertIsNotNone(data["next_cursor"])
@@ -0,0 +1,97 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+
+from posts.counters import counters_for
+from posts.models import Comment, Follow, Post, UserCounters
+
+User = get_user_model()
+
+
+def run_on_commit():
+    """Выполняет отложенные до коммита действия: TestCase не коммитит."""
+    callbacks, connection.run_on_commit = connection.run_on_commit, []
+    for _, callback in callbacks:
+        callback()
+
+
+class CountersTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username="Test_Author")
+        cls.user = User.objects.create_user(username="Test_User")
+        cls.post = Post.objects.create(text="Test text", author=cls.author)
+
+    def _refresh(self, user):
+        return UserCounters.objects.get(user=user)
+
+    def test_counters_follow_writes(self):
+        """Счётчики меняются при записи постов, подписок и комментариев."""
+        Post.objects.create(text="Second text", author=self.author)
+        follow = Follow.objects.create(user=self.user, author=self.author)
+        comment = Comment.objects.create(
+            post=self.post, author=self.user, text="Comment"
+        )
+        author_counters = self._refresh(self.author)
+        self.assertEqual(author_counters.posts_count, 2)
+        self.assertEqual(author_counters.followers_count, 1)
+        self.assertEqual(self._refresh(self.user).following_count, 1)
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.comments_count, 1)
+        follow.delete()
+        comment.delete()
+        self.assertEqual(self._refresh(self.author).followers_count, 0)
+        self.assertEqual(self._refresh(self.user).following_count, 0)
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.comments_count, 0)
+
+    def test_drifted_counters_do_not_block_deletes(self):
+        """Удаление проходит при нулевых счётчиках, а недостающая строка
+        счётчиков пересчитывается."""
+        follow = Follow.objects.create(user=self.user, author=self.author)
+        post = Post.objects.create(text="Second text", author=self.author)
+        comment = Comment.objects.create(
+            post=self.post, author=self.user, text="Comment"
+        )
+        UserCounters.objects.filter(user=self.author).update(
+            posts_count=0, followers_count=0
+        )
+        UserCounters.objects.filter(user=self.user).delete()
+        Post.objects.filter(pk=self.post.pk).update(comments_count=0)
+        follow.delete()
+        comment.delete()
+        run_on_commit()
+        self.assertEqual(self._refresh(self.author).followers_count, 0)
+        self.assertEqual(self._refresh(self.user).following_count, 0)
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.comments_count, 0)
+        post.delete()
+        self.assertEqual(self._refresh(self.author).posts_count, 0)
+
+    def test_user_with_counters_can_be_deleted(self):
+        """Каскадное удаление не оставляет висящих счётчиков."""
+        Follow.objects.create(user=self.user, author=self.author)
+        self.author.delete()
+        self.assertFalse(
+            UserCounters.objects.filter(user_id=self.author.pk).exists()
+        )
+
+    def test_reconcile_counters_repairs_drift(self):
+        """reconcile_counters исправляет разошедшиеся счётчики."""
+        Follow.objects.create(user=self.user, author=self.author)
+        UserCounters.objects.filter(user=self.author).update(
+            posts_count=100, followers_count=0
+        )
+        UserCounters.objects.filter(user=self.user).delete()
+        Post.objects.filter(pk=self.post.pk).update(comments_count=5)
+        call_command("reconcile_counters", chunk_size=1, stdout=StringIO())
+        author_counters = self._refresh(self.author)
+        self.assertEqual(author_counters.posts_count, 1)
+        self.assertEqual(author_counters.followers_count, 1)
+        self.assertEqual(counters_for(self.user).following_count, 1)
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.comments_count, 0)
@@ -0,0 +1,103 @@
+import shutil
+import tempfile
+from io import StringIO
+
+from django.conf import settings
+from django.core.management import CommandError, call_command
+from django.db.models import Count, F
+from django.test import TestCase, override_settings
+
+from posts.counters import actual_comment_counts
+from posts.models import Comment, Follow, Group, Inbox, Post, User
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+OPTIONS = {
+    "users": 60, "posts": 400, "groups": 5, "image_ratio": 0.2,
+    "hot_ratio": 0.01,
+}
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class GenerateDatasetTests(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def _generate(self, **options):
+        out = StringIO()
+        call_command("generate_dataset", stdout=out, **OPTIONS, **options)
+        return out.getvalue()
+
+    def _clear(self):
+        User.objects.all().delete()
+        Group.objects.all().delete()
+
+    def _snapshot(self):
+        return (
+            list(User.objects.order_by("username").values_list("username")),
+            list(Post.objects.order_by("pub_date").values_list(
+                "author__username", "group__slug", "text", "pub_date",
+                "image", "comments_count",
+            )),
+            list(Follow.objects.order_by(
+                "user__username", "author__username"
+            ).values_list("user__username", "author__username")),
+        )
+
+    def test_dataset_shape(self):
+        output = self._generate()
+        self.assertIn("posts: 400", output)
+        self.assertEqual(User.objects.count(), 60)
+        self.assertEqual(Post.objects.count(), 400)
+        # Подписчики сосредоточены у немногих авторов.
+        followers = sorted(
+            Follow.objects.values("author").annotate(total=Count("id"))
+            .values_list("total", flat=True),
+            reverse=True,
+        )
+        self.assertGreater(followers[0], 4 * followers[len(followers) // 2])
+        self.assertTrue(
+            Post.objects.exclude(image="").exists()
+            and Post.objects.filter(image="").exists()
+        )
+        # Длинные ветки у отдельных постов, счётчики сходятся с таблицей.
+        self.assertGreaterEqual(
+            Post.objects.order_by("-comments_count")[0].comments_count, 100
+        )
+        self.assertTrue(all(
+            stored == actual
+            for _, stored, actual in actual_comment_counts(
+                Post.objects.values("pk")
+            )
+        ))
+        comment = Comment.objects.select_related("post").first()
+        self.assertGreater(comment.created, comment.post.pub_date)
+        # Отложенные обновления, как после импорта.
+        self.assertTrue(Inbox.objects.exists())
+        author = Post.objects.first().author
+        self.assertEqual(
+            author.counters.posts_count, author.posts.count()
+        )
+
+    def test_small_batches(self):
+        """Пачки меньше числа пользователей и подписок не теряют строк."""
+        output = self._generate(batch_size=7)
+        self.assertEqual(User.objects.count(), 60)
+        self.assertEqual(Post.objects.count(), 400)
+        self.assertIn(f"follows: {Follow.objects.count()}", output)
+        self.assertFalse(
+            Follow.objects.filter(user=F("author")).exists()
+        )
+
+    def test_same_seed_gives_same_data(self):
+        self._generate(seed=7)
+        first = self._snapshot()
+        with self.assertRaises(CommandError):
+            self._generate(seed=7)
+        self._clear()
+        self._generate(seed=7)
+        self.assertEqual(self._snapshot(), first)
+        self._clear()
+        self._generate(seed=8)
+        self.assertNotEqual(self._snapshot(), first)
@@ -0,0 +1,96 @@
+import csv
+import json
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts import export
+from posts.models import Comment, Group, Post
+
+User = get_user_model()
+
+
+class ExportTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username="Test_Author")
+        cls.reader = User.objects.create_user(username="Test_Reader")
+        cls.group = Group.objects.create(
+            title="Test group", slug="test-slug", description="Description"
+        )
+        cls.posts = [
+            Post.objects.create(
+                text=f"Пост {number}", author=cls.author, group=cls.group,
+                image="posts/cat.jpg" if number == 0 else "",
+            )
+            for number in range(3)
+        ]
+        Post.objects.create(text="Чужой пост", author=cls.reader)
+        for text in ("Первый", "Второй"):
+            Comment.objects.create(
+                post=cls.posts[0], author=cls.reader, text=text
+            )
+
+    def _lines(self, response):
+        return b"".join(response.streaming_content).decode().splitlines()
+
+    def test_profile_export_ndjson(self):
+        response = Client().get(
+            reverse("posts:profile_export", args=("Test_Author",))
+        )
+        self.assertEqual(
+            response["Content-Type"], "application/x-ndjson; charset=utf-8"
+        )
+        records = [json.loads(line) for line in self._lines(response)]
+        self.assertEqual(
+            [record["id"] for record in records],
+            [post.id for post in self.posts],
+        )
+        first = records[0]
+        self.assertEqual(
+            first["image"], "http://testserver/media/posts/cat.jpg"
+        )
+        self.assertEqual(first["group"], "test-slug")
+        self.assertEqual(
+            [comment["text"] for comment in first["comments"]],
+            ["Первый", "Второй"],
+        )
+        self.assertEqual(records[1]["comments"], [])
+
+    def test_group_export_csv_in_chunks(self):
+        """Посты читаются пачками, комментарии идут за своим постом."""
+        chunk_size = export.CHUNK_SIZE
+        export.CHUNK_SIZE = 2
+        try:
+            response = Client().get(
+                reverse("posts:group_export", args=("test-slug",)),
+                {"format": "csv"},
+            )
+            rows = list(csv.reader(self._lines(response)))
+        finally:
+            export.CHUNK_SIZE = chunk_size
+        self.assertEqual(tuple(rows[0]), export.CSV_COLUMNS)
+        self.assertEqual(
+            [row[0] for row in rows[1:]],
+            ["post", "comment", "comment", "post", "post"],
+        )
+        self.assertEqual(rows[2][2], str(self.posts[0].id))
+
+    def test_unknown_format_and_owner(self):
+        client = Client()
+        url = reverse("posts:group_export", args=("test-slug",))
+        self.assertEqual(client.get(url, {"format": "xml"}).status_code, 404)
+        url = reverse("posts:profile_export", args=("nobody",))
+        self.assertEqual(client.get(url).status_code, 404)
+
+    def test_export_command(self):
+        out = StringIO()
+        call_command("export_content", "--user", "Test_Reader", stdout=out)
+        records = [json.loads(line) for line in out.getvalue().splitlines()]
+        self.assertEqual(
+            [record["text"] for record in records], ["Чужой пост"]
+        )
@@ -0,0 +1,64 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from posts.models import Follow, Inbox, Post
+
+User = get_user_model()
+
+
+class FollowFeedTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username="Test_Author")
+        cls.user = User.objects.create_user(username="Test_User")
+        cls.authorized_client = Client()
+        cls.authorized_client.force_login(cls.user)
+        cls.old_post = Post.objects.create(
+            text="Old text", author=cls.author
+        )
+
+    def _feed(self):
+        response = self.authorized_client.get(reverse("posts:follow_index"))
+        return list(response.context["page_obj"])
+
+    def test_follow_backfills_and_unfollow_prunes_inbox(self):
+        """Подписка доставляет старые посты, отписка их убирает."""
+        self.authorized_client.get(
+            reverse("posts:profile_follow", args=(self.author.username,))
+        )
+        self.assertTrue(
+            Inbox.objects.filter(user=self.user, post=self.old_post).exists()
+        )
+        self.authorized_client.get(
+            reverse("posts:profile_unfollow", args=(self.author.username,))
+        )
+        self.assertFalse(Inbox.objects.filter(user=self.user).exists())
+
+    def test_new_post_is_fanned_out_to_followers(self):
+        """Новый пост попадает в ленты подписчиков при публикации."""
+        Follow.objects.create(user=self.user, author=self.author)
+        post = Post.objects.create(text="New text", author=self.author)
+        self.assertTrue(
+            Inbox.objects.filter(user=self.user, post=post).exists()
+        )
+        self.assertEqual(self._feed(), [post, self.old_post])
+
+    @override_settings(FANOUT_FOLLOWERS_LIMIT=0)
+    def test_heavy_author_is_merged_at_read_time(self):
+        """Посты «тяжёлого» автора подмешиваются в ленту при чтении."""
+        Follow.objects.create(user=self.user, author=self.author)
+        post = Post.objects.create(text="New text", author=self.author)
+        self.assertFalse(Inbox.objects.exists())
+        self.assertEqual(self._feed(), [post, self.old_post])
+
+    def test_rebuild_inboxes_restores_feed(self):
+        """Команда rebuild_inboxes пересобирает ленты с нуля."""
+        Follow.objects.create(user=self.user, author=self.author)
+        Inbox.objects.all().delete()
+        call_command("rebuild_inboxes", stdout=StringIO())
+        self.assertEqual(self._feed(), [self.old_post])
@@ -0,0 +1,92 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts.models import Group, Post
+
+User = get_user_model()
+
+
+class FeedsTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username="Test_Author")
+        cls.group = Group.objects.create(
+            title="Test group", slug="test-slug", description="Description"
+        )
+        cls.post = Post.objects.create(
+            text="Пост в группе", author=cls.author, group=cls.group
+        )
+        Post.objects.create(text="Пост без группы", author=cls.author)
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+
+    def test_feeds_render(self):
+        feeds = (
+            ("posts:index_rss", (), "application/rss+xml", 2),
+            ("posts:index_atom", (), "application/atom+xml", 2),
+            ("posts:group_rss", ("test-slug",), "application/rss+xml", 1),
+            ("posts:group_atom", ("test-slug",), "application/atom+xml", 1),
+            ("posts:profile_rss", ("Test_Author",), "application/rss+xml", 2),
+            (
+                "posts:profile_atom",
+                ("Test_Author",),
+                "application/atom+xml",
+                2,
+            ),
+        )
+        for name, args, content_type, items in feeds:
+            with self.subTest(name=name):
+                response = self.client.get(reverse(name, args=args))
+                self.assertTrue(response["Content-Type"].startswith(
+                    content_type
+                ))
+                content = response.content.decode()
+                tag = "<item>" if "rss" in content_type else "<entry>"
+                self.assertEqual(content.count(tag), items)
+                self.assertIn(reverse("posts:post_detail", args=(
+                    self.post.pk,
+                )), content)
+
+    def test_unknown_group_feed(self):
+        response = self.client.get(reverse("posts:group_rss", args=("no",)))
+        self.assertEqual(response.status_code, 404)
+
+    def test_feed_is_cached_until_posts_change(self):
+        url = reverse("posts:group_rss", args=("test-slug",))
+        response = self.client.get(url)
+        self.assertEqual(
+            self.client.get(
+                url, HTTP_IF_NONE_MATCH=response["ETag"]
+            ).status_code,
+            304,
+        )
+        # Обновление без сигналов и без смены даты: ответ из кэша.
+        Post.objects.filter(pk=self.post.pk).update(text="Новый текст")
+        self.assertNotContains(self.client.get(url), "Новый текст")
+        Post.objects.create(
+            text="Ещё пост", author=self.author, group=self.group
+        )
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Ещё пост")
+
+    def test_feed_follows_group_rename(self):
+        """Переименование группы сразу видно в закэшированной ленте."""
+        url = reverse("posts:group_rss", args=("test-slug",))
+        response = self.client.get(url)
+        self.group.title = "Renamed group"
+        self.group.save()
+        for headers in (
+            {"HTTP_IF_NONE_MATCH": response["ETag"]},
+            # Даты постов не изменились: по ним ответ был бы 304.
+            {"HTTP_IF_MODIFIED_SINCE": response["Last-Modified"]},
+        ):
+            with self.subTest(headers=headers):
+                renamed = self.client.get(url, **headers)
+                self.assertEqual(renamed.status_code, 200)
+                self.assertContains(renamed, "Renamed group")
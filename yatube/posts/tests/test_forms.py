@@ -2,11 +2,14 @@ import shutil
 import tempfile
 
 from django.conf import settings
+from django.core.cache import cache
 from django.core.files.uploadedfile import SimpleUploadedFile
 from django.test import Client, TestCase, override_settings
 from django.urls import reverse
 
+from core import metrics
 from posts.models import Group, Post, User
+from posts.thumbnails import GEOMETRIES
 
 TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
 
@@ -126,3 +129,32 @@ class TaskCreateFormTests(TestCase):
                 group=new_form_data["group"],
                 image="posts/small_3.gif").exists()
         )
+
+    def _thumbnail_generations(self, stage):
+        samples = metrics.store.read().get(
+            metrics.THUMBNAIL_GENERATIONS.name, {}
+        )
+        return samples.get(f'stage="{stage}"', {}).get("", 0)
+
+    def test_thumbnails_are_generated_at_upload(self):
+        """Миниатюры строятся при загрузке, а не при рендеринге."""
+        cache.clear()
+        metrics.store.clear()
+        uploaded = SimpleUploadedFile(
+            name='eager.gif',
+            content=self.uploaded.open().read(),
+            content_type='image/gif'
+        )
+        self.author_client.post(
+            reverse("posts:post_create"),
+            data={"text": "Eager text", "image": uploaded},
+        )
+        self.assertEqual(
+            self._thumbnail_generations("upload"), len(GEOMETRIES)
+        )
+        post = Post.objects.get(text="Eager text")
+        response = self.author_client.get(
+            reverse("posts:post_detail", args=(post.id,))
+        )
+        self.assertEqual(self._thumbnail_generations("render"), 0)
+        self.assertContains(response, "srcset=")
@@ -0,0 +1,95 @@
+from io import BytesIO
+from unittest import mock
+
+from django.core.exceptions import ValidationError
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import SimpleTestCase
+from PIL import Image
+
+from posts.forms import PostForm
+from posts.images import MAX_IMAGE_SIDE, normalize_image
+
+EXIF_ORIENTATION = 0x0112
+ROTATED_CLOCKWISE = 6
+
+
+def make_upload(name="photo.jpg", size=(3000, 1000), image_format="JPEG",
+                exif=None):
+    image = Image.new("RGB", size, (200, 30, 30))
+    buffer = BytesIO()
+    options = {"exif": exif.tobytes()} if exif is not None else {}
+    image.save(buffer, image_format, **options)
+    return SimpleUploadedFile(name, buffer.getvalue(), "image/jpeg")
+
+
+class NormalizeImageTests(SimpleTestCase):
+    def test_large_photo_is_resized_and_rotated(self):
+        """Фото уменьшается, поворачивается по EXIF и теряет метаданные."""
+        exif = Image.Exif()
+        exif[EXIF_ORIENTATION] = ROTATED_CLOCKWISE
+        normalized = normalize_image(make_upload(exif=exif))
+        image = Image.open(normalized)
+        self.assertEqual(image.format, "JPEG")
+        self.assertEqual(image.size, (MAX_IMAGE_SIDE // 3, MAX_IMAGE_SIDE))
+        self.assertNotIn(EXIF_ORIENTATION, image.getexif())
+        self.assertEqual(normalized.name, "photo.jpg")
+
+    def test_unsupported_format_is_converted_to_jpeg(self):
+        """Картинки в редких форматах перекодируются в JPEG."""
+        normalized = normalize_image(
+            make_upload(name="scan.bmp", size=(10, 10), image_format="BMP")
+        )
+        self.assertEqual(Image.open(normalized).format, "JPEG")
+        self.assertEqual(normalized.name, "scan.jpg")
+
+    @mock.patch("posts.images.MAX_IMAGE_PIXELS", 100)
+    def test_oversized_image_is_rejected_before_decoding(self):
+        """Слишком большая картинка отклоняется по заголовку."""
+        uploaded = make_upload(size=(20, 20))
+        with mock.patch.object(Image.Image, "load") as load:
+            with self.assertRaises(ValidationError):
+                normalize_image(uploaded)
+            load.assert_not_called()
+
+    def test_animation_is_resized_without_metadata(self):
+        """Анимация уменьшается покадрово и теряет комментарий."""
+        frames = [
+            Image.new("RGB", (2400, 600), color)
+            for color in ((255, 0, 0), (0, 0, 255))
+        ]
+        buffer = BytesIO()
+        frames[0].save(
+            buffer, "GIF", save_all=True, append_images=frames[1:],
+            duration=50, loop=0, comment=b"secret",
+        )
+        normalized = normalize_image(
+            SimpleUploadedFile("cat.gif", buffer.getvalue(), "image/gif")
+        )
+        image = Image.open(normalized)
+        self.assertEqual(image.n_frames, 2)
+        self.assertEqual(image.size, (MAX_IMAGE_SIDE, MAX_IMAGE_SIDE // 4))
+        self.assertNotIn("comment", image.info)
+
+    @mock.patch("posts.images.MAX_IMAGE_PIXELS", 100)
+    def test_form_reports_oversized_image(self):
+        """Форма поста показывает ошибку для слишком большой картинки."""
+        form = PostForm(
+            data={"text": "Text"},
+            files={"image": make_upload(size=(20, 20))},
+        )
+        self.assertFalse(form.is_valid())
+        self.assertIn("image", form.errors)
+
+    def test_form_reports_truncated_image(self):
+        """Обрезанный JPEG — ошибка формы, а не исключение."""
+        content = make_upload(size=(200, 200)).read()[:-2]
+        with self.assertRaises(ValidationError):
+            normalize_image(SimpleUploadedFile("photo.jpg", content))
+        form = PostForm(
+            data={"text": "Text"},
+            files={"image": SimpleUploadedFile(
+                "photo.jpg", content, "image/jpeg"
+            )},
+        )
+        self.assertFalse(form.is_valid())
+        self.assertIn("image", form.errors)
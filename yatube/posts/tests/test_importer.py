@@ -0,0 +1,152 @@
+import json
+import os
+import shutil
+import tempfile
+from io import StringIO
+
+from django.conf import settings
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+
+from posts.models import Follow, Group, Inbox, Post, User
+from posts.search import search_posts
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+SMALL_GIF = (
+    b'\x47\x49\x46\x38\x39\x61\x01\x00\x01\x00\x00\x00\x00\x21\xf9\x04'
+    b'\x01\x0a\x00\x01\x00\x2c\x00\x00\x00\x00\x01\x00\x01\x00\x00\x02'
+    b'\x02\x4c\x01\x00\x3b'
+)
+RECORDS = [
+    {"type": "user", "username": "leo"},
+    {"type": "user", "username": "anna", "email": "anna@example.com"},
+    {"type": "group", "slug": "cats", "title": "Коты"},
+    {"type": "post", "author": "leo", "group": "cats",
+     "text": "Коты спят", "pub_date": "2020-01-01T10:00:00"},
+    {"type": "follow", "user": "anna", "author": "leo"},
+    {"type": "post", "author": "leo", "text": "Рыжий кот",
+     "image": "cat.gif"},
+    {"type": "post", "author": "nobody", "text": "Чей это пост?"},
+]
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class ImportContentTests(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.path = os.path.join(self.directory, "content.jsonl")
+        with open(self.path, "w", encoding="utf-8") as source:
+            for record in RECORDS:
+                source.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    def _write_image(self):
+        with open(os.path.join(self.directory, "cat.gif"), "wb") as image:
+            image.write(SMALL_GIF)
+
+    def _import(self, path=None, **options):
+        out = StringIO()
+        try:
+            call_command(
+                "import_content", path or self.path, stdout=out,
+                stderr=out, **options
+            )
+        finally:
+            self._commit()
+        return out.getvalue()
+
+    @staticmethod
+    def _commit():
+        # TestCase не коммитит: действия после коммита пачек выполняются
+        # здесь, а отменённые пачки свои действия уже сбросили.
+        callbacks, connection.run_on_commit = connection.run_on_commit, []
+        for _, callback in callbacks:
+            callback()
+
+    def _media_files(self):
+        return [
+            name for _, _, names in os.walk(TEMP_MEDIA_ROOT) for name in names
+        ]
+
+    def test_import_creates_content_and_deferred_state(self):
+        self._write_image()
+        output = self._import()
+        self.assertIn("записей/с", output)
+        self.assertIn("skipped: 1", output)
+        leo = User.objects.get(username="leo")
+        anna = User.objects.get(username="anna")
+        self.assertFalse(leo.has_usable_password())
+        posts = Post.objects.filter(author=leo)
+        self.assertEqual(posts.count(), 2)
+        dated = posts.get(group__slug="cats")
+        self.assertEqual(dated.pub_date.year, 2020)
+        self.assertEqual(dated.edited, dated.pub_date)
+        image_post = posts.get(text="Рыжий кот")
+        self.assertTrue(image_post.image.name.startswith("posts/cat"))
+        self.assertTrue(os.path.exists(image_post.image.path))
+        # Счётчики, индекс и лента обновлены после импорта.
+        self.assertEqual(leo.counters.posts_count, 2)
+        self.assertEqual(leo.counters.followers_count, 1)
+        self.assertEqual(
+            list(search_posts(Post.objects.all(), "кот")), [image_post, dated]
+        )
+        self.assertEqual(Inbox.objects.filter(user=anna).count(), 2)
+        self.assertIn("уже импортирован", self._import())
+
+    def test_import_resumes_after_failure(self):
+        """Повторный запуск продолжает с первой несохранённой пачки, а
+        отменённая пачка не оставляет картинок."""
+        self._write_image()
+        records = RECORDS + [
+            {"type": "post", "author": "leo", "text": "Когда?",
+             "pub_date": "вчера"},
+        ]
+        with open(self.path, "w", encoding="utf-8") as source:
+            for record in records:
+                source.write(json.dumps(record, ensure_ascii=False) + "\n")
+        files = len(self._media_files())
+        with self.assertRaises(ValueError):
+            self._import(batch_size=5)
+        self.assertEqual(Post.objects.count(), 1)
+        self.assertTrue(Follow.objects.exists())
+        self.assertEqual(len(self._media_files()), files)
+        records[-1]["pub_date"] = None
+        with open(self.path, "w", encoding="utf-8") as source:
+            for record in records:
+                source.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._import(batch_size=5)
+        self.assertEqual(Post.objects.count(), 3)
+        self.assertEqual(User.objects.count(), 2)
+        self.assertEqual(Follow.objects.count(), 1)
+        self.assertEqual(len(self._media_files()), files + 1)
+        self.assertEqual(
+            User.objects.get(username="leo").counters.posts_count, 3
+        )
+
+    def test_missing_image_is_reported(self):
+        """Пост без найденной картинки сохраняется, путь выводится."""
+        output = self._import()
+        self.assertIn("Нет картинки cat.gif", output)
+        self.assertIn("missing_image: 1", output)
+        self.assertEqual(Post.objects.get(text="Рыжий кот").image, "")
+
+    def test_import_csv(self):
+        path = os.path.join(self.directory, "content.csv")
+        with open(path, "w", encoding="utf-8") as source:
+            source.write(
+                "type,username,slug,title,author,group,text\n"
+                "user,leo,,,,,\n"
+                "group,,dogs,Собаки,,,\n"
+                "post,,,,leo,dogs,Собака лает\n"
+            )
+        self._import(path)
+        self.assertEqual(Group.objects.get(slug="dogs").title, "Собаки")
+        self.assertEqual(
+            Post.objects.get().group, Group.objects.get(slug="dogs")
+        )
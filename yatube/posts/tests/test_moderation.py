@@ -0,0 +1,130 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts.forms import (
+    CommentForm, PostForm, profanity, words_not_to_be_used
+)
+from posts.models import Comment, ModerationCheckpoint, ModerationFlag, Post
+from posts.moderation import ProfanityMatcher, normalize
+
+User = get_user_model()
+
+
+class ProfanityMatcherTests(TestCase):
+    def setUp(self):
+        self.matcher = ProfanityMatcher(["лох", "чмо", "хутин пуй", "ёж"])
+
+    def test_normalize(self):
+        """Нормализация убирает пунктуацию, ё и латинские двойники."""
+        self.assertEqual(normalize("Л.О.Х, ёлка  и\nxoр"), "лох елка и хор")
+
+    def test_finds_all_words_in_one_pass(self):
+        self.assertEqual(
+            self.matcher.find("Ты чмо и лох, а ещё лох"), ["лох", "чмо"]
+        )
+        self.assertEqual(self.matcher.find("Хутин\n  Пуй!"), ["хутин пуй"])
+        self.assertEqual(self.matcher.find("Ежик"), ["ёж"])
+        self.assertEqual(self.matcher.find("Хороший текст"), [])
+
+    def test_finds_disguised_words(self):
+        """Латинские буквы и знаки внутри слова не мешают поиску."""
+        self.assertEqual(self.matcher.find("ЛОX"), ["лох"])
+        self.assertEqual(self.matcher.find("л_о_х"), ["лох"])
+        self.assertEqual(self.matcher.find("4.м.0"), ["чмо"])
+
+    def test_overlapping_words(self):
+        """Слово внутри другого слова находится по ссылкам неудачи."""
+        matcher = ProfanityMatcher(["he", "she", "his", "hers"])
+        self.assertEqual(matcher.find("ushers"), ["he", "she", "hers"])
+
+    def test_reload(self):
+        self.matcher.reload(["кот"])
+        self.assertEqual(self.matcher.find("лох и кот"), ["кот"])
+
+
+class ProfanityFormTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username="Test_Author")
+        cls.post = Post.objects.create(text="Текст", author=cls.author)
+
+    def setUp(self):
+        self.client = Client()
+        self.client.force_login(self.author)
+
+    def test_forms_reject_profanity(self):
+        for form_class in (PostForm, CommentForm):
+            with self.subTest(form=form_class.__name__):
+                form = form_class(data={"text": "Ну ты и Л.О.Х"})
+                self.assertFalse(form.is_valid())
+                self.assertIn('"лох"', form.errors["text"][0])
+
+    def test_comment_with_profanity_is_not_saved(self):
+        url = reverse("posts:add_comment", args=(self.post.id,))
+        self.client.post(url, data={"text": "сдохни"})
+        self.client.post(url, data={"text": "Отличный пост"})
+        self.assertEqual(
+            list(Comment.objects.values_list("text", flat=True)),
+            ["Отличный пост"],
+        )
+
+
+class RescanModerationTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username="Test_Author")
+        Post.objects.bulk_create([
+            Post(text=text, author=cls.author)
+            for text in ("Привет", "Ты лох", "Погода", "Просто ЧМО")
+        ])
+        cls.posts = list(Post.objects.order_by("pk"))
+        cls.comment = Comment.objects.create(
+            post=cls.posts[0], author=cls.author, text="сдохни"
+        )
+
+    def _rescan(self, **options):
+        options.setdefault("processes", 1)
+        call_command(
+            "rescan_moderation", chunk_size=2, stdout=StringIO(), **options
+        )
+        return set(ModerationFlag.objects.values_list("kind", "object_id"))
+
+    def test_rescan_flags_posts_and_comments(self):
+        expected = {
+            (ModerationFlag.POST, self.posts[1].pk),
+            (ModerationFlag.POST, self.posts[3].pk),
+            (ModerationFlag.COMMENT, self.comment.pk),
+        }
+        for processes in (1, 2):
+            with self.subTest(processes=processes):
+                self.assertEqual(
+                    self._rescan(processes=processes, restart=True), expected
+                )
+        flag = ModerationFlag.objects.get(object_id=self.posts[3].pk)
+        self.assertEqual(flag.words, "чмо")
+
+    def test_rescan_resumes_from_checkpoint(self):
+        """Повторный запуск проверяет только новые записи."""
+        self._rescan()
+        ModerationFlag.objects.all().delete()
+        new_post = Post.objects.create(text="дебил", author=self.author)
+        self.assertEqual(
+            self._rescan(), {(ModerationFlag.POST, new_post.pk)}
+        )
+        checkpoint = ModerationCheckpoint.objects.get(pk=ModerationFlag.POST)
+        self.assertEqual(checkpoint.last_pk, new_post.pk)
+
+    def test_rescan_restarts_when_words_change(self):
+        self._rescan()
+        profanity.reload(["погода"])
+        try:
+            flags = self._rescan()
+        finally:
+            profanity.reload(words_not_to_be_used)
+        self.assertEqual(flags, {(ModerationFlag.POST, self.posts[2].pk)})
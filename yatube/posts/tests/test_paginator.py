@@ -1,8 +1,12 @@
+from unittest import mock
+
 from django.contrib.auth import get_user_model
-from django.test import Client, TestCase
+from django.core.cache import cache
+from django.test import Client, SimpleTestCase, TestCase, override_settings
 from django.urls import reverse
 
 from posts.models import Group, Post
+from posts.paginator import CountedPaginator
 from posts.views import POSTS_SHOWN
 
 User = get_user_model()
@@ -65,3 +69,105 @@ class PaginatorViewsTest(TestCase):
                     (len(self.posts) - POSTS_SHOWN),
                     "Second page paginator bad!"
                 )
+
+    def test_cursor_pages_walk_through_all_posts(self):
+        """Курсорная паджинация проходит все посты без повторов."""
+        url = reverse("posts:index")
+        response = self.author_client.get(url)
+        seen = [post.id for post in response.context["page_obj"]]
+        cursor = response.context["page_obj"].next_cursor
+        response = self.author_client.get(url, {"after": cursor})
+        page_obj = response.context["page_obj"]
+        seen += [post.id for post in page_obj]
+        self.assertTrue(page_obj.is_cursor, "Cursor mode is not enabled!")
+        self.assertIsNone(page_obj.next_page_number())
+        self.assertIsNone(page_obj.start_index())
+        self.assertFalse(page_obj.has_next(), "Cursor has extra pages!")
+        self.assertEqual(
+            seen,
+            [post.id for post in reversed(self.posts)],
+            "Cursor paginator bad!"
+        )
+        response = self.author_client.get(
+            url, {"before": page_obj.previous_cursor}
+        )
+        self.assertEqual(
+            [post.id for post in response.context["page_obj"]],
+            seen[:POSTS_SHOWN],
+            "Cursor paginator previous page bad!"
+        )
+
+    def test_broken_cursor_shows_first_page(self):
+        """Битый курсор открывает первую страницу."""
+        response = self.author_client.get(
+            reverse("posts:index"), {"after": "broken"}
+        )
+        self.assertEqual(
+            len(response.context["page_obj"]),
+            POSTS_SHOWN,
+            "Broken cursor paginator bad!"
+        )
+
+    def test_count_is_cached_until_posts_change(self):
+        """Число постов берётся из кэша, пока посты не изменились."""
+        cache.clear()
+        queryset = Post.objects.filter(group=self.group)
+        self.assertEqual(CountedPaginator(queryset, POSTS_SHOWN).count, 15)
+        with self.assertNumQueries(0):
+            self.assertEqual(
+                CountedPaginator(queryset, POSTS_SHOWN).count, 15
+            )
+        Post.objects.create(text="Новый", author=self.author, group=self.group)
+        self.assertEqual(CountedPaginator(queryset, POSTS_SHOWN).count, 16)
+
+    @override_settings(PAGINATOR_EXACT_COUNT_LIMIT=5)
+    def test_large_list_count_is_estimated(self):
+        """Длинный список считается оценкой, ссылки на последнюю страницу
+        нет."""
+        cache.clear()
+        paginator = CountedPaginator(Post.objects.all(), 2)
+        self.assertTrue(paginator.estimated)
+        self.assertGreater(paginator.count, 5)
+        last_page = CountedPaginator(Post.objects.all(), 10).page(2)
+        self.assertFalse(last_page.has_next())
+        response = self.author_client.get(reverse("posts:index"))
+        self.assertNotContains(response, "Последняя")
+        self.assertContains(response, "?page=2")
+
+    @override_settings(PAGINATOR_EXACT_COUNT_LIMIT=3)
+    @mock.patch("posts.paginator.ESTIMATE_SAMPLE", 5)
+    def test_filtered_list_is_estimated_from_its_own_ids(self):
+        """Оценка группы не зависит от того, что последние посты таблицы
+        в неё не входят."""
+        cache.clear()
+        for number in range(20):
+            Post.objects.create(text=f"Other {number}", author=self.author)
+        paginator = CountedPaginator(
+            Post.objects.filter(group=self.group), POSTS_SHOWN
+        )
+        self.assertTrue(paginator.estimated)
+        self.assertEqual(paginator.count, len(self.posts))
+
+
+class ElidedPageRangeTest(SimpleTestCase):
+    def test_window_around_current_page(self):
+        """Показываются соседние и крайние страницы, остальные
+        пропускаются."""
+        paginator = CountedPaginator(range(100), 1)
+        ellipsis = CountedPaginator.ELLIPSIS
+        self.assertEqual(
+            list(paginator.get_elided_page_range(50)),
+            [1, ellipsis, 48, 49, 50, 51, 52, ellipsis, 100],
+        )
+        self.assertEqual(
+            list(paginator.get_elided_page_range(1)),
+            [1, 2, 3, ellipsis, 100],
+        )
+        self.assertEqual(
+            list(paginator.get_elided_page_range(99)),
+            [1, ellipsis, 97, 98, 99, 100],
+        )
+        self.assertEqual(
+            list(CountedPaginator(range(5), 1).get_elided_page_range(3)),
+            [1, 2, 3, 4, 5],
+        )
@@ -0,0 +1,109 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import (
+    Client, RequestFactory, TestCase, override_settings
+)
+from django.test.utils import CaptureQueriesContext
+from django.urls import resolve, reverse
+
+from core.decorators import QueryBudgetExceeded, query_budget
+from posts.models import Comment, Follow, Group, Post
+
+User = get_user_model()
+
+SIZES = (1, 12, 30)
+
+
+@override_settings(QUERY_BUDGET_STRICT=True)
+class QueryBudgetTests(TestCase):
+    """Число запросов страниц не растёт с числом постов и укладывается
+    в бюджет представления."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username="Test_Author")
+        cls.reader = User.objects.create_user(username="Test_Reader")
+        cls.group = Group.objects.create(
+            title="Test group", slug="test-slug", description="Description"
+        )
+        Follow.objects.create(user=cls.reader, author=cls.author)
+
+    def setUp(self):
+        self.client = Client()
+        self.client.force_login(self.reader)
+
+    def _grow(self, size):
+        """Досоздаёт посты разных авторов с комментариями до size."""
+        for number in range(Post.objects.count(), size):
+            other = User.objects.create_user(username=f"User_{number}")
+            Follow.objects.create(user=self.reader, author=other)
+            post = Post.objects.create(
+                text=f"Пост {number}",
+                author=other if number % 2 else self.author,
+                group=self.group,
+            )
+            Comment.objects.create(post=post, author=other, text="Текст")
+
+    def _urls(self):
+        post = Post.objects.filter(author=self.author).first()
+        return (
+            reverse("posts:index"),
+            reverse("posts:group_list", args=(self.group.slug,)),
+            reverse("posts:profile", args=(self.author.username,)),
+            reverse("posts:post_detail", args=(post.id,)),
+            reverse("posts:post_comments", args=(post.id,)),
+            reverse("posts:follow_index"),
+            reverse("posts:search") + "?q=Пост",
+        )
+
+    def _selects(self, url):
+        cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200, url)
+        return sum(
+            query["sql"].startswith("SELECT") for query in queries
+        )
+
+    def test_queries_do_not_grow_with_posts(self):
+        counts = []
+        for size in SIZES:
+            self._grow(size)
+            counts.append([self._selects(url) for url in self._urls()])
+        self.assertEqual(counts[0], counts[-1])
+        self.assertEqual(counts[1], counts[-1])
+
+    def test_listing_views_have_budget(self):
+        self._grow(1)
+        for url in self._urls():
+            with self.subTest(url=url):
+                view = resolve(url.split("?")[0]).func
+                self.assertTrue(hasattr(view, "query_budget"))
+
+
+class QueryBudgetDecoratorTests(TestCase):
+    def setUp(self):
+        self.request = RequestFactory().get("/")
+
+    @staticmethod
+    def _view(request):
+        for _ in range(3):
+            User.objects.exists()
+        return "ok"
+
+    @override_settings(QUERY_BUDGET_STRICT=True)
+    def test_strict_mode_raises(self):
+        self.assertEqual(query_budget(3)(self._view)(self.request), "ok")
+        with self.assertRaises(QueryBudgetExceeded):
+            query_budget(2)(self._view)(self.request)
+
+    @override_settings(QUERY_BUDGET_STRICT=False, DEBUG=True)
+    def test_debug_mode_warns(self):
+        with self.assertLogs("core.decorators", "WARNING"):
+            self.assertEqual(query_budget(2)(self._view)(self.request), "ok")
+
+    @override_settings(QUERY_BUDGET_STRICT=False, DEBUG=False)
+    def test_disabled_without_debug(self):
+        self.assertEqual(query_budget(0)(self._view)(self.request), "ok")
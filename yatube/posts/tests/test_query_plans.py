@@ -0,0 +1,99 @@
+import re
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts.models import Comment, Follow, Group, Post
+from posts.paginator import encode_cursor
+
+User = get_user_model()
+
+# Полный проход по таблице без индекса: «SCAN posts_post», но не
+# «SCAN posts_post USING INDEX ...».
+FULL_SCAN_RE = re.compile(r"^SCAN (\w+)(?: AS \w+)?$")
+TEMP_SORT = "USE TEMP B-TREE"
+# Что допустимо читать целиком: служебные и маленькие таблицы, а также
+# подзапрос COUNT(*) из Django — он уже отфильтрован по индексу.
+SMALL_TABLES = {"django_session", "posts_group", "subquery"}
+
+
+def query_plan(sql):
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN QUERY PLAN {sql}")
+        return [row[-1] for row in cursor.fetchall()]
+
+
+class QueryPlanTests(TestCase):
+    """Запросы страниц идут по индексам, без полных проходов и сортировки
+    во временном B-дереве."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username="Test_Author")
+        cls.reader = User.objects.create_user(username="Test_Reader")
+        cls.group = Group.objects.create(
+            title="Test group", slug="test-slug", description="Description"
+        )
+        for number in range(15):
+            Post.objects.create(
+                text=f"Пост {number}", author=cls.author, group=cls.group
+            )
+        cls.post = Post.objects.first()
+        Comment.objects.create(
+            post=cls.post, author=cls.reader, text="Комментарий"
+        )
+        Follow.objects.create(user=cls.reader, author=cls.author)
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(self.reader)
+
+    def _offenders(self, url, params=None):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200, url)
+        offenders = []
+        for query in queries:
+            sql = query["sql"]
+            if not sql.startswith("SELECT"):
+                continue
+            for step in query_plan(sql):
+                scan = FULL_SCAN_RE.match(step)
+                if TEMP_SORT in step or (
+                    scan and scan.group(1) not in SMALL_TABLES
+                ):
+                    offenders.append((step, sql))
+        return offenders
+
+    def test_views_use_indexes(self):
+        cursor = encode_cursor(self.post.pub_date, self.post.pk)
+        pages = (
+            (reverse("posts:index"), None),
+            (reverse("posts:index"), {"page": 2}),
+            (reverse("posts:index"), {"after": cursor}),
+            (reverse("posts:group_list", args=("test-slug",)), None),
+            (
+                reverse("posts:group_list", args=("test-slug",)),
+                {"after": cursor},
+            ),
+            (reverse("posts:profile", args=("Test_Author",)), None),
+            (
+                reverse("posts:profile", args=("Test_Author",)),
+                {"after": cursor},
+            ),
+            (reverse("posts:post_detail", args=(self.post.pk,)), None),
+            (reverse("posts:post_comments", args=(self.post.pk,)), None),
+            (reverse("posts:follow_index"), None),
+            (reverse("posts:group_rss", args=("test-slug",)), None),
+            (reverse("api:index"), {"after": cursor}),
+            (reverse("api:profile_posts", args=("Test_Author",)), None),
+        )
+        for url, params in pages:
+            with self.subTest(url=url, params=params):
+                self.assertEqual(self._offenders(url, params), [])
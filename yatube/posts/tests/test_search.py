@@ -0,0 +1,82 @@
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.urls import reverse
+
+from posts.models import Post
+from posts.search import FTS_TABLE, search_posts
+
+User = get_user_model()
+
+
+class SearchTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username="Test_Author")
+        cls.cat_post = Post.objects.create(
+            text="Мой кот спит на подоконнике", author=cls.author
+        )
+        cls.dog_post = Post.objects.create(
+            text="Собаки гуляют во дворе", author=cls.author
+        )
+
+    def _found(self, query):
+        return list(search_posts(Post.objects.all(), query))
+
+    def test_search_matches_word_forms(self):
+        """Поиск находит посты по другим формам слова."""
+        self.assertEqual(self._found("котами"), [self.cat_post])
+        self.assertEqual(self._found("собака"), [self.dog_post])
+        self.assertEqual(self._found("кот собака"), [])
+        self.assertEqual(self._found("!!!"), [])
+        other_cat = Post.objects.create(
+            text="Коты бывают рыжими", author=self.author
+        )
+        self.assertEqual(self._found("кот"), [other_cat, self.cat_post])
+
+    def test_index_follows_post_changes(self):
+        """Индекс обновляется при изменении и удалении поста."""
+        self.cat_post.text = "Мой попугай спит"
+        self.cat_post.save()
+        self.assertEqual(self._found("кот"), [])
+        self.assertEqual(self._found("попугаи"), [self.cat_post])
+        post = Post.objects.create(text="Кошки и мыши", author=self.author)
+        post.delete()
+        self.assertEqual(self._found("мышь"), [])
+
+    def test_rebuild_search_index(self):
+        """rebuild_search_index восстанавливает пустой индекс."""
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {FTS_TABLE}")
+        call_command("rebuild_search_index", stdout=StringIO())
+        self.assertEqual(self._found("кота"), [self.cat_post])
+
+    def _plan(self, query):
+        posts = search_posts(Post.objects.all(), query)[:10]
+        sql, params = posts.query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+            return " | ".join(row[-1] for row in cursor.fetchall())
+
+    def test_plan_depends_on_match_share(self):
+        """Частые совпадения ищутся по индексу сортировки без сортировки
+        всех найденных, редкие — по id."""
+        with mock.patch("posts.search.SCAN_PAGE_ROWS", 0):
+            plan = self._plan("кот")
+        self.assertIn("USING INDEX post_pub_date", plan)
+        self.assertNotIn("TEMP B-TREE", plan)
+        with mock.patch("posts.search.SCAN_PAGE_ROWS", 10 ** 9):
+            plan = self._plan("кот")
+        self.assertIn("INTEGER PRIMARY KEY", plan)
+        with self.assertNumQueries(1):
+            self.assertEqual(self._found("жираф"), [])
+
+    def test_search_page_shows_results(self):
+        """Страница поиска показывает найденные посты."""
+        response = self.client.get(reverse("posts:search"), {"q": "коты"})
+        self.assertEqual(list(response.context["page_obj"]), [self.cat_post])
@@ -1,8 +1,13 @@
+import multiprocessing
+import time
+
 from django import forms
 from django.contrib.auth import get_user_model
 from django.test import Client, TestCase
 from django.urls import reverse
+from django.utils.http import http_date
 
+from posts.cache import bump_content_generation
 from posts.models import Group, Post, Follow
 
 User = get_user_model()
@@ -266,3 +271,101 @@ class PostPageTests(TestCase):
             expected,
             "Not following gets content for followers"
         )
+
+
+class FragmentCacheTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username="Test_Author")
+        cls.post = Post.objects.create(text="Test text", author=cls.author)
+
+    def test_listing_fragments_see_changes_instantly(self):
+        """Изменения постов сразу видны в закэшированных списках."""
+        urls = [
+            reverse("posts:index"),
+            reverse("posts:profile", args=(self.author.username,)),
+        ]
+        for url in urls:
+            with self.subTest(url=url):
+                self.client.get(url)
+                post = Post.objects.create(
+                    text=f"Fresh text {url}", author=self.author
+                )
+                response = self.client.get(url)
+                self.assertContains(response, post.text)
+                post.delete()
+                response = self.client.get(url)
+                self.assertNotContains(response, post.text)
+
+    def test_generation_is_shared_between_workers(self):
+        """Изменение в другом воркере отменяет фрагменты этого."""
+        url = reverse("posts:index")
+        self.client.get(url)
+        # Без сигналов: поколение меняет только другой процесс.
+        Post.objects.filter(pk=self.post.pk).update(text="Changed text")
+        self.assertNotContains(self.client.get(url), "Changed text")
+        process = multiprocessing.get_context("fork").Process(
+            target=bump_content_generation
+        )
+        process.start()
+        process.join()
+        self.assertEqual(process.exitcode, 0)
+        self.assertContains(self.client.get(url), "Changed text")
+
+
+class ConditionalGetTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username="Test_Author")
+        cls.post = Post.objects.create(text="Test text", author=cls.author)
+
+    def test_unchanged_pages_answer_not_modified(self):
+        """Неизменившиеся страницы отвечают 304 по ETag."""
+        urls = [
+            reverse("posts:index"),
+            reverse("posts:profile", args=(self.author.username,)),
+            reverse("posts:post_detail", args=(self.post.id,)),
+        ]
+        for url in urls:
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertFalse(response.has_header("Last-Modified"))
+                etag = response["ETag"]
+                response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, 304)
+                Post.objects.create(text="Other text", author=self.author)
+                response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, 200)
+
+    def test_relogin_revalidates_post_with_form(self):
+        """После повторного входа страница с формой не отдаёт 304."""
+        self.author.set_password("Test_Password")
+        self.author.save()
+        credentials = {"username": "Test_Author", "password": "Test_Password"}
+        client = Client()
+        client.post(reverse("users:login"), credentials)
+        url = reverse("posts:post_detail", args=(self.post.id,))
+        response = client.get(url)
+        etag = response["ETag"]
+        self.assertEqual(
+            client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304
+        )
+        client.get(reverse("users:logout"))
+        client.post(reverse("users:login"), credentials)
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_deleted_post_is_not_answered_by_date(self):
+        """После удаления поста If-Modified-Since не даёт 304."""
+        post = Post.objects.create(text="Doomed text", author=self.author)
+        url = reverse("posts:index")
+        self.assertContains(self.client.get(url), post.text)
+        post.delete()
+        response = self.client.get(
+            url, HTTP_IF_MODIFIED_SINCE=http_date(time.time() + 60)
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertNotContains(response, post.text)
@@ -0,0 +1,151 @@
+"""Миниатюры постов: адаптивные производные и их заблаговременная генерация.
+
+Для каждой картинки строится набор кадрированных миниатюр разной ширины
+(и WebP, если Pillow его поддерживает), из которых тег responsive_image
+собирает srcset. Все производные строятся сразу после загрузки
+картинки — после того как ответ отправлен клиенту — и записываются в
+key-value хранилище sorl, поэтому при рендеринге PIL не нужен.
+
+ThumbnailBackend считает построенные миниатюры в метрике
+yatube_thumbnail_generations_total: после загрузки (stage="upload") и
+те, что всё же пришлось строить при рендеринге (stage="render").
+"""
+import hashlib
+import logging
+import threading
+
+from django.core.cache import cache
+from django.core.signals import request_finished
+from django.dispatch import receiver
+from PIL import features
+from sorl.thumbnail import base, get_thumbnail
+
+from core import metrics, timing
+
+logger = logging.getLogger(__name__)
+
+# Карточка поста — кадр 960x339; производные сохраняют эти пропорции.
+FRAME_WIDTH, FRAME_HEIGHT = 960, 339
+WIDTHS = (480, 768, 960)
+FORMATS = ("WEBP", "JPEG") if features.check("webp") else ("JPEG",)
+MIME_TYPES = {"WEBP": "image/webp", "JPEG": "image/jpeg"}
+THUMBNAIL_OPTIONS = {"crop": "center", "upscale": True}
+
+DERIVATIVES_CACHE_TIMEOUT = 60 * 60 * 24
+
+
+def _height(width):
+    return round(width * FRAME_HEIGHT / FRAME_WIDTH)
+
+
+# (формат, ширина, геометрия, опции) каждой производной картинки.
+DERIVATIVES = tuple(
+    (
+        image_format,
+        width,
+        f"{width}x{_height(width)}",
+        dict(THUMBNAIL_OPTIONS, format=image_format),
+    )
+    for image_format in FORMATS
+    for width in WIDTHS
+)
+
+# Размеры и опции всех миниатюр, которые используют шаблоны постов.
+GEOMETRIES = tuple(
+    (geometry, options) for _, _, geometry, options in DERIVATIVES
+)
+
+_local = threading.local()
+
+
+class ThumbnailBackend(base.ThumbnailBackend):
+    def _create_thumbnail(self, source_image, geometry_string, options,
+                          thumbnail):
+        if getattr(_local, "eager", False):
+            metrics.THUMBNAIL_GENERATIONS.inc(stage="upload")
+        else:
+            metrics.THUMBNAIL_GENERATIONS.inc(stage="render")
+            logger.info(
+                "Thumbnail %s generated during render", thumbnail.name
+            )
+        with timing.measure("thumbnail"):
+            super()._create_thumbnail(
+                source_image, geometry_string, options, thumbnail
+            )
+
+
+def image_derivatives(image):
+    """Адреса производных картинки для srcset; None, если их нет.
+
+    Результат кэшируется по имени файла: новая картинка поста всегда
+    сохраняется под новым именем.
+    """
+    if not image:
+        return None
+    key = "post-image:" + hashlib.md5(image.name.encode()).hexdigest()
+    derivatives = cache.get(key)
+    if derivatives is not None:
+        return derivatives
+    try:
+        thumbnails = {
+            (image_format, width): get_thumbnail(image, geometry, **options)
+            for image_format, width, geometry, options in DERIVATIVES
+        }
+    except Exception:
+        logger.exception("Thumbnails are not available for %s", image)
+        return None
+    # Запасной вариант для браузеров без srcset — самый широкий JPEG.
+    fallback = thumbnails["JPEG", WIDTHS[-1]]
+    derivatives = {
+        "src": fallback.url,
+        "width": WIDTHS[-1],
+        "height": _height(WIDTHS[-1]),
+        "sources": [
+            {
+                "type": MIME_TYPES[image_format],
+                "srcset": ", ".join(
+                    f"{thumbnails[image_format, width].url} {width}w"
+                    for width in WIDTHS
+                ),
+            }
+            for image_format in FORMATS
+        ],
+    }
+    # Пока исходник недоступен, sorl отдаёт адреса несуществующих файлов;
+    # такой результат не кэшируем, чтобы повторить попытку позже.
+    if all(thumbnail.exists() for thumbnail in thumbnails.values()):
+        cache.set(key, derivatives, DERIVATIVES_CACHE_TIMEOUT)
+    return derivatives
+
+
+def generate_thumbnails(image):
+    """Строит миниатюры всех размеров из GEOMETRIES для картинки."""
+    _local.eager = True
+    try:
+        for geometry, options in GEOMETRIES:
+            get_thumbnail(image, geometry, **options)
+    except Exception:
+        logger.exception("Thumbnail generation failed for %s", image)
+    finally:
+        _local.eager = False
+
+
+def schedule_thumbnails(image):
+    """Ставит генерацию миниатюр в очередь до окончания запроса."""
+    if image:
+        _pending().append(image.name)
+
+
+def _pending():
+    if not hasattr(_local, "pending"):
+        _local.pending = []
+    return _local.pending
+
+
+@receiver(request_finished)
+def generate_pending_thumbnails(sender, **kwargs):
+    # request_finished приходит, когда ответ уже отдан клиенту и
+    # транзакция запроса зафиксирована.
+    pending = _pending()
+    while pending:
+        generate_thumbnails(pending.pop(0))
@@ -1,13 +1,53 @@
 from django.urls import path
 
-from . import views
+from . import feeds, views
 
 app_name = "posts"
 
 urlpatterns = [
     path("", views.index, name="index"),
+    path(
+        "feed/rss/",
+        feeds.feed_view(feeds.LatestPostsFeed),
+        name="index_rss"
+    ),
+    path(
+        "feed/atom/",
+        feeds.feed_view(feeds.LatestPostsFeed, atom=True),
+        name="index_atom"
+    ),
     path("group/<slug:slug>/", views.group_posts, name="group_list"),
+    path(
+        "group/<slug:slug>/rss/",
+        feeds.feed_view(feeds.GroupFeed),
+        name="group_rss"
+    ),
+    path(
+        "group/<slug:slug>/atom/",
+        feeds.feed_view(feeds.GroupFeed, atom=True),
+        name="group_atom"
+    ),
+    path(
+        "group/<slug:slug>/export/",
+        views.group_export,
+        name="group_export"
+    ),
     path("profile/<str:username>/", views.profile, name="profile"),
+    path(
+        "profile/<str:username>/rss/",
+        feeds.feed_view(feeds.ProfileFeed),
+        name="profile_rss"
+    ),
+    path(
+        "profile/<str:username>/atom/",
+        feeds.feed_view(feeds.ProfileFeed, atom=True),
+        name="profile_atom"
+    ),
+    path(
+        "profile/<str:username>/export/",
+        views.profile_export,
+        name="profile_export"
+    ),
     path("posts/<int:post_id>/", views.post_detail, name="post_detail"),
     path("create/", views.post_create, name="post_create"),
     path("posts/<int:post_id>/edit/", views.post_edit, name="post_edit"),
@@ -16,7 +56,13 @@ urlpatterns = [
         views.add_comment,
         name="add_comment"
     ),
+    path(
+        "posts/<int:post_id>/comments/",
+        views.post_comments,
+        name="post_comments"
+    ),
     path("follow/", views.follow_index, name="follow_index"),
+    path("search/", views.search, name="search"),
     path(
         "profile/<str:username>/follow/",
         views.profile_follow,
@@ -1,41 +1,92 @@
 from django.contrib.auth.decorators import login_required
-from django.core.paginator import Paginator
+from django.db import transaction
+from django.http import Http404, JsonResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404, redirect, render
+from django.utils.functional import SimpleLazyObject
+from django.utils.http import urlencode
 
+from core.decorators import conditional_page, query_budget
+
+from .cache import content_generation
+from .counters import counters_for
+from .export import FORMATS, render_export
+from .feed import FEED_CURSOR, follow_feed
 from .forms import PostForm, CommentForm
-from .models import Group, Post, User, Follow
+from .models import Comment, Group, Post, User, Follow
+from .paginator import CursorPaginator, decode_cursor, get_page
+from .search import search_posts
+from .thumbnails import schedule_thumbnails
 
 POSTS_SHOWN = 10
+COMMENTS_SHOWN = 20
+# Лимиты SQL-запросов страниц (core.decorators.query_budget) не зависят
+# от числа постов: всё, что шаблоны читают у поста, подтягивается
+# select_related вместе со страницей.
+LIST_BUDGET = 8
+
+
+# Страницы проверяются только по ETag с поколением контента: оно меняется
+# и при удалениях, которые не видны по датам, поэтому Last-Modified нет.
+def _content_state(request, *args, **kwargs):
+    return [content_generation()]
 
 
+def _profile_state(request, username):
+    following = (
+        request.user.is_authenticated
+        and Follow.objects.filter(
+            user=request.user,
+            author__username=username
+        ).exists()
+    )
+    return [content_generation(), following]
+
+
+def _comments_page(post_id, after=None):
+    # Авторы подтягиваются тем же запросом, что и страница комментариев.
+    comments = Comment.objects.filter(post_id=post_id).select_related(
+        "author"
+    )
+    paginator = CursorPaginator(
+        comments, COMMENTS_SHOWN, field="created", descending=False
+    )
+    return paginator.get_cursor_page(after=after)
+
+
+@query_budget(LIST_BUDGET)
+@conditional_page(etag_func=_content_state)
 def index(request):
-    post_list = Post.objects.all()
-    paginator = Paginator(post_list, POSTS_SHOWN)
-    page_number = request.GET.get("page")
-    page_obj = paginator.get_page(page_number)
-    context = {"page_obj": page_obj}
+    post_list = Post.objects.select_related("author", "group")
+    page_obj = get_page(request, post_list, POSTS_SHOWN)
+    context = {
+        "page_obj": page_obj,
+        "generation": content_generation()
+    }
     return render(request, "posts/index.html", context)
 
 
+@query_budget(LIST_BUDGET)
+@conditional_page(etag_func=_content_state)
 def group_posts(request, slug):
     group = get_object_or_404(Group, slug=slug)
-    posts = Post.objects.filter(group=group)
-    paginator = Paginator(posts, POSTS_SHOWN)
-    page_number = request.GET.get("page")
-    page_obj = paginator.get_page(page_number)
+    posts = Post.objects.filter(group=group).select_related("author")
+    page_obj = get_page(request, posts, POSTS_SHOWN)
     context = {
         "page_obj": page_obj,
-        "group": group
+        "group": group,
+        "generation": content_generation()
     }
     return render(request, "posts/group_list.html", context)
 
 
+@query_budget(LIST_BUDGET)
+@conditional_page(etag_func=_profile_state)
 def profile(request, username):
-    author = get_object_or_404(User, username=username)
-    post_list = Post.objects.filter(author=author)
-    paginator = Paginator(post_list, POSTS_SHOWN)
-    page_number = request.GET.get("page")
-    page_obj = paginator.get_page(page_number)
+    author = get_object_or_404(
+        User.objects.select_related("counters"), username=username
+    )
+    post_list = Post.objects.filter(author=author).select_related("group")
+    page_obj = get_page(request, post_list, POSTS_SHOWN)
     to_follow = (
         request.user.is_authenticated
         and Follow.objects.filter(
@@ -46,23 +97,53 @@ def profile(request, username):
     context = {
         "page_obj": page_obj,
         "author": author,
-        "following": to_follow
+        "author_counters": counters_for(author),
+        "following": to_follow,
+        "generation": content_generation()
     }
     return render(request, "posts/profile.html", context)
 
 
+@query_budget(LIST_BUDGET)
+@conditional_page(etag_func=_content_state, vary_on_csrf=True)
 def post_detail(request, post_id):
-    post = get_object_or_404(Post, id=post_id)
-    comments = post.comments.all()
+    post = get_object_or_404(
+        Post.objects.select_related("author__counters", "group"), id=post_id
+    )
     form = CommentForm()
     context = {
         "post": post,
-        "comments": comments,
-        "form": form
+        "author_counters": counters_for(post.author),
+        # Первая страница читается, только если её нет в кэше фрагментов.
+        "comments": SimpleLazyObject(lambda: _comments_page(post_id)),
+        "form": form,
+        "generation": content_generation()
     }
     return render(request, "posts/post_detail.html", context)
 
 
+@query_budget(3)
+def post_comments(request, post_id):
+    """Следующая страница комментариев: HTML-фрагмент или JSON."""
+    post = get_object_or_404(Post, id=post_id)
+    page_obj = _comments_page(post_id, decode_cursor(request.GET.get("after")))
+    if request.GET.get("format") == "json":
+        return JsonResponse({
+            "comments": [
+                {
+                    "id": comment.id,
+                    "author": comment.author.username,
+                    "text": comment.text,
+                    "created": comment.created.isoformat(),
+                }
+                for comment in page_obj
+            ],
+            "next_cursor": page_obj.next_cursor,
+        })
+    context = {"post": post, "comments": page_obj}
+    return render(request, "posts/includes/comments.html", context)
+
+
 @login_required
 def post_create(request):
     form = PostForm(
@@ -72,7 +153,11 @@ def post_create(request):
     if form.is_valid():
         post = form.save(commit=False)
         post.author = request.user
-        form.save()
+        # Запись и счётчики, которые обновляют сигналы posts.counters,
+        # фиксируются одной транзакцией.
+        with transaction.atomic():
+            form.save()
+        schedule_thumbnails(post.image)
         return redirect("posts:profile", request.user)
     return render(request, "posts/create_post.html", {"form": form})
 
@@ -88,7 +173,10 @@ def post_edit(request, post_id):
         instance=post
     )
     if request.method == "POST" and form.is_valid():
-        form.save()
+        with transaction.atomic():
+            form.save()
+        if "image" in form.changed_data:
+            schedule_thumbnails(post.image)
         return redirect("posts:post_detail", post_id)
     context = {"form": form, "post": post, "is_edit": True}
     return render(request, "posts/create_post.html", context)
@@ -102,18 +190,19 @@ def add_comment(request, post_id):
         comment = form.save(commit=False)
         comment.author = request.user
         comment.post = post
-        comment.save()
+        with transaction.atomic():
+            comment.save()
     return redirect("posts:post_detail", post_id)
 
 
 @login_required
+@query_budget(LIST_BUDGET)
 def follow_index(request):
-    posts = Post.objects.filter(author__following__user=request.user)
-    paginator = Paginator(posts, POSTS_SHOWN)
-    page_number = request.GET.get("page")
-    page_obj = paginator.get_page(page_number)
+    posts = follow_feed(request.user).select_related("author", "group")
+    page_obj = get_page(request, posts, POSTS_SHOWN, **FEED_CURSOR)
     context = {
-        "page_obj": page_obj
+        "page_obj": page_obj,
+        "generation": content_generation()
     }
     return render(request, "posts/follow.html", context)
 
@@ -122,7 +211,10 @@ def follow_index(request):
 def profile_follow(request, username):
     author_obj = get_object_or_404(User, username=username)
     if request.user != author_obj:
-        Follow.objects.get_or_create(user=request.user, author=author_obj)
+        with transaction.atomic():
+            Follow.objects.get_or_create(
+                user=request.user, author=author_obj
+            )
     return redirect("posts:profile", username=username)
 
 
@@ -130,5 +222,50 @@ def profile_follow(request, username):
 def profile_unfollow(request, username):
     author_obj = get_object_or_404(User, username=username)
     if request.user != author_obj:
-        Follow.objects.get(user=request.user, author=author_obj).delete()
+        with transaction.atomic():
+            Follow.objects.get(
+                user=request.user, author=author_obj
+            ).delete()
     return redirect("posts:profile", username=username)
+
+
+@query_budget(LIST_BUDGET)
+def search(request):
+    query = request.GET.get("q", "").strip()
+    posts = search_posts(Post.objects.select_related("author"), query)
+    page_obj = get_page(request, posts, POSTS_SHOWN)
+    context = {
+        "page_obj": page_obj,
+        "query": query,
+        "query_prefix": urlencode({"q": query}) + "&"
+    }
+    return render(request, "posts/search.html", context)
+
+
+def _export_response(request, posts, filename):
+    file_format = request.GET.get("format", "ndjson")
+    if file_format not in FORMATS:
+        raise Http404("Неизвестный формат выгрузки")
+    base_url = request.build_absolute_uri("/").rstrip("/")
+    response = StreamingHttpResponse(
+        render_export(posts, file_format, base_url),
+        content_type=f"{FORMATS[file_format]}; charset=utf-8",
+    )
+    response["Content-Disposition"] = (
+        f'attachment; filename="{filename}.{file_format}"'
+    )
+    return response
+
+
+def profile_export(request, username):
+    author = get_object_or_404(User, username=username)
+    return _export_response(
+        request, Post.objects.filter(author=author), f"profile-{username}"
+    )
+
+
+def group_export(request, slug):
+    group = get_object_or_404(Group, slug=slug)
+    return _export_response(
+        request, Post.objects.filter(group=group), f"group-{slug}"
+    )
@@ -33,10 +33,13 @@ INSTALLED_APPS = [
     "users.apps.UsersConfig",
     "core.apps.CoreConfig",
     "about.apps.AboutConfig",
+    "api.apps.ApiConfig",
     'sorl.thumbnail',
 ]
 
 MIDDLEWARE = [
+    "core.middleware.MetricsMiddleware",
+    "core.middleware.ServerTimingMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -50,7 +53,7 @@ ROOT_URLCONF = "yatube.urls"
 
 TEMPLATES = [
     {
-        "BACKEND": "django.template.backends.django.DjangoTemplates",
+        "BACKEND": "core.template_backends.DjangoTemplates",
         "DIRS": [os.path.join(BASE_DIR, "templates")],
         "APP_DIRS": True,
         "OPTIONS": {
@@ -136,8 +139,53 @@ CSRF_FAILURE_VIEW = 'core.views.csrf_failure'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# Файлы, общие для воркеров одной установки: кэш "shared" и метрики.
+# Каталог свой у каждой установки; тесты подменяют его временным
+# (core.test_runner).
+RUNTIME_DIR = os.environ.get(
+    "YATUBE_RUNTIME_DIR", os.path.join(BASE_DIR, "var")
+)
+
+# В "shared" лежит то, что должны видеть все воркеры сразу, например
+# поколение контента (posts.cache).
 CACHES = {
     'default': {
-        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
-    }
+        'BACKEND': 'core.cache_backends.LocMemCache',
+    },
+    'shared': {
+        'BACKEND': 'core.cache_backends.SQLiteCache',
+        'LOCATION': os.path.join(RUNTIME_DIR, 'shared-cache.sqlite3'),
+        'OPTIONS': {'MAX_ENTRIES': 10000, 'MAX_SIZE': 64 * 2 ** 20},
+    },
 }
+
+# Авторы, у которых подписчиков больше, не раскладываются по лентам
+# подписчиков при публикации, а подмешиваются в ленту при чтении.
+FANOUT_FOLLOWERS_LIMIT = 1000
+
+# Считает миниатюры, построенные во время рендеринга страниц.
+THUMBNAIL_BACKEND = "posts.thumbnails.ThumbnailBackend"
+
+# Доля запросов, которым core.middleware.ServerTimingMiddleware добавляет
+# заголовок Server-Timing и строку лога. Замеры идут для всех запросов.
+SERVER_TIMING_SAMPLE_RATE = 0.05
+
+# Общий для всех воркеров файл метрик core.metrics. Страницу /metrics
+# видит персонал и запросы с заголовком «Authorization: Bearer
+# <METRICS_TOKEN>»; пустой токен отключает доступ по заголовку.
+METRICS_PATH = os.path.join(RUNTIME_DIR, "metrics.sqlite3")
+METRICS_TOKEN = os.environ.get("METRICS_TOKEN", "")
+
+# Запросы дольше стольких секунд попадают в журнал core.SlowQuery
+# (команда slow_queries) вместе с планом и стеком вызовов.
+SLOW_QUERY_THRESHOLD = 0.1
+
+TEST_RUNNER = "core.test_runner.RuntimeDirTestRunner"
+
+# Превышение бюджета core.decorators.query_budget: при DEBUG —
+# предупреждение в лог, при QUERY_BUDGET_STRICT — исключение.
+QUERY_BUDGET_STRICT = False
+
+# Списки длиннее этого числа записей паджинатор не считает точно, а
+# оценивает (posts.paginator.estimate_count).
+PAGINATOR_EXACT_COUNT_LIMIT = 10000